@@ -0,0 +1,100 @@
+import pytest
+
+from extensions import db
+from models.admin import AdminJob
+from models.photo import Photo
+from models.user import User, Comment, Like, Notification
+from services import admin
+
+
+def _photo(owner, **kwargs):
+    photo = Photo(title="Verzia Moment", filename="x", owner_id=owner.id, **kwargs)
+    db.session.add(photo)
+    db.session.commit()
+    return photo
+
+
+def test_dashboard_is_paginated_and_filtered(app, client, make_user, login, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_PAGE_SIZE", 2)
+    make_user("verzia")
+    for name in ("kaan", "kerem", "kemal", "mehmet"):
+        make_user(name)
+    assert login(client, "kaan").get("/admin/dashboard").status_code == 302
+    client.get("/logout")
+    login(client, "verzia")
+
+    rows, next_before_id = admin.users_page(q="K")
+    assert [r.username for r in rows] == ["kemal", "kerem"]
+    rows, next_before_id = admin.users_page(q="k", before_id=next_before_id)
+    assert [r.username for r in rows] == ["kaan"] and next_before_id is None
+
+    page = client.get("/admin/dashboard?q=meh").get_data(as_text=True)
+    assert "@mehmet" in page and "@kaan" not in page
+    _photo(User.query.filter_by(username="kerem").one())
+    assert "@kerem" in client.get("/admin/dashboard?tab=photos&q=ker").get_data(as_text=True)
+
+
+def test_bulk_delete_users_fixes_counters(app, client, make_user, login):
+    make_user("verzia")
+    kept, spam1, spam2 = make_user("kalan"), make_user("spam1"), make_user("spam2")
+    photo = _photo(kept)
+    spam_photo_id = _photo(spam1).id
+    for spammer in (spam1, spam2):
+        spammer.follow(kept)
+        kept.follow(spammer)
+        db.session.add(Like(user_id=spammer.id, photo_id=photo.id))
+        db.session.add(Comment(body="reklam", user_id=spammer.id, photo_id=photo.id))
+    db.session.add(Like(user_id=kept.id, photo_id=spam_photo_id))
+    db.session.add(Notification(user_id=kept.id, sender_username="spam1", notif_type="like",
+                                photo_id=photo.id, message="spam1 beğendi"))
+    db.session.commit()
+    db.session.query(Photo).filter_by(id=photo.id).update({Photo.like_count: 2, Photo.comment_count: 2})
+    db.session.commit()
+    login(client, "verzia")
+
+    response = client.post("/admin/jobs", headers={"Accept": "application/json"},
+                           data={"action": "delete_users", "scope": "filter", "q": "spam"})
+    assert response.status_code == 202
+    job = client.get(f"/admin/jobs/{response.get_json()['id']}").get_json()
+    assert (job["status"], job["total"], job["done"]) == ("done", 2, 2)
+
+    db.session.expire_all()
+    assert {u.username for u in User.query} == {"verzia", "kalan"}
+    assert db.session.get(Photo, spam_photo_id) is None
+    refreshed = db.session.get(Photo, photo.id)
+    assert (refreshed.like_count, refreshed.comment_count) == (0, 0)
+    kept = db.session.get(User, kept.id)
+    assert (kept.follower_count, kept.following_count) == (0, 0)
+    assert Notification.query.count() == 0
+
+
+def test_protected_accounts_are_skipped(app, client, make_user, login):
+    admin_id = make_user("verzia").id
+    other_id = make_user("uye").id
+    login(client, "verzia")
+    assert client.post(f"/admin/delete_user/{admin_id}").status_code == 400
+
+    job = admin.create_job("delete_users", {"ids": [admin_id, other_id]})
+    assert job.total == 1
+    assert db.session.get(User, admin_id) is not None
+    assert db.session.get(User, other_id) is None
+    assert AdminJob.query.count() == 1
+
+
+def test_filter_scope_job_requires_a_filter(app, client, make_user, login):
+    make_user("verzia")
+    make_user("kalan")
+    login(client, "verzia")
+    for data in ({}, {"q": "  "}, {"created_after": "dün"}, {"q": "", "created_after": ""}):
+        response = client.post("/admin/jobs", headers={"Accept": "application/json"},
+                               data={"action": "delete_users", "scope": "filter", **data})
+        assert response.status_code == 400
+    assert AdminJob.query.count() == 0
+    assert User.query.filter_by(username="kalan").count() == 1
+
+    with pytest.raises(ValueError):
+        admin.create_job("delete_photos", {"filter": {"q": ""}})
+
+    response = client.post("/admin/jobs", headers={"Accept": "application/json"},
+                           data={"action": "delete_users", "scope": "filter", "created_after": "2000-01-01"})
+    assert response.status_code == 202 and response.get_json()["total"] == 1
@@ -1,40 +1,66 @@
-from flask import Flask, render_template, request, redirect, url_for, send_from_directory, jsonify, flash, session
+from flask import Flask, render_template, request, redirect, url_for, send_from_directory, jsonify, flash, session, Response, abort
 from flask_login import login_user, logout_user, current_user, login_required
 import os
-import base64 
+import json
 from datetime import datetime
+from functools import wraps
 
 from extensions import db, migrate, login_manager
-from models.user import User, Comment, Like, Notification 
+from models.user import User, Comment, Like, Notification, NotificationArchive, followers_association
 from models.photo import Photo
+from models.admin import AdminJob
+from services.database import init_database, read_replica, pool_stats
+from services.storage import init_blob_store, get_blob_store, is_valid_hash
+from services.uploads import accept_upload, UploadRejected, UploadRequest
+from services.avatars import set_avatar
+from services.blobs import init_blobs, release_unused_blobs
+from services.thumbnails import init_thumbnails, schedule_variants
+from services.counters import init_counters, bump
+from services.likes import toggle_like
+from services.cache import init_cache, get_cache
+from services.notifications import init_notifications, unread_count, notify, mark_read_upto, forget_unread, notification_page, read_watermark, delete_photo_notifications
+from services.pubsub import init_pubsub, get_broker, publish
+from services.search import init_search, find_users
+from services.feed import init_feed, feed_page, schedule_fanout, on_follow, on_unfollow, remove_photo
+from services.versions import init_versions, version, touch, cached, cached_response, cached_many_response, streamed_response, etag_for
+from services.text import turkish_lower
+from services.metrics import init_metrics, render as render_metrics
+from services.passwords import init_passwords, needs_rehash
+from services.identity import init_identity, load_identity, current_user_row
+from services.admin import init_admin, users_page, photos_page, recent_jobs, create_job, is_protected, has_filter as has_admin_filter, ACTIONS as ADMIN_ACTIONS
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.config.from_object('config.Config')
 app.secret_key = os.environ.get("SECRET_KEY", "verzia-special-2025")
 
-# --------------------- DATABASE AYARI (RAILWAY UYUMLU) ---------------------
-DATABASE_URL = os.environ.get("DATABASE_URL")
-if DATABASE_URL:
-    if DATABASE_URL.startswith("postgres://"):
-        DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+psycopg2://", 1)
-    app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
-else:
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///verzia_local.db"
-
-db.init_app(app)
+init_database(app)
 migrate.init_app(app, db)
 login_manager.init_app(app)
+init_blob_store(app)
+init_blobs(app)
+init_thumbnails(app)
+init_counters(app)
+init_cache(app)
+init_notifications(app)
+init_pubsub(app)
+init_search(app)
+init_feed(app)
+init_versions(app)
+init_metrics(app)
+init_admin(app)
+init_passwords(app)
+init_identity(app)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    return load_identity(int(user_id))
 
 # --------------------- BİLDİRİM SİSTEMİ ENJEKSİYONU ---------------------
 @app.context_processor
 def inject_notifications():
     if current_user.is_authenticated:
-        unread_count = current_user.notifications.filter_by(is_read=False).count()
-        return dict(unread_notifications_count=unread_count)
+        return dict(unread_notifications_count=unread_count(current_user.id))
     return dict(unread_notifications_count=0)
 
 # --------------------- ANA SAYFA VE AUTH ---------------------
@@ -46,8 +72,15 @@ def index():
 def login():
     username = request.form.get("username")
     password = request.form.get("password")
-    user = User.query.filter((User.username == username) | (User.email == username)).first()
+    # İki ayrı tekil indeks araması (username, email); "@" yoksa email'e hiç bakılmaz
+    user = User.query.filter_by(username=username).first()
+    if user is None and username and "@" in username:
+        user = User.query.filter_by(email=username).first()
     if user and user.check_password(password):
+        # Maliyet ayarı değiştiyse düz şifre elimizdeyken özet yenilenir
+        if needs_rehash(user.password):
+            user.set_password(password)
+            db.session.commit()
         login_user(user, remember=True)
         return jsonify({"status": "success", "redirect": url_for("profile", username=user.username)})
     return jsonify({"status": "error", "message": "Bilgiler hatalı!"}), 401
@@ -67,12 +100,45 @@ def register():
     return jsonify({"status": "success", "redirect": url_for("profile", username=new_user.username)})
 
 # --------------------- PROFİL VE SOSYAL ---------------------
+PROFILE_PAGE_SIZE = 24
+
+# Kullanıcı adı → id eşlemesi önbellekte; profil görüntüleme sürüm kontrolüne DB'siz ulaşsın
+def user_id_for(username):
+    cache = get_cache()
+    user_id = cache.get(f"uid:{username}")
+    if user_id is None:
+        user_id = db.session.query(User.id).filter_by(username=username).scalar()
+        if user_id is None: abort(404)
+        cache.set(f"uid:{username}", user_id)
+    return user_id
+
+def forget_username(username):
+    get_cache().delete(f"uid:{username}")
+
+# Profil verisi sahibin sürümüyle önbellekte (tüm izleyiciler paylaşır); izleyene özel kısım
+# (takip ediyor mu) ve sayfa kabuğu (bildirim sayısı, tema) ETag'e giriyor.
+# Sayfa her seferinde render ediliyor çünkü base.html flash mesajlarını tüketiyor.
 @app.route("/profile/<username>")
 @login_required
+@read_replica
 def profile(username):
-    user_to_show = User.query.filter_by(username=username).first_or_404()
-    photos = Photo.query.filter_by(owner_id=user_to_show.id).order_by(Photo.id.desc()).all()
-    username_check = user_to_show.username.replace('İ', 'i').replace('I', 'ı').lower()
+    owner_id = user_id_for(username)
+    owner_version = version("user", owner_id)
+
+    def build():
+        data = cached("profile_owner", etag_for(owner_id, owner_version), lambda: profile_context(owner_id))
+        is_following = owner_id in current_user.following_ids([owner_id])
+        return {**data, "can_edit": current_user.id == owner_id, "is_following": is_following}
+
+    parts = (owner_id, owner_version, current_user.id, version("user", current_user.id), unread_count(current_user.id), session.get("theme"))
+    return cached_response("profile", parts, build, render=lambda context: render_template("profile.html", **context))
+
+def profile_context(owner_id):
+    user_to_show = db.session.get(User, owner_id, options=[db.undefer(User.bio)])
+    if user_to_show is None: abort(404)
+    photos, next_before_id = photo_page(user_to_show.id)
+    photo_count = Photo.query.filter_by(owner_id=user_to_show.id).count()
+    username_check = turkish_lower(user_to_show.username)
     kurucular = ["beril", "ecem", "cemre"]
     is_ana_profil = "verzia" in username_check
     is_kurucu = username_check in kurucular
@@ -80,12 +146,47 @@ def profile(username):
     profile_data = {
         "id": user_to_show.id, "username": user_to_show.username, "avatar": user_to_show.avatar or "https://picsum.photos/400", 
         "bio": user_to_show.bio or "Verzia Experience", 
-        "followers": "2M" if is_ana_profil else ("1.5M" if is_kurucu else user_to_show.followers_list.count()), 
-        "following": user_to_show.followed.count(), 
+        "raw_bio": user_to_show.bio or "",
+        "followers": "2M" if is_ana_profil else ("1.5M" if is_kurucu else user_to_show.follower_count), 
+        "following": user_to_show.following_count, 
         "is_vip": is_kurucu or is_ana_profil, "is_kurucu": is_kurucu or is_ana_profil
     }
-    is_following = current_user.is_following(user_to_show)
-    return render_template("profile.html", server_profile=profile_data, photos=photos, can_edit=(current_user.id == user_to_show.id), is_following=is_following)
+    return {"server_profile": profile_data, "photos": [p.to_grid_dict() for p in photos], "photo_count": photo_count, "next_before_id": next_before_id}
+
+# Keyset sayfalama: (owner_id, id) indeksi sayesinde sayfa derinliğinden bağımsız
+def photo_page(owner_id, before_id=None):
+    query = Photo.query.options(db.selectinload(Photo.variants), db.undefer(Photo.placeholder)).filter(Photo.owner_id == owner_id)
+    if before_id:
+        query = query.filter(Photo.id < before_id)
+    photos = query.order_by(Photo.id.desc()).limit(PROFILE_PAGE_SIZE + 1).all()
+    next_before_id = photos[PROFILE_PAGE_SIZE - 1].id if len(photos) > PROFILE_PAGE_SIZE else None
+    return photos[:PROFILE_PAGE_SIZE], next_before_id
+
+# --------------------- ANA AKIŞ ---------------------
+@app.route("/feed")
+@login_required
+def feed():
+    photos, next_before_id = feed_page(current_user.id)
+    return render_template("feed.html", photos=photos, next_before_id=next_before_id)
+
+@app.route("/get_feed")
+@login_required
+def get_feed():
+    photos, next_before_id = feed_page(current_user.id, request.args.get("before_id", type=int))
+    return jsonify({"photos": [p.to_feed_dict() for p in photos], "next_before_id": next_before_id})
+
+@app.route("/get_user_photos/<username>")
+@login_required
+@read_replica
+def get_user_photos(username):
+    owner_id = user_id_for(username)
+    before_id = request.args.get("before_id", type=int)
+
+    def build():
+        photos, next_before_id = photo_page(owner_id, before_id)
+        return {"photos": [p.to_grid_dict() for p in photos], "next_before_id": next_before_id}
+
+    return cached_response("user_photos", (owner_id, version("user", owner_id), before_id), build)
 
 @app.route("/update_bio", methods=["POST"])
 @login_required
@@ -94,17 +195,24 @@ def update_bio():
     user = db.session.get(User, current_user.id)
     if user:
         user.bio = new_bio
+        touch("user", user.id)
         db.session.commit()
     return redirect(url_for("profile", username=user.username))
 
 @app.route("/update_avatar", methods=["POST"])
 @login_required
 def update_avatar():
+    # Avatar 5MB; genel 200MB sınırına kadar gövde okunmasın (multipart başlıkları için pay)
+    request.max_content_length = app.config["AVATAR_MAX_BYTES"] + 64 * 1024
     file = request.files.get('avatar')
     if file:
-        img_data = base64.b64encode(file.read()).decode('utf-8')
-        current_user.avatar = f"data:{file.mimetype};base64,{img_data}"
+        try:
+            replaced = set_avatar(current_user_row(), file)
+        except UploadRejected as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        touch("user", current_user.id)
         db.session.commit()
+        release_unused_blobs(replaced)
         return jsonify({"status": "success"})
     return jsonify({"status": "error"}), 400
 
@@ -115,45 +223,83 @@ def toggle_follow(username):
     user_to_follow = User.query.filter_by(username=username).first_or_404()
     if user_to_follow == current_user:
         return jsonify({"status": "error", "message": "Kendinizi takip edemezsiniz."}), 400
-    if current_user.is_following(user_to_follow):
-        current_user.unfollow(user_to_follow)
+    me = current_user_row()
+    if me.unfollow(user_to_follow):
+        on_unfollow(current_user.id, user_to_follow.id)
         status = "unfollowed"
     else:
-        current_user.follow(user_to_follow)
+        # Aynı anda gelen başka bir istek takibi eklediyse akış / bildirim tekrarlanmaz
+        if me.follow(user_to_follow):
+            on_follow(current_user.id, user_to_follow)
+            notify(user_to_follow.id, current_user.username, "follow")
         status = "followed"
-        notif = Notification(user_id=user_to_follow.id, sender_username=current_user.username, notif_type="follow", message=f"@{current_user.username} sizi takip etmeye başladı.", is_read=False)
-        db.session.add(notif)
+    touch("user", current_user.id)
+    touch("user", user_to_follow.id)
     db.session.commit()
-    return jsonify({"status": status, "follower_count": user_to_follow.followers_list.count()})
+    return jsonify({"status": status, "follower_count": user_to_follow.follower_count})
+
+USER_LIST_PAGE_SIZE = 50
+USER_LIST_PAGE_MAX = 500
+USER_LIST_CHUNK = 100
+
+# Takipçi / takip listesi: sadece gereken kolonlar, (takip edilen, takipçi) indeksi
+# üzerinde after_id imleciyle sayfa; satırlar okundukça JSON'a yazılıp gönderiliyor
+def user_list_query(owner_id, type, after_id=None, limit=USER_LIST_PAGE_SIZE):
+    follows = followers_association.c
+    owner_col, other_col = (follows.followed_id, follows.follower_id) if type == 'followers' else (follows.follower_id, follows.followed_id)
+    query = (db.select(User.id, User.username, db.func.coalesce(User.avatar_thumb, User.avatar).label("avatar"))
+             .select_from(followers_association).join(User, User.id == other_col)
+             .where(owner_col == owner_id))
+    if after_id:
+        query = query.where(other_col > after_id)
+    return query.order_by(other_col).limit(limit + 1)
 
 @app.route("/get_user_list/<username>/<type>")
 @login_required
 def get_user_list(username, type):
-    user = User.query.filter_by(username=username).first_or_404()
-    users = []
-    if type == 'followers':
-        users = [{"username": u.username, "avatar": u.avatar or "https://picsum.photos/100"} for u in user.followers_list.all()]
-    else:
-        users = [{"username": u.username, "avatar": u.avatar or "https://picsum.photos/100"} for u in user.followed.all()]
-    return jsonify(users)
+    if type not in ('followers', 'following'): abort(404)
+    owner_id = user_id_for(username)
+    after_id = request.args.get("after_id", type=int)
+    limit = max(1, min(request.args.get("limit", USER_LIST_PAGE_SIZE, type=int), USER_LIST_PAGE_MAX))
+    viewer = current_user._get_current_object()
+
+    def generate():
+        rows = db.session.execute(user_list_query(owner_id, type, after_id, limit).execution_options(yield_per=USER_LIST_CHUNK))
+        emitted, next_after_id = 0, None
+        yield '{"users": ['
+        for chunk in rows.partitions():
+            # "takip ediyorum" bayrağı parça başına tek sorgu
+            followed_ids = viewer.following_ids(row.id for row in chunk)
+            for row in chunk:
+                if emitted == limit:
+                    next_after_id = last_id
+                    break
+                item = {"username": row.username, "avatar": row.avatar or "https://picsum.photos/100", "is_following": row.id in followed_ids}
+                yield ("," if emitted else "") + app.json.dumps(item)
+                emitted, last_id = emitted + 1, row.id
+        yield '], "next_after_id": %s}' % app.json.dumps(next_after_id)
+
+    parts = (owner_id, version("user", owner_id), viewer.id, version("user", viewer.id), type, after_id, limit)
+    return streamed_response("user_list", parts, generate)
 
 # --------------------- ETKİLEŞİM (BEĞENİ & YORUM) ---------------------
+COMMENT_PAGE_SIZE = 20
+COMMENT_PAGE_MAX = 100
+POST_BATCH_MAX = 30
+
 @app.route('/like/<int:photo_id>', methods=['POST'])
 @login_required
 def like_photo(photo_id):
-    photo = Photo.query.get_or_404(photo_id)
-    existing_like = Like.query.filter_by(user_id=current_user.id, photo_id=photo_id).first()
-    if existing_like:
-        db.session.delete(existing_like)
-        status = "unliked"
-    else:
-        new_like = Like(user_id=current_user.id, photo_id=photo_id)
-        db.session.add(new_like)
-        status = "liked"
+    photo = Photo.meta_or_404(photo_id)
+    status, changed = toggle_like(current_user.id, photo_id)
+    if status == "liked" and changed:
         if photo.owner_id != current_user.id:
-            db.session.add(Notification(user_id=photo.owner_id, sender_username=current_user.username, notif_type="like", message=f"@{current_user.username} fotoğrafını beğendi.", is_read=False))
+            notify(photo.owner_id, current_user.username, "like", photo_id=photo_id)
+    if changed: touch("photo", photo_id)
     db.session.commit()
-    return jsonify({"status": status, "like_count": len(photo.likes)})
+    photo.refresh_counts()
+    if changed: publish_counts(photo)
+    return jsonify({"status": status, "like_count": photo.like_count})
 
 @app.route('/add_comment/<int:photo_id>', methods=['POST'])
 @login_required
@@ -162,12 +308,15 @@ def add_comment(photo_id):
         data = request.get_json()
         comment_body = data.get('text', '').strip()
         if not comment_body: return jsonify({"status": "error"}), 400
-        photo = Photo.query.get_or_404(photo_id)
+        photo = Photo.meta_or_404(photo_id)
         new_comment = Comment(body=comment_body, user_id=current_user.id, photo_id=photo_id)
         db.session.add(new_comment)
+        bump(Photo, photo_id, comment_count=1)
+        touch("photo", photo_id)
         if photo.owner_id != current_user.id:
-            db.session.add(Notification(user_id=photo.owner_id, sender_username=current_user.username, notif_type="comment", message=f"@{current_user.username} fotoğrafına yorum yaptı.", is_read=False))
+            notify(photo.owner_id, current_user.username, "comment", photo_id=photo_id)
         db.session.commit()
+        publish_counts(photo.refresh_counts())
         return jsonify({'status': 'success'})
     except Exception as e:
         db.session.rollback()
@@ -176,30 +325,147 @@ def add_comment(photo_id):
 @app.route('/get_post_details/<int:photo_id>')
 @login_required
 def get_post_details(photo_id):
-    photo = Photo.query.get_or_404(photo_id)
-    is_liked = Like.query.filter_by(user_id=current_user.id, photo_id=photo_id).first() is not None
-    return jsonify({
-        "likes": len(photo.likes),
+    after_id, limit = request.args.get("after_id", type=int), request.args.get("limit", COMMENT_PAGE_SIZE, type=int)
+
+    def build():
+        photo = Photo.query.options(db.undefer(Photo.placeholder)).filter_by(id=photo_id).first_or_404()
+        is_liked = Like.query.filter_by(user_id=current_user.id, photo_id=photo_id).first() is not None
+        return post_detail(photo, is_liked, comment_page(photo, after_id, limit))
+
+    # is_liked ve can_delete izleyene bağlı; beğeni/yorum fotoğrafın sürümünü değiştiriyor
+    return cached_response("post", (photo_id, version("photo", photo_id), current_user.id, after_id, limit), build)
+
+# Izgaradaki görünen kareler için ön yükleme: ?ids=1,2,3 (en fazla POST_BATCH_MAX).
+# Her gönderi tekli uçla aynı önbellek girişini kullanır (after_id=None, aynı limit);
+# eksikler sabit sayıda sorguyla üretilir. Silinmiş / bulunamayan id'ler yanıtta yok.
+@app.route('/get_post_details/batch')
+@login_required
+def get_post_details_batch():
+    try:
+        photo_ids = sorted({int(i) for i in request.args.get("ids", "").split(",") if i.strip()})
+    except ValueError:
+        return jsonify({"status": "error"}), 400
+    if not photo_ids or len(photo_ids) > POST_BATCH_MAX: return jsonify({"status": "error"}), 400
+    limit = request.args.get("limit", COMMENT_PAGE_SIZE, type=int)
+    etags = {photo_id: etag_for("post", photo_id, version("photo", photo_id), current_user.id, None, limit) for photo_id in photo_ids}
+    return cached_many_response("post", etags, lambda missing: post_details(missing, limit),
+                                render=lambda posts: jsonify({"posts": posts}))
+
+def post_detail(photo, is_liked, page):
+    return {
+        "image": photo.image_url,
+        "placeholder": photo.placeholder,
+        "variants": photo.variants_dict(),
+        "likes": photo.like_count,
+        "comment_count": photo.comment_count,
         "is_liked": is_liked,
-        "comments": [{"id": c.id, "username": User.query.get(c.user_id).username, "text": c.body, "can_delete": (c.user_id == current_user.id or photo.owner_id == current_user.id)} for c in photo.comments]
-    })
+        **page
+    }
+
+# Fotoğraflar (+ varyantlar), izleyenin beğenileri ve ilk yorum sayfaları: id sayısından bağımsız 4 sorgu
+def post_details(photo_ids, limit=COMMENT_PAGE_SIZE):
+    photos = Photo.query.options(db.selectinload(Photo.variants), db.undefer(Photo.placeholder)) \
+        .filter(Photo.id.in_(photo_ids)).all()
+    if not photos: return {}
+    liked = {row.photo_id for row in db.session.query(Like.photo_id).filter(Like.user_id == current_user.id, Like.photo_id.in_(photo_ids))}
+    pages = first_comment_pages(photos, limit)
+    return {photo.id: post_detail(photo, photo.id in liked, pages[photo.id]) for photo in photos}
+
+@app.route('/get_comments/<int:photo_id>')
+@login_required
+def get_comments(photo_id):
+    after_id, limit = request.args.get("after_id", type=int), request.args.get("limit", COMMENT_PAGE_SIZE, type=int)
+    build = lambda: comment_page(Photo.meta_or_404(photo_id), after_id, limit)
+    return cached_response("comments", (photo_id, version("photo", photo_id), current_user.id, after_id, limit), build)
+
+def comment_rows_query():
+    return (db.session.query(Comment.id, Comment.photo_id, Comment.body, Comment.user_id, User.username,
+                             db.func.coalesce(User.avatar_thumb, User.avatar).label("avatar"))
+            .join(User, User.id == Comment.user_id))
+
+def serialize_comments(rows, owner_id, limit):
+    return {
+        "comments": [{"id": c.id, "username": c.username, "avatar": c.avatar or "https://picsum.photos/100", "text": c.body,
+                      "can_delete": (c.user_id == current_user.id or owner_id == current_user.id)} for c in rows[:limit]],
+        "next_after_id": rows[limit - 1].id if len(rows) > limit else None,
+    }
+
+# Yorumlar yazarlarıyla tek sorguda: (photo_id, timestamp, id) sırası + after_id imleci.
+# İmleçteki yorum bu arada silinmişse zamanı yok (NULL); id zamanla birlikte arttığı için id'den devam edilir
+def comment_page(photo, after_id=None, limit=COMMENT_PAGE_SIZE):
+    limit = max(1, min(limit, COMMENT_PAGE_MAX))
+    query = comment_rows_query().filter(Comment.photo_id == photo.id)
+    if after_id:
+        cursor_ts = db.session.query(Comment.timestamp).filter(Comment.id == after_id).scalar_subquery()
+        query = query.filter(db.or_(Comment.timestamp > cursor_ts, db.and_(Comment.timestamp == cursor_ts, Comment.id > after_id),
+                                    db.and_(cursor_ts.is_(None), Comment.id > after_id)))
+    rows = query.order_by(Comment.timestamp, Comment.id).limit(limit + 1).all()
+    return serialize_comments(rows, photo.owner_id, limit)
+
+# Birden çok fotoğrafın ilk yorum sayfası tek sorguda: her fotoğraf için
+# ix_comment_photo_id_timestamp üzerinde LIMIT'li bir alt sorgu, UNION ALL ile birleşik
+def first_comment_pages(photos, limit=COMMENT_PAGE_SIZE):
+    limit = max(1, min(limit, COMMENT_PAGE_MAX))
+    heads = [db.select(db.select(Comment.id).where(Comment.photo_id == photo.id)
+                       .order_by(Comment.timestamp, Comment.id).limit(limit + 1).subquery().c.id) for photo in photos]
+    ids = db.union_all(*heads).subquery() if len(heads) > 1 else heads[0].subquery()
+    rows = comment_rows_query().filter(Comment.id.in_(db.select(ids.c.id))) \
+        .order_by(Comment.photo_id, Comment.timestamp, Comment.id).all()
+    by_photo = {}
+    for row in rows:
+        by_photo.setdefault(row.photo_id, []).append(row)
+    return {photo.id: serialize_comments(by_photo.get(photo.id, []), photo.owner_id, limit) for photo in photos}
 
 @app.route('/delete_comment/<int:comment_id>', methods=['POST'])
 @login_required
 def delete_comment(comment_id):
-    comment = Comment.query.get_or_404(comment_id)
-    photo = Photo.query.get(comment.photo_id)
+    comment = db.get_or_404(Comment, comment_id)
+    photo = Photo.meta_or_404(comment.photo_id)
     if comment.user_id == current_user.id or photo.owner_id == current_user.id:
         db.session.delete(comment)
+        bump(Photo, comment.photo_id, comment_count=-1)
+        touch("photo", comment.photo_id)
         db.session.commit()
+        publish_counts(photo.refresh_counts())
         return jsonify({"status": "success"})
     return jsonify({"status": "error"}), 403
 
+# Açık gönderi penceresindeki canlı sayaçlar için
+def publish_counts(photo):
+    publish(f"photo:{photo.id}", "counts", {"photo_id": photo.id, "likes": photo.like_count, "comments": photo.comment_count})
+
 # --------------------- BİLDİRİM PANELİ ROTALARI ---------------------
+@app.route("/notifications/stream")
+@login_required
+def notification_stream():
+    channels = [f"user:{current_user.id}"]
+    photo_id = request.args.get("photo", type=int)
+    if photo_id: channels.append(f"photo:{photo_id}")
+    broker = get_broker()
+    heartbeat = app.config["SSE_HEARTBEAT"]
+
+    # stream_with_context kullanılmıyor: bağlantı açıkken istek context'i (ve DB bağlantısı) tutulmasın
+    def events():
+        subscription = broker.subscribe(channels)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                message = subscription.get(timeout=heartbeat)
+                if message is None:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+        finally:
+            subscription.close()
+
+    return Response(events(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route("/notifications")
 @login_required
 def get_notifications():
-    notifications = current_user.notifications.order_by(Notification.id.desc()).limit(20).all()
+    # before_id: daha eski sayfalar (sıcak tablo bitince arşivden devam eder)
+    before_id = request.args.get("before_id", type=int)
+    notifications = notification_page(current_user.id, before_id)
     data = []
     for n in notifications:
         data.append({
@@ -209,84 +475,194 @@ def get_notifications():
             "type": n.notif_type,
             "timestamp": n.timestamp.strftime("%d.%m %H:%M")
         })
-    current_user.notifications.filter_by(is_read=False).update({"is_read": True})
-    db.session.commit()
+    # İlk sayfa görüldü: en yeni bildirime kadar hepsi okundu (satırlar güncellenmiyor)
+    if notifications and not before_id:
+        mark_read_upto(current_user.id, notifications[0].id)
+        db.session.commit()
     return jsonify(data)
 
 @app.route("/delete_notification/<int:notif_id>", methods=['POST'])
 @login_required
 def delete_notification(notif_id):
-    notif = Notification.query.get_or_404(notif_id)
+    notif = db.session.get(Notification, notif_id) or NotificationArchive.query.filter_by(id=notif_id).first_or_404()
     if notif.user_id == current_user.id:
+        if notif.id > read_watermark(current_user.id): forget_unread(current_user.id)
         db.session.delete(notif)
         db.session.commit()
         return jsonify({"status": "success"})
     return jsonify({"status": "error"}), 403
 
 # --------------------- ADMIN & ARAMA ---------------------
+def admin_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if "verzia" not in turkish_lower(current_user.username):
+            if request.method == "GET" and not wants_json():
+                return redirect(url_for("profile", username=current_user.username))
+            return jsonify({"status": "error"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+# Sadece meta veri sütunları, sayfa başına ADMIN_PAGE_SIZE satır (before_id ile keyset)
 @app.route("/admin/dashboard")
 @login_required
+@admin_required
 def admin_dashboard():
-    current_username = current_user.username.replace('İ', 'i').replace('I', 'ı').lower()
-    if "verzia" not in current_username: return redirect(url_for("profile", username=current_user.username))
-    all_users = User.query.order_by(User.id.desc()).all()
-    all_photos = Photo.query.order_by(Photo.id.desc()).all()
-    return render_template("admin.html", users=all_users, photos=all_photos)
+    tab = "photos" if request.args.get("tab") == "photos" else "users"
+    filters = {"q": request.args.get("q", ""), "created_after": request.args.get("created_after", "")}
+    page = photos_page if tab == "photos" else users_page
+    rows, next_before_id = page(before_id=request.args.get("before_id", type=int), **filters)
+    return render_template("admin.html", tab=tab, rows=rows, next_before_id=next_before_id,
+                           filters=filters, jobs=recent_jobs(), is_protected=is_protected)
+
+# Seçili id'ler (ids) ya da scope=filter ile filtreye uyan tüm kayıtlar; iş arka planda parça parça çalışır
+@app.route("/admin/jobs", methods=["POST"])
+@login_required
+@admin_required
+def admin_create_job():
+    action = request.form.get("action", "")
+    if action not in ADMIN_ACTIONS: return jsonify({"status": "error"}), 400
+    if request.form.get("scope") == "filter":
+        params = {"filter": {"q": request.form.get("q", ""), "created_after": request.form.get("created_after", "")}}
+        # Boş filtre tüm hesapları / gönderileri seçerdi; tarayıcıdaki confirm() yetmez
+        if not has_admin_filter(**params["filter"]):
+            return jsonify({"status": "error", "message": "Filtreyle toplu işlem için arama veya tarih gerekli."}), 400
+    else:
+        ids = request.form.getlist("ids", type=int)
+        if not ids: return jsonify({"status": "error"}), 400
+        params = {"ids": ids}
+    job = create_job(action, params, created_by=current_user.id)
+    if wants_json(): return jsonify(job.to_dict()), 202
+    flash(f"İş #{job.id} kuyruğa alındı ({job.total} kayıt)")
+    return redirect(url_for("admin_dashboard", tab=ADMIN_ACTIONS[action][0]))
+
+@app.route("/admin/jobs/<int:job_id>")
+@login_required
+@admin_required
+def admin_job_status(job_id):
+    return jsonify(db.get_or_404(AdminJob, job_id).to_dict())
 
 @app.route("/admin/delete_user/<int:user_id>", methods=['POST'])
 @login_required
+@admin_required
 def admin_delete_user(user_id):
-    current_username = current_user.username.replace('İ', 'i').replace('I', 'ı').lower()
-    if "verzia" not in current_username: return jsonify({"status": "error"}), 403
-    user_to_delete = User.query.get_or_404(user_id)
-    if user_to_delete.username.lower() == "verzia": return jsonify({"status": "error"}), 400
-    db.session.delete(user_to_delete)
-    db.session.commit()
+    user_to_delete = User.query.options(db.load_only(User.id, User.username)).filter_by(id=user_id).first_or_404()
+    if is_protected(user_to_delete.username): return jsonify({"status": "error"}), 400
+    create_job("delete_users", {"ids": [user_id]}, created_by=current_user.id)
     return redirect(url_for('admin_dashboard'))
 
 @app.route("/search_users")
 @login_required
+@read_replica
 def search_users():
     q = request.args.get("q", "").strip()
     if not q: return jsonify([])
-    users = User.query.filter(User.username.ilike(f"%{q}%")).limit(10).all()
-    return jsonify([{"username": u.username, "avatar": u.avatar or "https://picsum.photos/100"} for u in users])
+    users = find_users(q, viewer_id=current_user.id)
+    return jsonify([{"username": u.username, "avatar": u.avatar or "https://picsum.photos/100", "is_following": u.is_following} for u in users])
 
 # --------------------- FOTOĞRAF VE AYARLAR (FIXED ✨) ---------------------
+@app.route("/media/<blob_hash>")
+def media(blob_hash):
+    if not is_valid_hash(blob_hash): return "", 404
+    return get_blob_store().serve(blob_hash, max_age=app.config["MEDIA_MAX_AGE"])
+
+def wants_json():
+    return request.accept_mimetypes.best_match(["application/json", "text/html"]) == "application/json"
+
+# Birden fazla dosya tek istekte gelebilir; geçersiz olanlar atlanır, geçerliler kaydedilir
 @app.route("/upload", methods=["POST"])
 @login_required
 def upload():
-    file = request.files.get('photo')
-    if file:
-        img_data = base64.b64encode(file.read()).decode('utf-8')
+    files = [f for f in request.files.getlist('photo') if f]
+    if len(files) > app.config["MAX_UPLOAD_FILES"]:
+        files, errors = [], [f"Tek seferde en fazla {app.config['MAX_UPLOAD_FILES']} fotoğraf yüklenebilir."]
+    else:
+        errors = []
+    new_photos = []
+    for file in files:
+        try:
+            stored = accept_upload(file)
+        except UploadRejected as e:
+            errors.append(f"{file.filename}: {e}" if file.filename else str(e))
+            continue
         # IntegrityError hatasını önlemek için title mühürlendi
-        new_photo = Photo(
-            filename=f"data:{file.mimetype};base64,{img_data}", 
+        new_photos.append(Photo(
+            filename=stored.blob_hash,
+            blob_hash=stored.blob_hash,
+            mimetype=stored.mimetype,
+            width=stored.width,
+            height=stored.height,
             owner_id=current_user.id,
             title="Verzia Moment" # NOT NULL kuralı için pırlanta dokunuş ✨
-        )
-        db.session.add(new_photo)
+        ))
+    if new_photos:
+        db.session.add_all(new_photos)
+        touch("user", current_user.id)
         db.session.commit()
+        for photo in new_photos:
+            schedule_variants(photo.id)
+            schedule_fanout(photo.id)
+    if wants_json():
+        return jsonify({"status": "success" if new_photos else "error", "photos": [p.id for p in new_photos], "errors": errors}), (200 if new_photos else 400)
+    for error in errors: flash(error)
     return redirect(url_for("profile", username=current_user.username))
 
+@app.errorhandler(413)
+def upload_too_large(e):
+    message = f"Yükleme çok büyük (en fazla {request.max_content_length // (1024 * 1024)} MB)."
+    if wants_json() or request.path == "/update_avatar":
+        return jsonify({"status": "error", "message": message}), 413
+    flash(message)
+    return redirect(url_for("profile", username=current_user.username) if current_user.is_authenticated else url_for("index"))
+
 @app.route('/delete_photo/<int:photo_id>', methods=['POST'])
 @login_required
 def delete_photo(photo_id):
-    photo = Photo.query.get_or_404(photo_id)
-    if photo.owner_id != current_user.id and "verzia" not in current_user.username.lower(): return jsonify({"status": "error"}), 403
+    photo = Photo.meta_or_404(photo_id, "blob_hash")
+    if photo.owner_id != current_user.id and "verzia" not in turkish_lower(current_user.username): return jsonify({"status": "error"}), 403
+    blob_hashes = [photo.blob_hash] + [v.blob_hash for v in photo.variants]
+    remove_photo(photo.id)
+    delete_photo_notifications([photo.id])
+    touch("user", photo.owner_id)
+    touch("photo", photo.id)
     db.session.delete(photo)
     db.session.commit()
+    # Aynı dosyayı kullanan başka gönderi yoksa blob silinmek üzere işaretlenir (flask blobs sweep)
+    release_unused_blobs(blob_hashes)
     return jsonify({"status": "success"})
 
 @app.route("/settings", methods=["GET", "POST"])
 @login_required
 def settings():
+    user = current_user_row()
     if request.method == "POST":
-        if request.form.get("username"): current_user.username = request.form.get("username")
-        if request.form.get("password"): current_user.set_password(request.form.get("password"))
+        old_username = user.username
+        if request.form.get("username"): user.username = request.form.get("username")
+        if request.form.get("password"): user.set_password(request.form.get("password"))
+        # Sürüm değişince önbellekteki oturum kimliği (load_identity) de yenilenir
+        touch("user", user.id)
         db.session.commit()
-        return redirect(url_for("profile", username=current_user.username))
-    return render_template("settings.html", user=current_user)
+        forget_username(old_username)
+        return redirect(url_for("profile", username=user.username))
+    return render_template("settings.html", user=user)
+
+# --------------------- İZLEME ---------------------
+# Yük dengeleyici / izleme için: birincil DB'ye ping ve bu worker'ın havuz durumu
+@app.route("/healthz")
+def healthz():
+    try:
+        db.session.execute(db.text("SELECT 1"))
+    except db.exc.OperationalError:
+        db.session.rollback()
+        return jsonify({"status": "db_unavailable", "pools": pool_stats()}), 503
+    return jsonify({"status": "ok", "pools": pool_stats()})
+
+# Prometheus metin formatı; METRICS_TOKEN tanımlıysa Bearer ile korunur
+@app.route("/metrics")
+def metrics():
+    token = app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}": abort(401)
+    return Response(render_metrics(pool_stats()), mimetype="text/plain; version=0.0.4")
 
 @app.route("/logout")
 def logout():
@@ -0,0 +1,79 @@
+"""Beğeni endpoint'i gecikmesi: bildirim yazımı istek içinde vs. kuyrukta.
+
+Çalıştırma (proje kökünden):
+
+    python benchmarks/like_bench.py
+
+Aynı fotoğrafı THREADS kullanıcı eşzamanlı olarak beğenip vazgeçer. İlk tur
+bildirimleri istek thread'inde yazar (NOTIFICATIONS_INLINE), ikinci tur
+arka plan kuyruğunu kullanır. p50/p99 karşılaştırılır.
+
+SQLite'ta yazma kilidi beklemeleri p99'u domine eder; anlamlı sonuç için
+BENCH_DATABASE_URL ile bir PostgreSQL veritabanı verin.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+tmp_dir = tempfile.mkdtemp(prefix="verzia-bench-")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{tmp_dir}/bench.db")
+os.environ.setdefault("BLOB_STORE_PATH", os.path.join(tmp_dir, "blobs"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Photo  # noqa: E402
+
+THREADS = 8
+TOGGLES = 40
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    for i in range(THREADS + 1):
+        user = User(username=f"bench{i}", email=f"bench{i}@example.com")
+        user.set_password("bench")
+        db.session.add(user)
+    db.session.commit()
+    photo = Photo(title="Verzia Moment", filename="0" * 64, blob_hash="0" * 64, owner_id=1)
+    db.session.add(photo)
+    db.session.commit()
+    return photo.id
+
+
+def run(inline):
+    app.config["NOTIFICATIONS_INLINE"] = inline
+    with app.app_context():
+        photo_id = seed()
+    app.extensions["cache"].__init__()
+
+    clients = []
+    for i in range(1, THREADS + 1):
+        client = app.test_client()
+        client.post("/login", data={"username": f"bench{i}", "password": "bench"})
+        clients.append(client)
+
+    def worker(client):
+        timings = []
+        for _ in range(TOGGLES):
+            start = time.perf_counter()
+            client.post(f"/like/{photo_id}")
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        timings = sorted(t for ts in pool.map(worker, clients) for t in ts)
+    app.extensions["notification_queue"].flush()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    for label, inline in (("istek içinde", True), ("kuyruk", False)):
+        p50, p99 = run(inline)
+        print(f"{label:>14}: p50 {p50:7.2f}ms  p99 {p99:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
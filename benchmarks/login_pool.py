@@ -0,0 +1,78 @@
+"""Giriş throughput'u / şifre özeti havuzu boyutu taraması.
+
+Çalıştırma (proje kökünden):
+
+    python benchmarks/login_pool.py                          # process içinde, havuz 1,2,4,8
+    python benchmarks/login_pool.py --pool-sizes 1,4 --driver gunicorn
+    python benchmarks/login_pool.py --hash-method scrypt:32768:8:1
+
+Her havuz boyutu için "login" senaryosu --concurrency eşzamanlı kullanıcıyla
+çalıştırılır. client sürücüsünde havuz process içinde yeniden kurulur, gunicorn
+sürücüsünde sunucu PASSWORD_HASH_WORKERS ile yeniden başlatılır. 503'ler
+(havuz dolu) hata sütununda görünür; --queue ile bekleme kuyruğu ayarlanır.
+Rapor benchmarks/results/<commit>-login-<driver>.json'a yazılır.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scenarios  # noqa: E402
+import seed  # noqa: E402
+from seed import app  # noqa: E402
+from services.passwords import HashPool  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--driver", choices=("client", "gunicorn"), default="client")
+    parser.add_argument("--port", type=int, default=5056)
+    parser.add_argument("--pool-sizes", default="1,2,4,8")
+    parser.add_argument("--queue", type=int, default=app.config["PASSWORD_HASH_QUEUE"])
+    parser.add_argument("--hash-method", default=app.config["PASSWORD_HASH_METHOD"])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=seed.DEFAULTS["seed"])
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    # Seed'deki tek özet bu yöntemle üretilsin: girişte rehash olmasın
+    app.config["PASSWORD_HASH_METHOD"] = args.hash_method
+    with app.app_context():
+        seed.seed_graph(users=args.users, photos=1, likes=1, comments=0, notifications=0, seed=args.seed)
+    data = scenarios.Dataset()
+
+    report = {"commit": scenarios.git_commit(), "driver": args.driver, "hash_method": args.hash_method,
+              "cpus": os.cpu_count(), "concurrency": args.concurrency, "queue": args.queue, "pools": {}}
+    env = {"PASSWORD_HASH_METHOD": args.hash_method, "PASSWORD_HASH_QUEUE": str(args.queue)}
+    for size in (int(s) for s in args.pool_sizes.split(",")):
+        server = None
+        if args.driver == "client":
+            app.extensions["password_pool"].executor.shutdown()
+            app.extensions["password_pool"] = HashPool(size, args.queue, app.config["PASSWORD_HASH_TIMEOUT"])
+            make_session = scenarios.ClientSession
+        else:
+            server = scenarios.start_gunicorn(args.port, PASSWORD_HASH_WORKERS=str(size), **env)
+            make_session = lambda: scenarios.HttpSession(f"http://127.0.0.1:{args.port}")  # noqa: E731
+        try:
+            row = scenarios.run_scenario("login", make_session, data, args.requests, args.concurrency, args.seed)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        report["pools"][size] = row
+        print(f"havuz {size:>3}: {row['throughput']:>7} giriş/s  p50 {row['p50_ms']:>8} ms  "
+              f"p99 {row['p99_ms']:>8} ms  hata {row['errors']}")
+
+    output = args.output or os.path.join(scenarios.RESULTS_DIR, f"{report['commit']}-login-{args.driver}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"rapor: {output}")
+
+
+if __name__ == "__main__":
+    main()
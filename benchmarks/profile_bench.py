@@ -0,0 +1,70 @@
+"""Profil sayfası gecikmesi vs. kullanıcının fotoğraf sayısı.
+
+Çalıştırma (proje kökünden):
+
+    python benchmarks/profile_bench.py
+
+Her boyut için boş bir SQLite veritabanı kurulur, tek kullanıcıya N fotoğraf
+eklenir ve /profile ile en derin /get_user_photos sayfası ölçülür. Keyset
+sayfalama sayesinde sonuçların N'den bağımsız (düz) kalması beklenir.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+tmp_dir = tempfile.mkdtemp(prefix="verzia-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+os.environ.setdefault("BLOB_STORE_PATH", os.path.join(tmp_dir, "blobs"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Photo  # noqa: E402
+
+SIZES = (10, 100, 1000, 10000)
+REQUESTS = 50
+
+
+def seed(photo_count):
+    db.drop_all()
+    db.create_all()
+    user = User(username="bench", email="bench@example.com")
+    user.set_password("bench")
+    db.session.add(user)
+    db.session.commit()
+    fake_hash = "0" * 64
+    db.session.execute(
+        db.insert(Photo),
+        [{"title": "Verzia Moment", "filename": fake_hash, "blob_hash": fake_hash, "owner_id": user.id}
+         for _ in range(photo_count)],
+    )
+    db.session.commit()
+    return db.session.query(db.func.min(Photo.id)).scalar()
+
+
+def measure(client, url):
+    client.get(url)  # ısınma
+    timings = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    print(f"{'fotoğraf':>10} {'profile p50':>12} {'profile p99':>12} {'son sayfa p50':>14}")
+    for size in SIZES:
+        with app.app_context():
+            oldest_id = seed(size)
+        client = app.test_client()
+        client.post("/login", data={"username": "bench", "password": "bench"})
+        p50, p99 = measure(client, "/profile/bench")
+        deep_p50, _ = measure(client, f"/get_user_photos/bench?before_id={oldest_id + 24}")
+        print(f"{size:>10} {p50:>10.2f}ms {p99:>10.2f}ms {deep_p50:>12.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Senaryo bazlı yük testi: throughput / p50 / p99 raporu.
+
+Çalıştırma (proje kökünden):
+
+    python benchmarks/scenarios.py                          # Flask test client, process içinde
+    python benchmarks/scenarios.py --driver gunicorn        # gerçek gunicorn (gunicorn.conf.py)
+    python benchmarks/scenarios.py --driver http --url http://127.0.0.1:5001 --no-seed
+    python benchmarks/scenarios.py --compare benchmarks/results/<commit>.json
+
+Önce seed.py ile (aynı --seed ile) veri üretilir, sonra her senaryo
+--concurrency sanal kullanıcıyla --requests istek atar. Her sanal kullanıcı
+rastgele bir seed kullanıcısıyla giriş yapar. Rapor JSON olarak
+benchmarks/results/<commit>-<driver>.json'a yazılır; --compare verilen eski
+raporla senaryo senaryo fark yüzdesini gösterir.
+
+gunicorn sürücüsü sunucuyu bu veritabanı ve blob diziniyle başlatır. SQLite'ta
+worker'lar aynı dosyaya yazdığı için like_photo p99'u kilit beklemeleriyle
+şişer; karşılaştırılabilir sonuç için BENCH_DATABASE_URL ile PostgreSQL verin.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import quote, urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seed  # noqa: E402  (DATABASE_URL / BLOB_STORE_PATH ortamını o ayarlıyor)
+from seed import app, db, User, Photo  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+# --------------------- SENARYOLAR ---------------------
+# Her senaryo (rng, veri) alır, (method, path, form) döner
+class Dataset:
+    def __init__(self):
+        with app.app_context():
+            rows = db.session.query(User.id, User.username, User.follower_count).all()
+            self.usernames = [row.username for row in rows]
+            # Profil ziyaretleri de popülerliğe göre dağılsın
+            self.profile_weights = [row.follower_count + 1 for row in rows]
+            self.photo_ids = [row.id for row in db.session.query(Photo.id)]
+
+
+def profile(rng, data):
+    return "GET", "/profile/" + quote(rng.choices(data.usernames, weights=data.profile_weights)[0]), None
+
+
+def like_photo(rng, data):
+    return "POST", f"/like/{rng.choice(data.photo_ids)}", None
+
+
+def get_post_details(rng, data):
+    return "GET", f"/get_post_details/{rng.choice(data.photo_ids)}", None
+
+
+def search_users(rng, data):
+    username = rng.choice(data.usernames)
+    return "GET", "/search_users?" + urlencode({"q": username[:rng.randint(2, 5)]}), None
+
+
+def notifications(rng, data):
+    return "GET", "/notifications", None
+
+
+# Şifre özeti ağırlıklı: login_pool.py bunu havuz boyutlarıyla tarıyor
+def login(rng, data):
+    return "POST", "/login", {"username": rng.choice(data.usernames), "password": seed.PASSWORD}
+
+
+SCENARIOS = {f.__name__: f for f in (profile, like_photo, get_post_details, search_users, notifications, login)}
+
+
+# --------------------- SÜRÜCÜLER ---------------------
+class ClientSession:
+    def __init__(self):
+        self.client = app.test_client()
+
+    def request(self, method, path, form=None):
+        return self.client.open(path, method=method, data=form).status_code
+
+
+# Kalıcı bağlantı + elle çerez: urllib her istekte yeni bağlantı açıyor
+class HttpSession:
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        self.cookies = {}
+
+    def request(self, method, path, form=None):
+        headers = {"Cookie": "; ".join(f"{k}={v}" for k, v in self.cookies.items())}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            return 599
+        for header in response.headers.get_all("Set-Cookie") or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status
+
+
+def start_gunicorn(port, **env_overrides):
+    env = dict(os.environ, PORT=str(port), **env_overrides)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}", "app:app"],
+        cwd=ROOT, env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn başlamadı (kurulu mu?)")
+        try:
+            if HttpSession(f"http://127.0.0.1:{port}").request("GET", "/healthz") == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError("gunicorn 30 saniyede hazır olmadı")
+
+
+# --------------------- ÇALIŞTIRMA ---------------------
+def run_scenario(name, make_session, data, requests, concurrency, rng_seed):
+    scenario = SCENARIOS[name]
+    per_worker = max(1, requests // concurrency)
+
+    def worker(index):
+        rng = random.Random(f"{rng_seed}:{name}:{index}")
+        session = make_session()
+        form = {"username": rng.choice(data.usernames), "password": seed.PASSWORD}
+        status = session.request("POST", "/login", form)
+        # Şifre havuzu doluysa 503 (Retry-After); gerçek istemci gibi tekrar dene
+        for _ in range(10):
+            if status != 503:
+                break
+            time.sleep(0.5)
+            status = session.request("POST", "/login", form)
+        if status != 200:
+            raise RuntimeError(f"giriş başarısız ({status})")
+        timings, errors = [], 0
+        for _ in range(per_worker):
+            method, path, form = scenario(rng, data)
+            start = time.perf_counter()
+            status = session.request(method, path, form)
+            timings.append((time.perf_counter() - start) * 1000)
+            errors += status >= 400
+        return timings, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    timings = sorted(t for ts, _ in results for t in ts)
+    return {
+        "requests": len(timings),
+        "errors": sum(e for _, e in results),
+        "throughput": round(len(timings) / elapsed, 1),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p90_ms": round(timings[int(len(timings) * 0.90) - 1], 2),
+        "p99_ms": round(timings[max(0, int(len(timings) * 0.99) - 1)], 2),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(report, baseline=None):
+    print(f"commit {report['commit']}  sürücü {report['driver']}  db {report['database']}  "
+          f"eşzamanlılık {report['concurrency']}")
+    header = f"{'senaryo':>18} {'istek/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'hata':>5}"
+    print(header)
+    for name, row in report["scenarios"].items():
+        line = f"{name:>18} {row['throughput']:>9} {row['p50_ms']:>9} {row['p99_ms']:>9} {row['errors']:>5}"
+        old = (baseline or {}).get("scenarios", {}).get(name)
+        if old:
+            def delta(key):
+                return f"{(row[key] - old[key]) / old[key] * 100:+.0f}%" if old[key] else "-"
+            line += f"   (önceki {baseline['commit']}: istek/s {delta('throughput')}, p50 {delta('p50_ms')}, p99 {delta('p99_ms')})"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--driver", choices=("client", "gunicorn", "http"), default="client")
+    parser.add_argument("--url", help="--driver http için hedef sunucu")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="tekrarlanabilir; varsayılan hepsi")
+    parser.add_argument("--requests", type=int, default=400, help="senaryo başına")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--no-seed", action="store_true", help="BENCH_DATABASE_URL'deki mevcut veriyi kullan")
+    parser.add_argument("--output", help="varsayılan benchmarks/results/<commit>-<driver>.json")
+    parser.add_argument("--compare", help="karşılaştırılacak eski rapor (JSON)")
+    seed.add_arguments(parser)
+    args = parser.parse_args()
+
+    seed_params = {name: getattr(args, name) for name in seed.DEFAULTS}
+    if not args.no_seed:
+        with app.app_context():
+            sizes = seed.seed_graph(**seed_params)
+        print("seed: " + ", ".join(f"{k}={v}" for k, v in sizes.items()))
+    data = Dataset()
+
+    server = None
+    if args.driver == "client":
+        make_session = ClientSession
+    else:
+        if args.driver == "gunicorn":
+            server = start_gunicorn(args.port)
+            base_url = f"http://127.0.0.1:{args.port}"
+        else:
+            base_url = args.url or parser.error("--driver http için --url gerekli")
+        make_session = lambda: HttpSession(base_url)  # noqa: E731
+
+    report = {
+        "commit": git_commit(), "driver": args.driver, "database": app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0],
+        "concurrency": args.concurrency, "seed": seed_params, "scenarios": {},
+    }
+    try:
+        for name in args.scenario or SCENARIOS:
+            report["scenarios"][name] = run_scenario(name, make_session, data, args.requests, args.concurrency, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}-{args.driver}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"rapor: {output}")
+
+
+if __name__ == "__main__":
+    main()
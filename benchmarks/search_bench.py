@@ -0,0 +1,93 @@
+"""Kullanıcı araması gecikmesi, 1M kullanıcıda.
+
+Çalıştırma (proje kökünden):
+
+    python benchmarks/search_bench.py
+    BENCH_USERS=100000 python benchmarks/search_bench.py
+
+Boş bir SQLite veritabanına N kullanıcı eklenir (FTS5 tetikleyicileri
+dahil), arayan kullanıcı bir kısmını takip eder. Her sorgu türü (tam, kısa
+önek, uzun önek, içinde geçen, Türkçe büyük harf) için find_users()
+doğrudan ölçülür; hedef p99 < 10ms.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+tmp_dir = tempfile.mkdtemp(prefix="verzia-bench-")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{tmp_dir}/bench.db")
+os.environ.setdefault("BLOB_STORE_PATH", os.path.join(tmp_dir, "blobs"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User  # noqa: E402
+from models.user import followers_association  # noqa: E402
+from services.search import find_users  # noqa: E402
+from services.text import turkish_lower  # noqa: E402
+
+USERS = int(os.environ.get("BENCH_USERS", 1_000_000))
+BATCH = 20_000
+REQUESTS = 200
+SYLLABLES = ("ka", "ya", "de", "niz", "ece", "ır", "mak", "şe", "lin", "ço", "gül", "ay", "Işı", "İl", "ba", "tu")
+QUERIES = {
+    "tam": "denizkaya",
+    "kısa önek": "de",
+    "uzun önek": "denizk",
+    "içinde": "nizmak",
+    "Türkçe büyük": "IŞIL",
+    "sonuçsuz": "qxqxq",
+}
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    rng = random.Random(42)
+    db.session.execute(db.insert(User), [{
+        "username": "bakan", "username_search": "bakan", "email": "bakan@example.com", "password": "-",
+    }])
+    for start in range(0, USERS, BATCH):
+        rows = []
+        for i in range(start, min(start + BATCH, USERS)):
+            username = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + str(i)
+            rows.append({"username": username, "username_search": turkish_lower(username),
+                         "email": f"u{i}@example.com", "password": "-"})
+        db.session.execute(db.insert(User), rows)
+        db.session.commit()
+    db.session.execute(db.insert(User), [{
+        "username": "denizkaya", "username_search": "denizkaya", "email": "dk@example.com", "password": "-",
+    }])
+    viewer_id = db.session.query(User.id).filter_by(username="bakan").scalar()
+    db.session.execute(followers_association.insert(), [
+        {"follower_id": viewer_id, "followed_id": followed_id} for followed_id in range(2, USERS, 97)
+    ])
+    db.session.commit()
+    return viewer_id
+
+
+def measure(q, viewer_id):
+    find_users(q, viewer_id=viewer_id)  # ısınma
+    timings = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        find_users(q, viewer_id=viewer_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    with app.app_context():
+        start = time.perf_counter()
+        viewer_id = seed()
+        print(f"{USERS} kullanıcı {time.perf_counter() - start:.0f}s içinde eklendi")
+        print(f"{'sorgu':>14} {'p50':>9} {'p99':>9}")
+        for name, q in QUERIES.items():
+            p50, p99 = measure(q, viewer_id)
+            print(f"{name:>14} {p50:>7.2f}ms {p99:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Gerçekçi sentetik veri üretici (benchmark senaryoları için).
+
+Çalıştırma (proje kökünden):
+
+    python benchmarks/seed.py --users 10000
+    BENCH_DATABASE_URL=postgresql://... python benchmarks/seed.py --users 100000
+
+Veritabanı sıfırlanır (drop_all / create_all) ve şunlar yazılır:
+- N kullanıcı (şifre hepsinde "bench"), Türkçe heceli kullanıcı adları
+- güç yasası takip grafiği: k. sıradaki hesabın takipçi ağırlığı 1/(k+1)^alpha,
+  böylece birkaç ünlü hesap ve uzun bir az takipçili kuyruk oluşur
+- kullanıcı başına fotoğraf, fotoğraf başına beğeni ve yorum, kullanıcı
+  başına bildirim (bir kısmı okunmamış)
+Sayaçlar (follower_count, like_count, ...) üretilen satırlarla tutarlı yazılır.
+Aynı --seed aynı veriyi üretir; commit'ler arası karşılaştırma buna dayanıyor.
+"""
+import argparse
+import io
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+tmp_dir = tempfile.mkdtemp(prefix="verzia-bench-")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{tmp_dir}/bench.db")
+os.environ.setdefault("BLOB_STORE_PATH", os.path.join(tmp_dir, "blobs"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from app import app, db, User, Photo, Comment, Like, Notification  # noqa: E402
+from models.user import followers_association  # noqa: E402
+from services.notifications import build_message  # noqa: E402
+from services.storage import get_blob_store  # noqa: E402
+from services.text import turkish_lower  # noqa: E402
+
+SYLLABLES = ["ay", "şe", "can", "de", "niz", "ka", "ya", "el", "if", "ber", "il", "ec", "em", "cem", "re",
+             "öz", "gür", "mert", "su", "na", "ırmak", "tu", "ğba", "ye", "şim", "ali", "ve", "li", "zey", "nep"]
+COMMENTS = ["Harika! ✨", "Çok güzel olmuş", "Bayıldım", "Efsane kare", "Renkler muhteşem", "👏👏", "Neresi burası?"]
+BATCH = 5000
+PASSWORD = "bench"
+
+DEFAULTS = {
+    "users": 2000,
+    "alpha": 1.1,  # güç yasası üssü: büyüdükçe takipçiler birkaç hesapta toplanır
+    "following": 30,  # kullanıcı başına ortalama takip
+    "photos": 6,  # kullanıcı başına ortalama fotoğraf
+    "likes": 8,  # fotoğraf başına ortalama beğeni
+    "comments": 2,  # fotoğraf başına ortalama yorum
+    "notifications": 25,  # kullanıcı başına bildirim
+    "unread": 0.3,  # okunmamış bildirim oranı
+    "seed": 42,
+}
+
+
+def _insert(table, rows):
+    for start in range(0, len(rows), BATCH):
+        db.session.execute(db.insert(table), rows[start:start + BATCH])
+    db.session.commit()
+
+
+def _sample_blob():
+    buf = io.BytesIO()
+    Image.new("RGB", (1080, 1080), (191, 149, 63)).save(buf, "JPEG", quality=80)
+    buf.seek(0)
+    blob_hash, _ = get_blob_store().put_stream(buf)
+    return blob_hash
+
+
+# Ortalama mean olan, 0 ile 4*mean arasında kırpılmış üstel dağılım
+def _count(rng, mean):
+    return min(int(rng.expovariate(1 / mean)), 4 * mean) if mean else 0
+
+
+# Bağlamda (app_context) çağrılır; üretilen boyutları döner
+def seed_graph(**params):
+    p = {**DEFAULTS, **params}
+    rng = random.Random(p["seed"])
+    n = p["users"]
+    db.drop_all()
+    db.create_all()
+
+    # Şifre özeti tek sefer: pbkdf2'yi N kez hesaplamak seed süresini domine eder
+    probe = User(username="-", email="-")
+    probe.set_password(PASSWORD)
+    users = []
+    for i in range(n):
+        username = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))) + str(i)
+        users.append({"username": username, "username_search": turkish_lower(username),
+                      "email": f"bench{i}@example.com", "password": probe.password})
+    _insert(User, users)
+    user_ids = [row.id for row in db.session.query(User.id).order_by(User.id)]
+    usernames = [u["username"] for u in users]
+
+    # Takip grafiği; sıralama rastgele, kullanıcı id'si popülerlikle ilişkili olmasın
+    ranking = user_ids[:]
+    rng.shuffle(ranking)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** p["alpha"] for rank in range(n)))
+    follower_counts = dict.fromkeys(user_ids, 0)
+    following_counts = dict.fromkeys(user_ids, 0)
+    edges = 0
+    rows = []
+    for follower_id in user_ids:
+        want = min(_count(rng, p["following"]), n - 1)
+        targets = set(rng.choices(ranking, cum_weights=cum_weights, k=want * 2)) - {follower_id}
+        for followed_id in itertools.islice(targets, want):
+            rows.append({"follower_id": follower_id, "followed_id": followed_id})
+            follower_counts[followed_id] += 1
+        following_counts[follower_id] = min(len(targets), want)
+        if len(rows) >= BATCH:
+            edges += len(rows)
+            _insert(followers_association, rows)
+            rows = []
+    edges += len(rows)
+    _insert(followers_association, rows)
+    db.session.execute(
+        User.__table__.update().where(User.id == db.bindparam("uid")).values(
+            follower_count=db.bindparam("followers"), following_count=db.bindparam("following")),
+        [{"uid": uid, "followers": follower_counts[uid], "following": following_counts[uid]} for uid in user_ids],
+    )
+    db.session.commit()
+
+    # Fotoğraflar, beğeni / yorum sayıları satır eklenmeden önce belli
+    blob_hash = _sample_blob()
+    photo_rows, plans = [], []
+    for owner_id in user_ids:
+        for _ in range(_count(rng, p["photos"])):
+            likes, comments = min(_count(rng, p["likes"]), n), _count(rng, p["comments"])
+            photo_rows.append({"title": "Verzia Moment", "filename": blob_hash, "blob_hash": blob_hash,
+                               "mimetype": "image/jpeg", "width": 1080, "height": 1080, "owner_id": owner_id,
+                               "like_count": likes, "comment_count": comments})
+            plans.append((owner_id, likes, comments))
+    _insert(Photo, photo_rows)
+    photo_ids = [row.id for row in db.session.query(Photo.id).order_by(Photo.id)]
+
+    like_rows, comment_rows = [], []
+    for photo_id, (owner_id, likes, comments) in zip(photo_ids, plans):
+        for user_id in rng.sample(user_ids, likes):
+            like_rows.append({"user_id": user_id, "photo_id": photo_id})
+        for _ in range(comments):
+            comment_rows.append({"body": rng.choice(COMMENTS), "user_id": rng.choice(user_ids), "photo_id": photo_id})
+    _insert(Like, like_rows)
+    _insert(Comment, comment_rows)
+
+    # Okunmamış oranı okundu işaretiyle: kullanıcının ilk (1 - unread) kısmı okunmuş
+    notification_rows = []
+    for user_id in user_ids:
+        for _ in range(p["notifications"]):
+            notif_type = rng.choice(("like", "comment", "follow"))
+            sender = rng.choice(usernames)
+            notification_rows.append({
+                "user_id": user_id, "sender_username": sender, "notif_type": notif_type,
+                "photo_id": rng.choice(photo_ids) if notif_type != "follow" and photo_ids else None,
+                "message": build_message(sender, 1, notif_type),
+            })
+    _insert(Notification, notification_rows)
+    read = int(p["notifications"] * (1 - p["unread"]))
+    notification_ids = [row.id for row in db.session.query(Notification.id).order_by(Notification.id)]
+    db.session.execute(
+        User.__table__.update().where(User.id == db.bindparam("uid")).values(notifications_read_upto=db.bindparam("upto")),
+        [{"uid": uid, "upto": notification_ids[i * p["notifications"] + read - 1] if read else 0}
+         for i, uid in enumerate(user_ids)],
+    )
+    db.session.commit()
+
+    return {"users": n, "follows": edges, "photos": len(photo_ids), "likes": len(like_rows),
+            "comments": len(comment_rows), "notifications": len(notification_rows),
+            "max_followers": max(follower_counts.values(), default=0)}
+
+
+def add_arguments(parser):
+    for name, value in DEFAULTS.items():
+        parser.add_argument(f"--{name}", type=type(value), default=value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args()
+    with app.app_context():
+        start = time.perf_counter()
+        sizes = seed_graph(**vars(args))
+    print(f"{os.environ['DATABASE_URL']} ({time.perf_counter() - start:.1f}s)")
+    for name, value in sizes.items():
+        print(f"{name:>15}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Eşzamanlı 20MB yüklemelerde worker belleği (RSS).
+
+Çalıştırma (proje kökünden):
+
+    python benchmarks/upload_bench.py
+
+~20MB'lık gerçek bir JPEG üretilir ve multipart gövdesi diske yazılır. İstek gövdesi WSGI'ye dosyadan akıtılır,
+yani ölçülen bellek sadece sunucu tarafının tuttuğu kadardır. Yükleme yolu
+dosyayı belleğe almadığı sürece tepe RSS artışı dosya boyutu × eşzamanlılık
+yerine birkaç MB'ta kalmalıdır.
+"""
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+tmp_dir = tempfile.mkdtemp(prefix="verzia-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+os.environ.setdefault("BLOB_STORE_PATH", os.path.join(tmp_dir, "blobs"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User  # noqa: E402
+
+WIDTH, HEIGHT = 3600, 2700  # quality=100 gürültü ≈ 20MB
+THREADS = 8
+UPLOADS_PER_THREAD = 2
+BOUNDARY = "verziabench"
+
+
+# Gürültülü, yüksek kaliteli bir JPEG ~20MB eder ve gerçek bir fotoğraf gibi
+# çoğu entropi kodlu tarama verisidir. Ayrı process'te üretiliyor ki
+# ölçülen tepe RSS'e karışmasın.
+def write_jpeg():
+    path = os.path.join(tmp_dir, "photo.jpg")
+    script = (
+        "import os, sys; from PIL import Image; "
+        f"Image.frombytes('RGB', ({WIDTH}, {HEIGHT}), os.urandom({WIDTH * HEIGHT * 3}))"
+        ".save(sys.argv[1], 'JPEG', quality=100)"
+    )
+    subprocess.run([sys.executable, "-c", script, path], check=True)
+    return path
+
+
+def write_body(jpeg_path, index):
+    path = os.path.join(tmp_dir, f"body-{index}.bin")
+    with open(path, "wb") as out, open(jpeg_path, "rb") as jpeg:
+        out.write(f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"photo\"; filename=\"{index}.jpg\"\r\n"
+                  "Content-Type: image/jpeg\r\n\r\n".encode())
+        shutil.copyfileobj(jpeg, out)
+        # EOI sonrası birkaç bayt: her yükleme farklı blob olsun (dedup devreye girmesin)
+        out.write(index.to_bytes(4, "big"))
+        out.write(f"\r\n--{BOUNDARY}--\r\n".encode())
+    return path
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    # Varyantlar üretimdeki gibi arka plan havuzunda (THUMBNAIL_WORKERS) üretilir
+    app.config.update(NOTIFICATIONS_INLINE=True, FEED_INLINE=True)
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench", email="bench@example.com")
+        user.set_password("bench")
+        db.session.add(user)
+        db.session.commit()
+    jpeg_path = write_jpeg()
+    file_mb = os.path.getsize(jpeg_path) / (1024 * 1024)
+    bodies = [write_body(jpeg_path, i) for i in range(THREADS * UPLOADS_PER_THREAD)]
+
+    def worker(paths):
+        client = app.test_client()
+        client.post("/login", data={"username": "bench", "password": "bench"})
+        for path in paths:
+            with open(path, "rb") as body:
+                response = client.post("/upload", input_stream=body, content_length=os.path.getsize(path),
+                                       content_type=f"multipart/form-data; boundary={BOUNDARY}",
+                                       headers={"Accept": "application/json"})
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+    worker([])  # ısınma: import'lar, bağlantı havuzu
+    before = rss_mb()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(worker, [bodies[i::THREADS] for i in range(THREADS)]))
+    upload_elapsed = time.perf_counter() - start
+    after_uploads = rss_mb()
+    app.extensions["thumbnail_pool"].shutdown(wait=True)
+    elapsed = time.perf_counter() - start
+    after = rss_mb()
+    total_mb = file_mb * len(bodies)
+    print(f"{len(bodies)} x {file_mb:.1f}MB yükleme, {THREADS} eşzamanlı: {upload_elapsed:.1f}s "
+          f"({total_mb / upload_elapsed:.0f} MB/s), varyantlarla birlikte {elapsed:.1f}s")
+    print(f"tepe RSS: başta {before:.0f}MB, yüklemeler bitince {after_uploads:.0f}MB, varyantlarla {after:.0f}MB "
+          f"(dosyalar bellekte tutulsaydı yüklemeler tek başına ≥ {file_mb * THREADS:.0f}MB eklerdi)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import io
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from extensions import db
+from models.photo import BlobTombstone, Photo
+from services.blobs import sweep_blobs
+from services.storage import get_blob_store
+
+JSON = {"Accept": "application/json"}
+
+
+def _png():
+    buf = io.BytesIO()
+    Image.new("RGB", (40, 30), (191, 149, 63)).save(buf, "PNG")
+    buf.seek(0)
+    return buf
+
+
+def _upload(client):
+    response = client.post("/upload", data={"photo": (_png(), "a.png")}, headers=JSON)
+    return db.session.get(Photo, response.get_json()["photos"][0])
+
+
+def _later():
+    return datetime.utcnow() + timedelta(days=1)
+
+
+def test_released_blob_waits_for_grace_period(app, client, make_user, login):
+    make_user("sahip")
+    login(client, "sahip")
+    photo = _upload(client)
+    blob_hashes = [photo.blob_hash] + [v.blob_hash for v in photo.variants]
+    assert client.post(f"/delete_photo/{photo.id}").get_json()["status"] == "success"
+
+    assert BlobTombstone.query.count() == len(blob_hashes) == 3
+    assert sweep_blobs() == 0
+    assert all(get_blob_store().exists(blob_hash) for blob_hash in blob_hashes)
+
+    assert sweep_blobs(now=_later()) == 3
+    assert not any(get_blob_store().exists(blob_hash) for blob_hash in blob_hashes)
+    assert BlobTombstone.query.count() == 0
+
+
+# Eşzamanlı yükleme işaret yazılmadan önce aynı blob'a bağlanmış, sonra commit etmiş
+def test_sweep_keeps_blob_referenced_after_release(app, client, make_user, login):
+    owner = make_user("sahip")
+    login(client, "sahip")
+    photo = _upload(client)
+    blob_hash = photo.blob_hash
+    client.post(f"/delete_photo/{photo.id}")
+    db.session.add(Photo(title="Verzia Moment", filename=blob_hash, blob_hash=blob_hash, owner_id=owner.id))
+    db.session.commit()
+
+    # Sadece artık kimsenin kullanmadığı varyantlar silinir
+    assert sweep_blobs(now=_later()) == 2
+    assert get_blob_store().exists(blob_hash)
+    assert BlobTombstone.query.count() == 0
+
+
+def test_upload_claims_a_released_blob(app, client, make_user, login):
+    make_user("sahip")
+    login(client, "sahip")
+    photo = _upload(client)
+    blob_hash = photo.blob_hash
+    client.post(f"/delete_photo/{photo.id}")
+
+    again = _upload(client)
+    assert again.blob_hash == blob_hash
+    assert not any(db.session.get(BlobTombstone, h) for h in [blob_hash] + [v.blob_hash for v in again.variants])
+    assert sweep_blobs(now=_later()) == 0
+
+    # Temizlik dosyayı silmişse aynı içerik yeniden yazılır
+    client.post(f"/delete_photo/{again.id}")
+    assert sweep_blobs(now=_later()) == 3
+    assert _upload(client).blob_hash == blob_hash
+    assert get_blob_store().exists(blob_hash)
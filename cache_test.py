@@ -0,0 +1,79 @@
+import os
+import runpy
+
+import pytest
+
+from extensions import db
+from models.user import User
+from services.cache import RedisCache
+from services.notifications import unread_count
+
+
+GUNICORN_CONF = os.path.join(os.path.dirname(__file__), "gunicorn.conf.py")
+
+
+def test_redis_cache_round_trips(fake_redis):
+    cache = RedisCache(client=fake_redis, prefix="t:")
+    assert cache.get("yok") is None
+    assert cache.incr("yok") is None and cache.get("yok") is None
+
+    cache.set("sayi", 3)
+    assert fake_redis.data["t:sayi"][0] == b"3"
+    assert cache.incr("sayi", 2) == 5 and cache.get("sayi") == 5
+    assert cache.incr("sayi", -5) == 0
+
+    cache.set("nesne", {"photos": [1, 2], "next": None})
+    assert cache.get("nesne") == {"photos": [1, 2], "next": None}
+
+    cache.delete("sayi")
+    assert cache.get("sayi") is None and cache.incr("sayi") is None
+
+
+def test_unread_count_is_shared_between_workers(app, client, make_user, login, fake_redis, monkeypatch, count_queries):
+    owner = make_user("sahip")
+    make_user("hayran")
+    owner_id = owner.id
+    worker_a, worker_b = RedisCache(client=fake_redis), RedisCache(client=fake_redis)
+
+    monkeypatch.setitem(app.extensions, "cache", worker_a)
+    assert unread_count(owner_id) == 0
+
+    # Takip başka worker'da: bildirim sayacı ortak önbellekte artar
+    monkeypatch.setitem(app.extensions, "cache", worker_b)
+    login(client, "hayran")
+    assert client.post("/follow/sahip").get_json()["status"] == "followed"
+
+    monkeypatch.setitem(app.extensions, "cache", worker_a)
+    with count_queries() as statements:
+        assert unread_count(owner_id) == 1
+    assert statements == []
+
+    client.get("/logout")
+    login(client, "sahip")
+    assert len(client.get("/notifications").get_json()) == 1
+    assert db.session.get(User, owner_id).notifications_read_upto > 0
+
+    monkeypatch.setitem(app.extensions, "cache", worker_b)
+    assert unread_count(owner_id) == 0
+
+
+@pytest.mark.parametrize("env, workers", [
+    ({}, 1),
+    ({"WEB_CONCURRENCY": "1"}, 1),
+    ({"WEB_CONCURRENCY": "3", "CACHE_BACKEND": "redis", "PUBSUB_BACKEND": "redis"}, 3),
+    ({"CACHE_BACKEND": "redis", "PUBSUB_BACKEND": "postgres"}, 2),
+])
+def test_gunicorn_workers_follow_backends(monkeypatch, env, workers):
+    for name in ("WEB_CONCURRENCY", "CACHE_BACKEND", "PUBSUB_BACKEND"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert runpy.run_path(GUNICORN_CONF)["workers"] == workers
+
+
+def test_gunicorn_refuses_workers_with_memory_cache(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    monkeypatch.delenv("CACHE_BACKEND", raising=False)
+    monkeypatch.setenv("PUBSUB_BACKEND", "redis")
+    with pytest.raises(RuntimeError, match="CACHE_BACKEND=redis"):
+        runpy.run_path(GUNICORN_CONF)
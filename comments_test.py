@@ -0,0 +1,103 @@
+from flask import g
+
+from extensions import db
+from models.photo import Photo
+from models.user import User, Comment
+
+
+def _photo_with_comments(owner, comment_count):
+    photo = Photo(title="Verzia Moment", filename="x", owner_id=owner.id)
+    db.session.add(photo)
+    db.session.commit()
+    authors = [User(username=f"yazar{photo.id}_{i}", email=f"yazar{photo.id}_{i}@example.com", password="-")
+               for i in range(min(comment_count, 25))]
+    db.session.add_all(authors)
+    db.session.flush()
+    for i in range(comment_count):
+        db.session.add(Comment(body=f"yorum {i}", user_id=authors[i % len(authors)].id, photo_id=photo.id))
+    db.session.commit()
+    return photo
+
+
+def test_post_details_query_count_is_constant(client, make_user, login, count_queries):
+    owner = make_user("sahip")
+    small = _photo_with_comments(owner, 3)
+    large = _photo_with_comments(owner, 500)
+    login(client, "sahip")
+
+    with count_queries() as small_statements:
+        assert client.get(f"/get_post_details/{small.id}").status_code == 200
+    with count_queries() as large_statements:
+        response = client.get(f"/get_post_details/{large.id}")
+
+    assert response.status_code == 200
+    assert len(large_statements) == len(small_statements)
+    assert len(response.json["comments"]) == 20
+
+
+def test_comment_pages_cover_all_comments_in_order(client, make_user, login):
+    owner = make_user("sahip")
+    photo = _photo_with_comments(owner, 45)
+    login(client, "sahip")
+
+    bodies, after_id = [], None
+    while True:
+        url = f"/get_comments/{photo.id}?limit=20" + (f"&after_id={after_id}" if after_id else "")
+        data = client.get(url).json
+        bodies += [c["text"] for c in data["comments"]]
+        after_id = data["next_after_id"]
+        if not after_id:
+            break
+
+    assert bodies == [f"yorum {i}" for i in range(45)]
+
+
+def test_comment_page_continues_after_deleted_cursor(client, make_user, login):
+    owner = make_user("sahip")
+    photo = _photo_with_comments(owner, 30)
+    login(client, "sahip")
+
+    after_id = client.get(f"/get_comments/{photo.id}?limit=10").json["next_after_id"]
+    assert client.post(f"/delete_comment/{after_id}").get_json()["status"] == "success"
+    data = client.get(f"/get_comments/{photo.id}?limit=10&after_id={after_id}").json
+    assert [c["text"] for c in data["comments"]] == [f"yorum {i}" for i in range(10, 20)]
+    assert data["next_after_id"] is not None
+
+
+def test_batch_post_details_query_count_is_constant(client, make_user, login, count_queries):
+    owner = make_user("sahip")
+    one = [_photo_with_comments(owner, 3)]
+    many = [_photo_with_comments(owner, n) for n in (0, 5, 30, 45)]
+    login(client, "sahip")
+    client.post(f"/like/{many[2].id}")
+    one_ids, many_ids = [p.id for p in one], [p.id for p in many]
+    # Test client fixture'ın g'sini paylaşıyor; oturum kimliği önceden yüklensin
+    g.pop("_login_user", None)
+    client.get("/get_post_details/batch?ids=999999")
+
+    with count_queries() as one_statements:
+        assert client.get(f"/get_post_details/batch?ids={one_ids[0]}").status_code == 200
+    with count_queries() as many_statements:
+        response = client.get("/get_post_details/batch?ids=" + ",".join(map(str, many_ids + [999999])))
+    assert response.status_code == 200
+    assert len(many_statements) == len(one_statements)
+
+    posts = response.json["posts"]
+    assert sorted(map(int, posts)) == many_ids
+    assert [len(posts[str(i)]["comments"]) for i in many_ids] == [0, 5, 20, 20]
+    assert [posts[str(i)]["is_liked"] for i in many_ids] == [False, False, True, False]
+    assert posts[str(many_ids[2])]["next_after_id"] is not None and posts[str(many_ids[1])]["next_after_id"] is None
+
+    # Tekli uç aynı önbellek girişini kullanıyor: modal açılışında sorgu yok
+    with count_queries() as statements:
+        single = client.get(f"/get_post_details/{many_ids[3]}")
+    assert single.json == posts[str(many_ids[3])]
+    assert not any("FROM comment" in s for s in statements)
+
+
+def test_batch_post_details_rejects_bad_ids(client, make_user, login):
+    make_user("sahip")
+    login(client, "sahip")
+    assert client.get("/get_post_details/batch?ids=").status_code == 400
+    assert client.get("/get_post_details/batch?ids=1,x").status_code == 400
+    assert client.get("/get_post_details/batch?ids=" + ",".join(map(str, range(1, 40)))).status_code == 400
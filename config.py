@@ -1,14 +1,106 @@
 import os
 
+
+# Railway "postgres://" veriyor, SQLAlchemy "postgresql://" istiyor
+def _database_url(name):
+    url = os.environ.get(name)
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def _flag(name, default):
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "supersecretkey")
 
-    DATABASE_URL = os.environ.get("DATABASE_URL")
+    # -------- VERİTABANI --------
+    SQLALCHEMY_DATABASE_URI = _database_url("DATABASE_URL") or "sqlite:///verzia_local.db"
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Boş değilse @read_replica işaretli GET'ler buradan okur
+    SQLALCHEMY_REPLICA_URI = _database_url("DATABASE_REPLICA_URL")
+    # Worker başına; gevent'te eşzamanlı sorgu sayısını da bu sınırlıyor
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 10))  # havuz doluysa bekleme (sn)
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))  # sunucu/proxy boşta bağlantıyı kesmeden yenile
+    DB_POOL_PRE_PING = _flag("DB_POOL_PRE_PING", True)
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 5000))  # 0 = sınırsız
+    # PgBouncer transaction modu: havuzu PgBouncer tutar, uygulama NullPool kullanır
+    DB_PGBOUNCER = _flag("DB_PGBOUNCER", False)
+    # Yazan kullanıcı bu kadar saniye birincilden okur (replika gecikmesi)
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))
 
-    if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
-        DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+    # -------- BLOB DEPOSU (FOTOĞRAF DOSYALARI) --------
+    BLOB_STORE = os.environ.get("BLOB_STORE", "local")  # "local" veya "s3"
+    BLOB_STORE_PATH = os.environ.get("BLOB_STORE_PATH")  # boşsa instance/blobs
+    S3_BUCKET = os.environ.get("S3_BUCKET")
+    S3_PREFIX = os.environ.get("S3_PREFIX", "")
+    S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL")  # MinIO vb. için
+    MEDIA_MAX_AGE = int(os.environ.get("MEDIA_MAX_AGE", 31536000))
+    THUMBNAIL_WORKERS = int(os.environ.get("THUMBNAIL_WORKERS", 2))
+    # Referansı kalmayan blob en az bu kadar bekler (eşzamanlı aynı içerikli yükleme commit etsin)
+    BLOB_DELETE_GRACE_SECONDS = int(os.environ.get("BLOB_DELETE_GRACE_SECONDS", 3600))
 
-    SQLALCHEMY_DATABASE_URI = DATABASE_URL
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # -------- YÜKLEME SINIRLARI --------
+    MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 20 * 1024 * 1024))  # dosya başına
+    MAX_UPLOAD_FILES = int(os.environ.get("MAX_UPLOAD_FILES", 10))  # tek istekte
+    AVATAR_MAX_BYTES = int(os.environ.get("AVATAR_MAX_BYTES", 5 * 1024 * 1024))
+    MAX_IMAGE_PIXELS = int(os.environ.get("MAX_IMAGE_PIXELS", 50_000_000))
+    # İstek gövdesi bunu aşarsa Werkzeug okumadan 413 döner
+    MAX_CONTENT_LENGTH = MAX_UPLOAD_BYTES * MAX_UPLOAD_FILES + 1024 * 1024
+
+    # -------- ŞİFRELER --------
+    # Özetin başında saklanan biçimde ("pbkdf2:sha256:<iterasyon>" veya "scrypt:<n>:<r>:<p>").
+    # Değişince eski özetler girişte yenisiyle değiştirilir.
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000000")
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 0))  # 0: CPU sayısı
+    PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", 32))  # havuz doluyken bekleyebilecek özet
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+    # -------- ÖNBELLEK --------
+    # "memory" süreç içi: okunmamış sayaçları, sürümler ve tekrar anahtarları worker'lar
+    # arasında paylaşılmaz, gunicorn.conf.py birden fazla worker'da redis istiyor
+    CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")  # "memory" veya "redis"
+    CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 10000))
+    CACHE_DEFAULT_TTL = int(os.environ.get("CACHE_DEFAULT_TTL", 300))
+    UNREAD_CACHE_TTL = int(os.environ.get("UNREAD_CACHE_TTL", 300))
+    RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 300))  # sürüm anahtarlı yanıt/parça önbelleği
+    # Oturum kimliği (user_loader) process içinde tutulur; sürüm değişince zaten yenilenir
+    IDENTITY_CACHE_TTL = int(os.environ.get("IDENTITY_CACHE_TTL", 30))
+    IDENTITY_CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", 10000))
+
+    # -------- BİLDİRİM KUYRUĞU --------
+    NOTIFICATION_BATCH_SIZE = int(os.environ.get("NOTIFICATION_BATCH_SIZE", 500))
+    NOTIFICATION_FLUSH_INTERVAL = float(os.environ.get("NOTIFICATION_FLUSH_INTERVAL", 0.5))
+    NOTIFICATION_COALESCE_WINDOW = int(os.environ.get("NOTIFICATION_COALESCE_WINDOW", 3600))
+    NOTIFICATION_DEDUPE_TTL = int(os.environ.get("NOTIFICATION_DEDUPE_TTL", 86400))
+    # Saklama (flask notifications compact): okunmuş bildirimler bu kadar gün sonra arşive,
+    # yoğun hesaplarda son N'den eskiler hemen; arşiv dahil her şey RETENTION_DAYS sonra silinir
+    NOTIFICATION_HOT_DAYS = int(os.environ.get("NOTIFICATION_HOT_DAYS", 30))
+    NOTIFICATION_HOT_MAX_PER_USER = int(os.environ.get("NOTIFICATION_HOT_MAX_PER_USER", 200))
+    NOTIFICATION_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", 365))
+    NOTIFICATION_COMPACT_BATCH = int(os.environ.get("NOTIFICATION_COMPACT_BATCH", 1000))
+
+    # -------- ANA AKIŞ --------
+    FEED_TIMELINE_MAX = int(os.environ.get("FEED_TIMELINE_MAX", 800))  # kullanıcı başına tutulan gönderi
+    FEED_FANOUT_LIMIT = int(os.environ.get("FEED_FANOUT_LIMIT", 10000))  # bu kadar takipçiden sonra okumada çek
+    FEED_FANOUT_BATCH = int(os.environ.get("FEED_FANOUT_BATCH", 1000))
+    FEED_BACKFILL = int(os.environ.get("FEED_BACKFILL", 50))  # takip edince akışa eklenen son gönderi
+    FEED_WORKERS = int(os.environ.get("FEED_WORKERS", 2))
+
+    # -------- İZLEME --------
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # boşsa /metrics herkese açık
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", 5))  # aynı sorgu bir istekte bu kadar tekrarlanırsa
+    N_PLUS_ONE_WARNINGS = _flag("N_PLUS_ONE_WARNINGS", False)  # debug modunda her zaman açık
+
+    # -------- CANLI OLAYLAR (SSE) --------
+    # "local" sadece tek worker'da; gunicorn.conf.py birden fazla worker'da redis / postgres istiyor
+    PUBSUB_BACKEND = os.environ.get("PUBSUB_BACKEND", "local")  # "local", "redis" veya "postgres"
+    PUBSUB_REDIS_URL = os.environ.get("PUBSUB_REDIS_URL")
+    SSE_HEARTBEAT = int(os.environ.get("SSE_HEARTBEAT", 25))
 
 
@@ -0,0 +1,164 @@
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+_tmp_dir = tempfile.mkdtemp(prefix="verzia-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/test.db"
+os.environ["BLOB_STORE_PATH"] = os.path.join(_tmp_dir, "blobs")
+
+from app import app as flask_app, db  # noqa: E402
+from models.user import User  # noqa: E402
+from services.cache import init_cache  # noqa: E402
+
+# crud_test.py modül seviyesinde çalışıyor, tablolar toplama anında hazır olmalı
+with flask_app.app_context():
+    db.create_all()
+
+
+@pytest.fixture
+def app():
+    flask_app.config.update(TESTING=True, THUMBNAILS_INLINE=True, NOTIFICATIONS_INLINE=True, FEED_INLINE=True,
+                            ADMIN_JOBS_INLINE=True, PASSWORD_HASH_METHOD="pbkdf2:sha256:1000")
+    # id'ler testler arasında yeniden kullanılıyor; eski sürüm/yanıt önbelleği taşınmasın
+    init_cache(flask_app)
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def _make_user(username, password="pass"):
+        user = User(username=username, email=f"{username}@example.com")
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return _make_user
+
+
+@pytest.fixture
+def login():
+    def _login(client, username, password="pass"):
+        response = client.post("/login", data={"username": username, "password": password})
+        assert response.status_code == 200
+        return client
+    return _login
+
+
+# SQLite FK'leri varsayılan olarak denetlemiyor; PostgreSQL gibi davranması için
+# havuzdaki bağlantılar kapatılıp PRAGMA ile yeniden açılır
+@pytest.fixture
+def foreign_keys(app):
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    db.session.remove()
+    db.engine.dispose()
+    event.listen(db.engine, "connect", on_connect)
+    yield
+    db.session.remove()
+    event.remove(db.engine, "connect", on_connect)
+    db.engine.dispose()
+
+
+@pytest.fixture
+def count_queries(app):
+    @contextmanager
+    def _count_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    return _count_queries
+
+
+# redis.Redis'in RedisCache tarafından kullanılan kısmı, sözlük üzerinde. Aynı nesneyi
+# paylaşan iki RedisCache iki worker'ın ortak Redis'e bağlanması gibi davranır.
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def _alive(self, key):
+        item = self.data.get(key)
+        if item is not None and item[1] is not None and item[1] < time.monotonic():
+            del self.data[key]
+            item = None
+        return item
+
+    def get(self, key):
+        item = self._alive(key)
+        return item[0] if item else None
+
+    def set(self, key, value, ex=None):
+        raw = value if isinstance(value, bytes) else str(value).encode("utf-8")
+        self.data[key] = (raw, time.monotonic() + ex if ex else None)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def exists(self, key):
+        return int(self._alive(key) is not None)
+
+    def incrby(self, key, delta):
+        raw, expires_at = self._alive(key) or (b"0", None)
+        value = int(raw) + delta
+        self.data[key] = (str(value).encode("utf-8"), expires_at)
+        return value
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+
+    def watch(self, key):
+        pass
+
+    def exists(self, key):
+        return self.client.exists(key)
+
+    def multi(self):
+        self.commands = []
+
+    def incrby(self, key, delta):
+        self.commands.append((key, delta))
+
+    def execute(self):
+        results = [self.client.incrby(key, delta) for key, delta in self.commands]
+        self.commands = None
+        return results
+
+    def reset(self):
+        self.commands = None
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
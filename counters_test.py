@@ -0,0 +1,40 @@
+from extensions import db
+from models.photo import Photo
+from models.user import User, Comment, Like
+from services.counters import reconcile_counters
+
+
+def _counts():
+    db.session.expire_all()
+    photo = Photo.query.one()
+    users = {u.username: (u.follower_count, u.following_count) for u in User.query}
+    return (photo.like_count, photo.comment_count), users
+
+
+def test_reconcile_repairs_drifted_counters(app, make_user):
+    owner, fan = make_user("sahip"), make_user("hayran")
+    fan.follow(owner)
+    photo = Photo(title="Verzia Moment", filename="x", owner_id=owner.id)
+    db.session.add(photo)
+    db.session.flush()
+    db.session.add_all([Like(user_id=fan.id, photo_id=photo.id), Like(user_id=owner.id, photo_id=photo.id),
+                        Comment(body="güzel", user_id=fan.id, photo_id=photo.id)])
+    db.session.commit()
+    expected = ((2, 1), {"sahip": (1, 0), "hayran": (0, 1)})
+
+    # Sayaçları bozan eski kod yolu / elle müdahale
+    Photo.query.update({Photo.like_count: 7, Photo.comment_count: -1})
+    User.query.filter_by(id=owner.id).update({User.follower_count: 0})
+    User.query.filter_by(id=fan.id).update({User.following_count: 3})
+    db.session.commit()
+    assert _counts() != expected
+
+    assert reconcile_counters() == (1, 2)
+    assert _counts() == expected
+
+    Photo.query.update({Photo.comment_count: 0})
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=["counters", "reconcile"])
+    assert result.exit_code == 0 and "1 fotoğraf, 0 kullanıcı" in result.output
+    assert _counts() == expected
+    assert reconcile_counters() == (0, 0)
@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
+
+from extensions import db
+from services.database import engine_options
+
+PG = "postgresql://verzia@localhost/verzia"
+
+
+def test_engine_options_by_mode(app):
+    config = dict(app.config, DB_PGBOUNCER=False, DB_POOL_SIZE=8, DB_STATEMENT_TIMEOUT_MS=3000)
+    options = engine_options(config, PG)
+    assert options["pool_size"] == 8 and options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=3000"}
+
+    assert engine_options(dict(config, DB_PGBOUNCER=True), PG) == {"poolclass": NullPool}
+    assert engine_options(config, "sqlite:///x.db") == {}
+
+
+@contextmanager
+def _replica(app):
+    # Aynı SQLite dosyasına ikinci bir motor: hangi sorgunun nereye gittiğini saymak için
+    engine = create_engine(db.engine.url)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    db.engines["replica"] = engine
+    try:
+        yield statements
+    finally:
+        del db.engines["replica"]
+        engine.dispose()
+
+
+def test_reads_go_to_replica_until_the_user_writes(app, client, make_user, login):
+    make_user("sahip")
+    make_user("izleyen")
+    login(client, "izleyen")
+
+    with _replica(app) as replica_statements:
+        assert client.get("/search_users?q=sah").get_json()[0]["username"] == "sahip"
+        assert any("username_search" in s for s in replica_statements)
+
+        # Yazan kullanıcı kısa bir süre birincilden okur
+        assert client.post("/follow/sahip").get_json()["status"] == "followed"
+        replica_statements.clear()
+        assert client.get("/search_users?q=sah").get_json()[0]["is_following"] is True
+        assert replica_statements == []
+
+
+def test_healthz_reports_pool_state(app, client):
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["status"] == "ok"
+    assert body["pools"]["primary"]["checkouts"] >= 1
@@ -1,8 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_migrate import Migrate
 from flask_login import LoginManager
 
-db = SQLAlchemy()
+
+# session.info["replica"] açıkken okumalar "replica" bind'ına gider; flush, DML
+# (insert/update/delete) ve açık bind isteyenler her zaman birincilde kalır
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        reading = not self._flushing and not getattr(clause, "is_dml", False)
+        if bind is None and reading and self.info.get("replica"):
+            engine = self._db.engines.get("replica")
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 login_manager = LoginManager()
 login_manager.login_view = "login"
@@ -10,8 +24,4 @@ login_manager.login_view = "login"
 from models.user import User
 from models.siteinfo import SiteInfo
 
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
 
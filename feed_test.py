@@ -0,0 +1,83 @@
+import pytest
+
+from extensions import db
+from models.feed import TimelineEntry
+from models.photo import Photo
+from services.cache import get_cache
+from services.feed import CELEBRITIES_KEY, fan_out, feed_page
+
+
+@pytest.fixture
+def post(app):
+    def _post(owner, count=1):
+        photos = [Photo(title="Verzia Moment", filename="x", owner_id=owner.id) for _ in range(count)]
+        db.session.add_all(photos)
+        db.session.commit()
+        for photo in photos:
+            fan_out(photo.id)
+        return photos
+    return _post
+
+
+def _feed_ids(user, before_id=None, page_size=20):
+    photos, next_before_id = feed_page(user.id, before_id, page_size)
+    return [p.id for p in photos], next_before_id
+
+
+def test_upload_fans_out_to_followers(app, make_user, post):
+    okur, yazar, yabanci = make_user("okur", "-"), make_user("yazar", "-"), make_user("yabanci", "-")
+    okur.follow(yazar)
+    db.session.commit()
+
+    photos = post(yazar, 3)
+    post(yabanci)
+    own = post(okur)
+
+    assert TimelineEntry.query.filter_by(user_id=okur.id).count() == 3
+    ids, _ = _feed_ids(okur)
+    assert ids == sorted([p.id for p in photos + own], reverse=True)
+
+
+def test_keyset_pages(app, make_user, post):
+    okur, yazar = make_user("okur", "-"), make_user("yazar", "-")
+    okur.follow(yazar)
+    db.session.commit()
+    expected = sorted((p.id for p in post(yazar, 7)), reverse=True)
+
+    seen, before_id = [], None
+    while True:
+        ids, before_id = _feed_ids(okur, before_id, page_size=3)
+        seen += ids
+        if before_id is None:
+            break
+    assert seen == expected
+
+
+def test_follow_backfills_and_unfollow_removes(app, client, make_user, login, post):
+    okur, yazar = make_user("okur"), make_user("yazar", "-")
+    photos = post(yazar, 2)
+    login(client, "okur")
+
+    client.post("/follow/yazar")
+    assert {e.photo_id for e in TimelineEntry.query.filter_by(user_id=okur.id)} == {p.id for p in photos}
+    assert [p["id"] for p in client.get("/get_feed").get_json()["photos"]] == [photos[1].id, photos[0].id]
+
+    client.post("/follow/yazar")
+    assert TimelineEntry.query.filter_by(user_id=okur.id).count() == 0
+    assert client.get("/get_feed").get_json()["photos"] == []
+
+
+def test_high_follower_accounts_are_pulled_on_read(app, make_user, post):
+    okur, unlu = make_user("okur", "-"), make_user("unlu", "-")
+    okur.follow(unlu)
+    db.session.commit()
+    app.config["FEED_FANOUT_LIMIT"] = 1
+    get_cache().delete(CELEBRITIES_KEY)
+    try:
+        photos = post(unlu, 2)
+        assert TimelineEntry.query.count() == 0
+        ids, _ = _feed_ids(okur)
+        assert ids == [photos[1].id, photos[0].id]
+    finally:
+        app.config["FEED_FANOUT_LIMIT"] = 10000
+        get_cache().delete(CELEBRITIES_KEY)
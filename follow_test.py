@@ -0,0 +1,41 @@
+from extensions import db
+from models.user import User, followers_association
+
+
+def test_following_ids_returns_only_followed(app, make_user, count_queries):
+    me, a, b, c = (make_user(name) for name in ("ben", "ayse", "bora", "cem"))
+    me.follow(a)
+    me.follow(c)
+    b.follow(me)
+    db.session.commit()
+
+    assert me.following_ids([a.id, b.id, c.id, 999999]) == {a.id, c.id}
+    assert b.following_ids([a.id, me.id]) == {me.id}
+    with count_queries() as statements:
+        assert me.following_ids([]) == set()
+    assert statements == []
+
+
+def test_concurrent_follow_is_a_noop(app, make_user, monkeypatch):
+    fan, owner = make_user("hayran"), make_user("sahip")
+    # Eşzamanlı istek: bu isteğin kontrolünden sonra başka bir worker satırı eklemiş
+    monkeypatch.setattr(User, "is_following", lambda self, user: False)
+    with db.engine.begin() as conn:
+        conn.execute(followers_association.insert().values(follower_id=fan.id, followed_id=owner.id))
+
+    assert fan.follow(owner) is False
+    db.session.commit()
+    assert (owner.follower_count, fan.following_count) == (0, 0)
+
+    assert owner.follow(fan) is True
+    db.session.commit()
+    assert (fan.follower_count, owner.following_count) == (1, 1)
+
+
+def test_follow_route_toggles(app, client, make_user, login):
+    make_user("hayran")
+    make_user("sahip")
+    login(client, "hayran")
+    assert client.post("/follow/sahip").get_json() == {"status": "followed", "follower_count": 1}
+    assert client.post("/follow/sahip").get_json() == {"status": "unfollowed", "follower_count": 0}
+    assert client.post("/follow/hayran").status_code == 400
@@ -0,0 +1,29 @@
+import os
+
+# SSE (/notifications/stream) bağlantıları uzun süre açık kalıyor: gevent worker'ları
+# binlerce boşta bağlantıyı tek process'te ucuza taşıyor
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+# Süreç içi backend'ler worker'lar arasında paylaşılmıyor: memory önbellekte bir
+# worker'ın güncellediği okunmamış sayacı / sürüm diğer worker'da eski kalır,
+# LocalBroker'a yayınlanan olay diğer worker'daki SSE abonelerine hiç ulaşmaz.
+# Varsayılanlarla tek worker; birden fazlası ortak backend ister.
+# ayar: (süreç içi değer, ortak seçenekler)
+PROCESS_LOCAL_BACKENDS = {"CACHE_BACKEND": ("memory", "redis"), "PUBSUB_BACKEND": ("local", "redis|postgres")}
+process_local = {name: shared for name, (local, shared) in PROCESS_LOCAL_BACKENDS.items()
+                 if os.environ.get(name, local) == local}
+
+# Her worker kendi bağlantı havuzunu açar: PostgreSQL'e en fazla
+# workers × (DB_POOL_SIZE + DB_MAX_OVERFLOW) bağlantı (PgBouncer modunda PgBouncer sınırlar)
+workers = int(os.environ.get("WEB_CONCURRENCY", 1 if process_local else 2))
+if workers > 1 and process_local:
+    raise RuntimeError(f"WEB_CONCURRENCY={workers} ortak backend gerektiriyor: "
+                       + ", ".join(f"{name}={shared}" for name, shared in sorted(process_local.items())))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 2000))
+timeout = 60
+
+
+def post_fork(server, worker):
+    # psycopg2 çağrıları event loop'u bloklamasın
+    if worker_class == "gevent":
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
@@ -0,0 +1,55 @@
+from flask import g
+
+from extensions import db
+from models.user import User
+from services.versions import touch
+
+
+def _user_statements(statements):
+    return [s for s in statements if 'FROM "user"' in s or "FROM user" in s]
+
+
+# Test client isteklerinde fixture'ın app context'i (ve g) paylaşılıyor;
+# gerçek istekteki gibi current_user yeniden yüklensin
+def _get(client, path):
+    g.pop("_login_user", None)
+    return client.get(path)
+
+
+def test_identity_is_cached_and_slim(app, client, make_user, login, count_queries):
+    make_user("sahip")
+    login(client, "sahip")
+
+    with count_queries() as statements:
+        assert _get(client, "/notifications").status_code == 200
+    loads = _user_statements(statements)
+    assert len(loads) == 1
+    assert "password" not in loads[0] and "bio" not in loads[0] and "avatar" not in loads[0]
+
+    with count_queries() as statements:
+        assert _get(client, "/notifications").status_code == 200
+    assert _user_statements(statements) == []
+
+
+def test_settings_refreshes_identity(app, client, make_user, login):
+    make_user("eski")
+    login(client, "eski")
+    _get(client, "/notifications")
+
+    assert client.post("/settings", data={"username": "yeni"}).status_code == 302
+    assert "yeni" in _get(client, "/settings").get_data(as_text=True)
+
+    client.post("/update_bio", data={"bio": "Merhaba"})
+    page = _get(client, "/profile/yeni").get_data(as_text=True)
+    assert ">Merhaba</textarea>" in page
+
+
+def test_deleted_user_is_logged_out(app, client, make_user, login):
+    user = make_user("gidici")
+    login(client, "gidici")
+    _get(client, "/notifications")
+    db.session.execute(db.delete(User).where(User.id == user.id))
+    # Silme yolları kullanıcı sürümünü değiştiriyor (admin toplu silme gibi)
+    touch("user", user.id)
+    db.session.commit()
+    assert _get(client, "/notifications").status_code in (302, 401)
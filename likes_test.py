@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from extensions import db
+from models.photo import Photo
+from models.user import Like
+
+THREADS = 8
+TOGGLES_PER_THREAD = 10
+
+
+def _parallel_toggles(app, login, usernames, photo_id):
+    def worker(username):
+        client = login(app.test_client(), username)
+        return [client.post(f"/like/{photo_id}").status_code for _ in range(TOGGLES_PER_THREAD)]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return [code for codes in pool.map(worker, usernames) for code in codes]
+
+
+def test_parallel_toggles_never_duplicate_likes(app, make_user, login):
+    owner = make_user("sahip")
+    make_user("hayran")
+    photo = Photo(title="Verzia Moment", filename="x", owner_id=owner.id)
+    db.session.add(photo)
+    db.session.commit()
+
+    codes = _parallel_toggles(app, login, ["hayran"] * THREADS, photo.id)
+
+    assert set(codes) == {200}
+    likes = Like.query.filter_by(photo_id=photo.id).count()
+    assert likes <= 1
+    db.session.expire_all()
+    assert db.session.get(Photo, photo.id).like_count == likes
+
+
+def test_parallel_toggles_keep_like_count_in_sync(app, make_user, login):
+    owner = make_user("sahip")
+    usernames = [make_user(f"hayran{i}").username for i in range(THREADS)]
+    photo = Photo(title="Verzia Moment", filename="x", owner_id=owner.id)
+    db.session.add(photo)
+    db.session.commit()
+
+    codes = _parallel_toggles(app, login, usernames, photo.id)
+
+    assert set(codes) == {200}
+    # Her kullanıcı çift sayıda toggle yaptı, hepsi "beğenmedi" durumunda bitmeli
+    assert Like.query.filter_by(photo_id=photo.id).count() == 0
+    db.session.expire_all()
+    assert db.session.get(Photo, photo.id).like_count == 0
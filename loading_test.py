@@ -0,0 +1,60 @@
+import re
+
+from extensions import db
+from models.photo import Photo
+from models.user import Comment, User
+
+# Yazma / yetki yollarının hiç okumaması gereken büyük kolonlar
+LARGE_COLUMNS = re.compile(r'\bphoto\.(placeholder|filename)\b|"?user"?\.(bio|password)\b')
+
+
+def _large_reads(statements):
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT") and LARGE_COLUMNS.search(s)]
+
+
+def _photo(owner):
+    photo = Photo(title="Verzia Moment", filename="x" * 5000, owner_id=owner.id, placeholder="data:image/jpeg;base64,...")
+    db.session.add(photo)
+    db.session.commit()
+    return photo.id
+
+
+def test_write_endpoints_skip_large_columns(app, client, make_user, login, count_queries):
+    owner, other = make_user("sahip"), make_user("ziyaretci")
+    owner_id, other_id = owner.id, other.id
+    photo_id = _photo(owner)
+    login(client, "ziyaretci")
+    db.session.expunge_all()
+
+    with count_queries() as statements:
+        assert client.post(f"/like/{photo_id}").get_json()["like_count"] == 1
+        assert client.post(f"/add_comment/{photo_id}", json={"text": "güzel"}).get_json()["status"] == "success"
+        assert client.get(f"/get_comments/{photo_id}").status_code == 200
+    assert _large_reads(statements) == []
+
+    comment_id = db.session.query(Comment.id).filter_by(photo_id=photo_id, user_id=other_id).scalar()
+    db.session.expunge_all()
+    with count_queries() as statements:
+        assert client.post(f"/delete_comment/{comment_id}").get_json()["status"] == "success"
+    assert _large_reads(statements) == []
+
+    client.get("/logout")
+    login(client, "sahip")
+    db.session.expunge_all()
+    with count_queries() as statements:
+        assert client.post(f"/delete_photo/{photo_id}").get_json()["status"] == "success"
+    assert _large_reads(statements) == []
+    assert db.session.get(Photo, photo_id) is None
+    assert db.session.get(User, owner_id).photos == []
+
+
+def test_read_paths_still_load_deferred_columns(app, client, make_user, login):
+    owner = make_user("sahip")
+    photo_id = _photo(owner)
+    login(client, "sahip")
+    client.post("/update_bio", data={"bio": "Merhaba"})
+    db.session.expunge_all()
+
+    assert client.get(f"/get_post_details/{photo_id}").get_json()["placeholder"].startswith("data:")
+    assert client.get("/get_user_photos/sahip").get_json()["photos"][0]["placeholder"].startswith("data:")
+    assert "Merhaba" in client.get("/profile/sahip").get_data(as_text=True)
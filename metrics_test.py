@@ -0,0 +1,77 @@
+import io
+import logging
+import re
+
+from PIL import Image
+
+from extensions import db
+from models.photo import Photo
+from models.user import User
+from services.metrics import N_PLUS_ONE, UPLOAD_BYTES
+
+
+def _value(body, name, **labels):
+    pattern = re.escape(name) + r"\{([^}]*)\} (\S+)"
+    for label_text, value in re.findall(pattern, body):
+        pairs = dict(re.findall(r'(\w+)="([^"]*)"', label_text))
+        if all(pairs.get(k) == str(v) for k, v in labels.items()):
+            return float(value)
+    return None
+
+
+def test_requests_are_timed_per_endpoint(app, client, make_user, login):
+    owner = make_user("sahip")
+    photo = Photo(title="Verzia Moment", filename="x", owner_id=owner.id)
+    db.session.add(photo)
+    db.session.commit()
+    login(client, "sahip")
+    before = _value(client.get("/metrics").get_data(as_text=True), "verzia_http_request_duration_seconds_count",
+                    endpoint="get_post_details", method="GET", status="200") or 0
+
+    client.get(f"/get_post_details/{photo.id}")
+
+    response = client.get("/metrics")
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert "# TYPE verzia_http_request_duration_seconds histogram" in body
+    assert _value(body, "verzia_http_request_duration_seconds_count", endpoint="get_post_details", method="GET", status="200") == before + 1
+    assert _value(body, "verzia_http_request_db_statements_bucket", endpoint="get_post_details", le="+Inf") >= 1
+    assert _value(body, "verzia_db_pool", pool="primary", stat="checkouts") >= 1
+
+
+def test_repeated_query_in_one_request_is_flagged(app, make_user, caplog):
+    for i in range(6):
+        make_user(f"kisi{i}")
+    before = N_PLUS_ONE.value(endpoint="index")
+    app.config["N_PLUS_ONE_WARNINGS"] = True
+    try:
+        with app.test_request_context("/"), caplog.at_level(logging.WARNING, logger="services.metrics"):
+            app.preprocess_request()
+            for i in range(6):
+                db.session.execute(db.select(User.id).where(User.username == f"kisi{i}")).scalar()
+            app.process_response(app.response_class())
+    finally:
+        app.config["N_PLUS_ONE_WARNINGS"] = False
+    assert N_PLUS_ONE.value(endpoint="index") == before + 1
+    assert "aynı sorgu 6 kez" in caplog.text
+
+
+def test_upload_bytes_are_counted(app, client, make_user, login):
+    make_user("sahip")
+    login(client, "sahip")
+    before = UPLOAD_BYTES.value(kind="photo")
+    buf = io.BytesIO()
+    Image.new("RGB", (20, 20), (191, 149, 63)).save(buf, "PNG")
+    size = buf.tell()
+    buf.seek(0)
+    client.post("/upload", headers={"Accept": "application/json"}, data={"photo": (buf, "a.png")})
+    assert UPLOAD_BYTES.value(kind="photo") == before + size
+
+
+def test_metrics_token(app, client):
+    app.config["METRICS_TOKEN"] = "gizli"
+    try:
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer gizli"}).status_code == 200
+    finally:
+        app.config["METRICS_TOKEN"] = None
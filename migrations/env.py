@@ -51,6 +51,16 @@ def get_metadata():
     return target_db.metadata
 
 
+# SQLite FTS5 sanal tablosu ve gölge tabloları tetikleyicilerle yönetiliyor,
+# pg_trgm indeksi sadece PostgreSQL'de var; autogenerate bunlara dokunmasın
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith("user_search"):
+        return False
+    if type_ == "index" and name == "ix_user_username_search_trgm":
+        return context.get_context().dialect.name == "postgresql"
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +75,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -100,6 +111,7 @@ def run_migrations_online():
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
+            include_object=include_object,
             **conf_args
         )
 
@@ -0,0 +1,50 @@
+"""primary key and reverse index on followers_assoc
+
+Revision ID: 19c6e3a8b5d2
+Revises: f4a7c2e8d619
+Create Date: 2026-01-19 10:08:44.631290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '19c6e3a8b5d2'
+down_revision = 'f4a7c2e8d619'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tabloda PK yoktu, kopya satırlar olabilir: DISTINCT ile yeni tabloya taşı
+    op.create_table('followers_assoc_new',
+    sa.Column('follower_id', sa.Integer(), nullable=False),
+    sa.Column('followed_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['followed_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['follower_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('follower_id', 'followed_id')
+    )
+    op.execute('INSERT INTO followers_assoc_new (follower_id, followed_id) '
+               'SELECT DISTINCT follower_id, followed_id FROM followers_assoc '
+               'WHERE follower_id IS NOT NULL AND followed_id IS NOT NULL')
+    op.drop_table('followers_assoc')
+    op.rename_table('followers_assoc_new', 'followers_assoc')
+    op.create_index('ix_followers_assoc_followed_id', 'followers_assoc', ['followed_id', 'follower_id'], unique=False)
+
+    op.execute('UPDATE "user" SET follower_count = (SELECT COUNT(*) FROM followers_assoc WHERE followed_id = "user".id), '
+               'following_count = (SELECT COUNT(*) FROM followers_assoc WHERE follower_id = "user".id)')
+
+
+def downgrade():
+    op.drop_index('ix_followers_assoc_followed_id', table_name='followers_assoc')
+    op.create_table('followers_assoc_old',
+    sa.Column('follower_id', sa.Integer(), nullable=True),
+    sa.Column('followed_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['followed_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['follower_id'], ['user.id'], )
+    )
+    op.execute('INSERT INTO followers_assoc_old (follower_id, followed_id) '
+               'SELECT follower_id, followed_id FROM followers_assoc')
+    op.drop_table('followers_assoc')
+    op.rename_table('followers_assoc_old', 'followers_assoc')
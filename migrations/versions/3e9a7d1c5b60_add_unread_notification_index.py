@@ -0,0 +1,25 @@
+"""add partial unread-notification index
+
+Revision ID: 3e9a7d1c5b60
+Revises: 19c6e3a8b5d2
+Create Date: 2026-01-21 13:26:09.884157
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e9a7d1c5b60'
+down_revision = '19c6e3a8b5d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_notification_user_unread', 'notification', ['user_id'], unique=False,
+                    postgresql_where=sa.text('is_read = false'), sqlite_where=sa.text('is_read = 0'))
+
+
+def downgrade():
+    op.drop_index('ix_notification_user_unread', table_name='notification')
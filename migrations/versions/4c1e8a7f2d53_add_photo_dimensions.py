@@ -0,0 +1,30 @@
+"""add width / height to photo
+
+Revision ID: 4c1e8a7f2d53
+Revises: d9f2a6c4e8b1
+Create Date: 2026-02-03 09:46:12.603871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1e8a7f2d53'
+down_revision = 'd9f2a6c4e8b1'
+branch_labels = None
+depends_on = None
+
+
+# Mevcut satırlarda boş kalıyor; dosyaları blob deposundan okumak gerektiği için
+# migration yerine "flask thumbnails backfill" dolduruyor
+def upgrade():
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('width', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('height', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.drop_column('height')
+        batch_op.drop_column('width')
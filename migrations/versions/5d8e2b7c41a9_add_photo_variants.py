@@ -0,0 +1,47 @@
+"""add photo variants
+
+Revision ID: 5d8e2b7c41a9
+Revises: a3f1c9d2e7b4
+Create Date: 2026-01-07 14:40:02.118904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8e2b7c41a9'
+down_revision = 'a3f1c9d2e7b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('photo_variant',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('photo_id', sa.Integer(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('format', sa.String(length=10), nullable=False),
+    sa.Column('blob_hash', sa.String(length=64), nullable=False),
+    sa.ForeignKeyConstraint(['photo_id'], ['photo.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('photo_id', 'width', 'format', name='uq_photo_variant')
+    )
+    with op.batch_alter_table('photo_variant', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_photo_variant_photo_id'), ['photo_id'], unique=False)
+
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('placeholder', sa.Text(), nullable=True))
+
+    # Mevcut fotoğrafların varyantları için: flask thumbnails backfill
+
+
+def downgrade():
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.drop_column('placeholder')
+
+    with op.batch_alter_table('photo_variant', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_photo_variant_photo_id'))
+
+    op.drop_table('photo_variant')
@@ -0,0 +1,101 @@
+"""add avatar_thumb to user, move data: URI avatars to blob store
+
+Revision ID: 6e3b9d1a4c72
+Revises: 4c1e8a7f2d53
+Create Date: 2026-02-09 14:21:05.318446
+
+"""
+import base64
+import binascii
+import io
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e3b9d1a4c72'
+down_revision = '4c1e8a7f2d53'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 100
+MEDIA_PREFIX = '/media/'
+
+user = sa.table(
+    'user',
+    sa.column('id', sa.Integer),
+    sa.column('avatar', sa.String),
+    sa.column('avatar_thumb', sa.String),
+)
+photo = sa.table('photo', sa.column('blob_hash', sa.String))
+photo_variant = sa.table('photo_variant', sa.column('blob_hash', sa.String))
+
+
+def _is_referenced(conn, blob_hash):
+    url = MEDIA_PREFIX + blob_hash
+    return any(conn.execute(query.limit(1)).first() for query in (
+        sa.select(photo.c.blob_hash).where(photo.c.blob_hash == blob_hash),
+        sa.select(photo_variant.c.blob_hash).where(photo_variant.c.blob_hash == blob_hash),
+        sa.select(user.c.id).where(sa.or_(user.c.avatar == url, user.c.avatar_thumb == url)),
+    ))
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('avatar_thumb', sa.String(length=100), nullable=True))
+
+    # data: URI avatarlar ve önceki sürümün sakladığı tam boy orijinaller kare
+    # varyantlara dönüşür; listeler artık satır başına ~100 bayt adres döndürüyor
+    from flask import current_app
+    from PIL import UnidentifiedImageError
+    from services.avatars import build_avatar
+    from services.storage import get_blob_store, is_valid_hash
+    store = get_blob_store()
+    conn = op.get_bind()
+    pending = sa.or_(
+        user.c.avatar.like('data:%'),
+        sa.and_(user.c.avatar.like(MEDIA_PREFIX + '%'), user.c.avatar_thumb.is_(None)),
+    )
+    originals = set()
+    last_id = 0
+    # url_for("media") istek bağlamı istiyor
+    with current_app.test_request_context():
+        while True:
+            rows = conn.execute(
+                sa.select(user.c.id, user.c.avatar)
+                .where(user.c.id > last_id, pending)
+                .order_by(user.c.id)
+                .limit(BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                last_id = row.id
+                try:
+                    if row.avatar.startswith('data:'):
+                        header, _, payload = row.avatar.partition(',')
+                        if ';base64' not in header:
+                            raise ValueError(header)
+                        urls = build_avatar(io.BytesIO(base64.b64decode(payload)))
+                    else:
+                        blob_hash = row.avatar[len(MEDIA_PREFIX):]
+                        if not is_valid_hash(blob_hash) or not store.exists(blob_hash):
+                            raise ValueError(row.avatar)
+                        with store.open(blob_hash) as f:
+                            urls = build_avatar(io.BytesIO(f.read()))
+                        originals.add(blob_hash)
+                except (binascii.Error, ValueError, UnidentifiedImageError, OSError):
+                    # Okunamayan avatar varsayılana döner
+                    urls = {'avatar': None, 'avatar_thumb': None}
+                conn.execute(user.update().where(user.c.id == row.id).values(**urls))
+
+    for blob_hash in originals:
+        if not _is_referenced(conn, blob_hash):
+            store.delete(blob_hash)
+
+
+def downgrade():
+    # Varyant adresleri geçerli avatar adresleri olarak kalıyor; sadece küçük kare düşer
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('avatar_thumb')
@@ -0,0 +1,26 @@
+"""add actor_count to notification
+
+Revision ID: 7a2f8e4d3c91
+Revises: 3e9a7d1c5b60
+Create Date: 2026-01-23 17:52:38.140726
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2f8e4d3c91'
+down_revision = '3e9a7d1c5b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('actor_count', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_column('actor_count')
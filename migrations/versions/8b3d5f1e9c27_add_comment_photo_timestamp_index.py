@@ -0,0 +1,25 @@
+"""add (photo_id, timestamp, id) index to comment
+
+Revision ID: 8b3d5f1e9c27
+Revises: e2b6d0f4a815
+Create Date: 2026-01-14 11:47:26.019583
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3d5f1e9c27'
+down_revision = 'e2b6d0f4a815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.create_index('ix_comment_photo_id_timestamp', ['photo_id', 'timestamp', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.drop_index('ix_comment_photo_id_timestamp')
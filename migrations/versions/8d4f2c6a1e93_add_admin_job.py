@@ -0,0 +1,41 @@
+"""add admin_job for background bulk moderation
+
+Revision ID: 8d4f2c6a1e93
+Revises: 6e3b9d1a4c72
+Create Date: 2026-02-16 11:05:43.227190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4f2c6a1e93'
+down_revision = '6e3b9d1a4c72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('admin_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=30), nullable=False),
+    sa.Column('params', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('done', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('admin_job', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_admin_job_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('admin_job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_admin_job_created_at'))
+
+    op.drop_table('admin_job')
@@ -0,0 +1,87 @@
+"""move photo bytes to blob store
+
+Revision ID: a3f1c9d2e7b4
+Revises: 54ab07984012
+Create Date: 2026-01-05 10:12:31.402117
+
+"""
+import base64
+import io
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d2e7b4'
+down_revision = '54ab07984012'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 100
+
+photo = sa.table(
+    'photo',
+    sa.column('id', sa.Integer),
+    sa.column('filename', sa.String),
+    sa.column('blob_hash', sa.String),
+    sa.column('mimetype', sa.String),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('blob_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('mimetype', sa.String(length=50), nullable=True))
+        batch_op.create_index(batch_op.f('ix_photo_blob_hash'), ['blob_hash'], unique=False)
+
+    # data: URI satırlarını blob deposuna taşı, satırda sadece hash kalsın
+    from services.storage import get_blob_store, sniff_mimetype
+    store = get_blob_store()
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(photo.c.id, photo.c.filename)
+            .where(photo.c.id > last_id, photo.c.filename.like('data:%'))
+            .order_by(photo.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            last_id = row.id
+            header, _, payload = row.filename.partition(',')
+            if ';base64' not in header:
+                continue
+            blob_hash, _ = store.put_stream(io.BytesIO(base64.b64decode(payload)))
+            conn.execute(
+                photo.update().where(photo.c.id == row.id).values(
+                    filename=blob_hash,
+                    blob_hash=blob_hash,
+                    mimetype=sniff_mimetype(store.read_head(blob_hash)),
+                )
+            )
+
+
+def downgrade():
+    # Blob'ları tekrar data: URI olarak satıra göm
+    from services.storage import get_blob_store
+    store = get_blob_store()
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(photo.c.id, photo.c.blob_hash, photo.c.mimetype).where(photo.c.blob_hash.isnot(None))
+    ).fetchall()
+    for row in rows:
+        if not store.exists(row.blob_hash):
+            continue
+        with store.open(row.blob_hash) as f:
+            payload = base64.b64encode(f.read()).decode('utf-8')
+        conn.execute(
+            photo.update().where(photo.c.id == row.id).values(filename=f"data:{row.mimetype};base64,{payload}")
+        )
+
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_photo_blob_hash'))
+        batch_op.drop_column('mimetype')
+        batch_op.drop_column('blob_hash')
@@ -0,0 +1,72 @@
+"""notification read watermark and archive table
+
+Revision ID: b2e7f4a9c316
+Revises: 8d4f2c6a1e93
+Create Date: 2026-02-23 10:41:17.582301
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2e7f4a9c316'
+down_revision = '8d4f2c6a1e93'
+branch_labels = None
+depends_on = None
+
+user = sa.table('user', sa.column('id', sa.Integer), sa.column('notifications_read_upto', sa.Integer))
+notification = sa.table('notification', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                        sa.column('is_read', sa.Boolean))
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notifications_read_upto', sa.Integer(), server_default='0', nullable=False))
+
+    # İşaret = ilk okunmamış bildirimden bir önceki id (hiç okunmamış yoksa en büyük id).
+    # İlk okunmamıştan sonra okunmuş satırlar varsa tekrar okunmamış sayılır.
+    first_unread = (sa.select(sa.func.min(notification.c.id) - 1)
+                    .where(notification.c.user_id == user.c.id, notification.c.is_read == sa.false())
+                    .scalar_subquery())
+    last = sa.select(sa.func.max(notification.c.id)).where(notification.c.user_id == user.c.id).scalar_subquery()
+    op.execute(user.update().values(notifications_read_upto=sa.func.coalesce(first_unread, last, 0)))
+
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_user_unread')
+        batch_op.create_index('ix_notification_user_id_id', ['user_id', 'id'], unique=False)
+        batch_op.drop_column('is_read')
+
+    op.create_table('notification_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('sender_username', sa.String(length=50), nullable=False),
+    sa.Column('notif_type', sa.String(length=20), nullable=False),
+    sa.Column('photo_id', sa.Integer(), nullable=True),
+    sa.Column('message', sa.String(length=255), nullable=False),
+    sa.Column('actor_count', sa.Integer(), server_default='1', nullable=False),
+    sa.PrimaryKeyConstraint('id', 'timestamp'),
+    postgresql_partition_by='RANGE (timestamp)'
+    )
+    with op.batch_alter_table('notification_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_archive_user_id_id', ['user_id', 'id'], unique=False)
+
+
+# Arşivdeki bildirimler geri taşınmaz, tabloyla birlikte silinir
+def downgrade():
+    op.drop_table('notification_archive')
+
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_read', sa.Boolean(), nullable=True))
+
+    watermark = sa.select(user.c.notifications_read_upto).where(user.c.id == notification.c.user_id).scalar_subquery()
+    op.execute(notification.update().values(is_read=notification.c.id <= watermark))
+
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_user_id_id')
+        batch_op.create_index('ix_notification_user_unread', ['user_id'], unique=False,
+                              postgresql_where=sa.text('is_read = false'), sqlite_where=sa.text('is_read = 0'))
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('notifications_read_upto')
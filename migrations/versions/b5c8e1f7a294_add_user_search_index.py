@@ -0,0 +1,74 @@
+"""add username_search with trigram / FTS5 search indexes
+
+Revision ID: b5c8e1f7a294
+Revises: 7a2f8e4d3c91
+Create Date: 2026-01-27 11:08:45.512390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5c8e1f7a294'
+down_revision = '7a2f8e4d3c91'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+user = sa.table(
+    'user',
+    sa.column('id', sa.Integer),
+    sa.column('username', sa.String),
+    sa.column('username_search', sa.String),
+)
+
+
+def upgrade():
+    from models.user import USER_SEARCH_DDL
+    from services.text import turkish_lower
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('username_search', sa.String(length=50), nullable=True))
+
+    # Mevcut kullanıcı adlarını Türkçe kurallarıyla küçült
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(user.c.id, user.c.username).where(user.c.id > last_id).order_by(user.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        conn.execute(
+            user.update().where(user.c.id == sa.bindparam('uid')).values(username_search=sa.bindparam('folded')),
+            [{'uid': row.id, 'folded': turkish_lower(row.username)} for row in rows],
+        )
+
+    if conn.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_user_username_search', 'user', ['username_search'], unique=False,
+                        postgresql_ops={'username_search': 'varchar_pattern_ops'})
+        op.create_index('ix_user_username_search_trgm', 'user', ['username_search'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'username_search': 'gin_trgm_ops'})
+    else:
+        op.create_index('ix_user_username_search', 'user', ['username_search'], unique=False)
+    if conn.dialect.name == 'sqlite':
+        for statement in USER_SEARCH_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO user_search(user_search) VALUES ('rebuild')")
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == 'sqlite':
+        for trigger in ('user_search_ai', 'user_search_ad', 'user_search_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS user_search')
+    if conn.dialect.name == 'postgresql':
+        op.drop_index('ix_user_username_search_trgm', table_name='user')
+    op.drop_index('ix_user_username_search', table_name='user')
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('username_search')
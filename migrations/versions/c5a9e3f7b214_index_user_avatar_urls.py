@@ -0,0 +1,27 @@
+"""index user avatar urls for blob reference checks
+
+Revision ID: c5a9e3f7b214
+Revises: b2e7f4a9c316
+Create Date: 2026-03-02 10:14:37.918265
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a9e3f7b214'
+down_revision = 'b2e7f4a9c316'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_avatar'), ['avatar'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_avatar_thumb'), ['avatar_thumb'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_avatar_thumb'))
+        batch_op.drop_index(batch_op.f('ix_user_avatar'))
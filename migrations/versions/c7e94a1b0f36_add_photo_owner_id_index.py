@@ -0,0 +1,25 @@
+"""add (owner_id, id) index to photo
+
+Revision ID: c7e94a1b0f36
+Revises: 5d8e2b7c41a9
+Create Date: 2026-01-09 09:21:47.550312
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e94a1b0f36'
+down_revision = '5d8e2b7c41a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.create_index('ix_photo_owner_id_id', ['owner_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.drop_index('ix_photo_owner_id_id')
@@ -0,0 +1,25 @@
+"""index photo variant blob hash for blob reference checks
+
+Revision ID: d3b7f1a6c829
+Revises: c5a9e3f7b214
+Create Date: 2026-03-04 09:21:50.362417
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b7f1a6c829'
+down_revision = 'c5a9e3f7b214'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('photo_variant', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_photo_variant_blob_hash'), ['blob_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('photo_variant', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_photo_variant_blob_hash'))
@@ -0,0 +1,44 @@
+"""add timeline_entry for the home feed
+
+Revision ID: d9f2a6c4e8b1
+Revises: b5c8e1f7a294
+Create Date: 2026-01-30 14:21:07.845213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9f2a6c4e8b1'
+down_revision = 'b5c8e1f7a294'
+branch_labels = None
+depends_on = None
+
+
+# Mevcut takip ilişkileri için akışlar: flask feed rebuild
+def upgrade():
+    op.create_table('timeline_entry',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('photo_id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['photo_id'], ['photo.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'photo_id')
+    )
+    with op.batch_alter_table('timeline_entry', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_timeline_entry_photo_id'), ['photo_id'], unique=False)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_follower_count'), ['follower_count'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_follower_count'))
+
+    with op.batch_alter_table('timeline_entry', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_timeline_entry_photo_id'))
+
+    op.drop_table('timeline_entry')
@@ -0,0 +1,42 @@
+"""add denormalized like/comment/follow counters
+
+Revision ID: e2b6d0f4a815
+Revises: c7e94a1b0f36
+Create Date: 2026-01-12 16:05:13.872640
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b6d0f4a815'
+down_revision = 'c7e94a1b0f36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('follower_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('following_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Mevcut veriden ilk değerleri doldur
+    op.execute('UPDATE photo SET like_count = (SELECT COUNT(*) FROM "like" WHERE "like".photo_id = photo.id), '
+               'comment_count = (SELECT COUNT(*) FROM comment WHERE comment.photo_id = photo.id)')
+    op.execute('UPDATE "user" SET follower_count = (SELECT COUNT(*) FROM followers_assoc WHERE followed_id = "user".id), '
+               'following_count = (SELECT COUNT(*) FROM followers_assoc WHERE follower_id = "user".id)')
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('following_count')
+        batch_op.drop_column('follower_count')
+
+    with op.batch_alter_table('photo', schema=None) as batch_op:
+        batch_op.drop_column('comment_count')
+        batch_op.drop_column('like_count')
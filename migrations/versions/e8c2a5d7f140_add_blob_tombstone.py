@@ -0,0 +1,33 @@
+"""add blob tombstone
+
+Revision ID: e8c2a5d7f140
+Revises: d3b7f1a6c829
+Create Date: 2026-03-05 16:02:11.408317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c2a5d7f140'
+down_revision = 'd3b7f1a6c829'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('blob_tombstone',
+    sa.Column('blob_hash', sa.String(length=64), nullable=False),
+    sa.Column('released_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('blob_hash')
+    )
+    with op.batch_alter_table('blob_tombstone', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_blob_tombstone_released_at'), ['released_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('blob_tombstone', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_blob_tombstone_released_at'))
+
+    op.drop_table('blob_tombstone')
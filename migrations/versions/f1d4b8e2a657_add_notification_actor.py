@@ -0,0 +1,41 @@
+"""add notification actor
+
+Revision ID: f1d4b8e2a657
+Revises: e8c2a5d7f140
+Create Date: 2026-03-06 11:37:24.905163
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1d4b8e2a657'
+down_revision = 'e8c2a5d7f140'
+branch_labels = None
+depends_on = None
+
+user = sa.table('user', sa.column('id'), sa.column('notifications_read_upto'))
+notification = sa.table('notification', sa.column('id'), sa.column('user_id'), sa.column('sender_username'))
+notification_actor = sa.table('notification_actor', sa.column('notification_id'), sa.column('sender_username'))
+
+
+def upgrade():
+    op.create_table('notification_actor',
+    sa.Column('notification_id', sa.Integer(), nullable=False),
+    sa.Column('sender_username', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['notification_id'], ['notification.id'], ),
+    sa.PrimaryKeyConstraint('notification_id', 'sender_username')
+    )
+    # Okunmamış (hâlâ birleştirilebilen) satırların bilinen tek kişisi: son gönderen.
+    # Öncekiler bilinmiyor; o satırlara tekrar gelen eski bir kişi bir kez daha sayılabilir.
+    op.execute(notification_actor.insert().from_select(
+        ['notification_id', 'sender_username'],
+        sa.select(notification.c.id, notification.c.sender_username)
+        .select_from(notification.join(user, user.c.id == notification.c.user_id))
+        .where(notification.c.id > user.c.notifications_read_upto)
+    ))
+
+
+def downgrade():
+    op.drop_table('notification_actor')
@@ -0,0 +1,32 @@
+"""unique like per (user_id, photo_id)
+
+Revision ID: f4a7c2e8d619
+Revises: 8b3d5f1e9c27
+Create Date: 2026-01-16 15:32:50.274118
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a7c2e8d619'
+down_revision = '8b3d5f1e9c27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Çift tıklamalardan kalan kopya beğenileri temizle (en eski satır kalır)
+    op.execute('DELETE FROM "like" WHERE id NOT IN '
+               '(SELECT MIN(id) FROM "like" GROUP BY user_id, photo_id)')
+    op.execute('UPDATE photo SET like_count = (SELECT COUNT(*) FROM "like" WHERE "like".photo_id = photo.id)')
+
+    with op.batch_alter_table('like', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_like_user_photo', ['user_id', 'photo_id'])
+        batch_op.create_index(batch_op.f('ix_like_photo_id'), ['photo_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('like', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_like_photo_id'))
+        batch_op.drop_constraint('uq_like_user_photo', type_='unique')
@@ -0,0 +1,30 @@
+import json
+from datetime import datetime
+
+from extensions import db
+
+
+# ---------------- ADMIN JOB (TOPLU İŞLEM) ----------------
+# Toplu silme / moderasyon arka planda parça parça çalışır; panel ilerlemeyi buradan okur
+class AdminJob(db.Model):
+    __tablename__ = "admin_job"
+
+    id = db.Column(db.Integer, primary_key=True)
+    action = db.Column(db.String(30), nullable=False)
+    # {"ids": [...]} veya {"filter": {...}} (JSON)
+    params = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default="queued")  # queued, running, done, failed
+    total = db.Column(db.Integer, nullable=False, default=0)
+    done = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    # Kullanıcı silinse de iş geçmişi kalsın diye FK değil
+    created_by = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "id": self.id, "action": self.action, "params": json.loads(self.params), "status": self.status,
+            "total": self.total, "done": self.done, "error": self.error,
+            "created_at": self.created_at.strftime("%d.%m %H:%M") if self.created_at else None,
+        }
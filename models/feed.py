@@ -0,0 +1,14 @@
+from extensions import db
+
+
+# ---------------- TIMELINE (FAN-OUT-ON-WRITE) ----------------
+# Her takipçinin ana akışı önceden hesaplanıyor: yükleme sırasında fotoğraf
+# takipçilerin satırlarına yazılır, okuma tek bir PK aralık taramasıdır.
+# Çok takipçili hesapların fotoğrafları buraya yazılmaz, okumada çekilir.
+class TimelineEntry(db.Model):
+    __tablename__ = "timeline_entry"
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    photo_id = db.Column(db.Integer, db.ForeignKey('photo.id'), primary_key=True, index=True)
+    # Takipten çıkınca o hesabın satırlarını silmek için
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
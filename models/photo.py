@@ -1,19 +1,122 @@
 from extensions import db
+from flask import url_for
 from datetime import datetime
+from sqlalchemy.orm import load_only
 
 class Photo(db.Model):
+    # Profil ızgarası keyset sayfalama: WHERE owner_id = ? AND id < ? ORDER BY id DESC
+    __table_args__ = (db.Index('ix_photo_owner_id_id', 'owner_id', 'id'),)
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(255))
     filename = db.Column(db.String(100), nullable=False)
+    # Dosyanın kendisi blob deposunda, burada sadece SHA-256 anahtarı duruyor
+    blob_hash = db.Column(db.String(64), index=True)
+    mimetype = db.Column(db.String(50))
+    # Küçük bulanık önizleme (data: URI, ~1KB altı). Ertelenmiş: sadece ızgara /
+    # akış / detay sorguları undefer ile okur, yazma yolları hiç çekmez
+    placeholder = db.deferred(db.Column(db.Text), group="large")
+    # Yüklemede başlıktan okunan (EXIF yönü uygulanmış) boyutlar
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
     
     # ✨ AI kodlarını tamamen temizledik, stabiliteye döndük!
     owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Sayaçlar yazma ile aynı transaction'da güncellenir (flask counters reconcile ile onarılır)
+    like_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     owner = db.relationship('User', backref=db.backref('photos', lazy=True))
 
     # --- SADECE BU 2 SATIRI EKLEDİK (HATALARI KÖKTEN ÇÖZER) ---
     # Beğeni sayısının gözükmesi ve yorumların listelenmesi için gerekli bağlantılar:
     comments = db.relationship('Comment', backref='photo', lazy=True, cascade="all, delete-orphan")
-    likes = db.relationship('Like', backref='photo', lazy=True, cascade="all, delete-orphan")
\ No newline at end of file
+    likes = db.relationship('Like', backref='photo', lazy=True, cascade="all, delete-orphan")
+    variants = db.relationship('PhotoVariant', backref='photo', lazy=True, cascade="all, delete-orphan",
+                               order_by='PhotoVariant.width')
+
+    # Yetki kontrolü ve sayaç yayını için yeterli kolonlar (bkz. meta_or_404)
+    META_COLUMNS = ("id", "owner_id", "like_count", "comment_count")
+
+    # Yazma yolları için sadece üst veri: sahip + sayaçlar (+ istenirse ek kolonlar)
+    @classmethod
+    def meta_or_404(cls, photo_id, *extra):
+        columns = [getattr(cls, name) for name in cls.META_COLUMNS + extra]
+        return cls.query.options(load_only(*columns)).filter(cls.id == photo_id).first_or_404()
+
+    # Commit satırı expire ediyor; sayaç yayını için tüm satır yerine sadece sayaçlar okunur
+    def refresh_counts(self):
+        db.session.refresh(self, list(self.META_COLUMNS))
+        return self
+
+    @property
+    def image_url(self):
+        if self.blob_hash:
+            return url_for("media", blob_hash=self.blob_hash)
+        return self.filename
+
+    @property
+    def thumb_url(self):
+        jpegs = [v for v in self.variants if v.format == "jpeg"]
+        return jpegs[0].url if jpegs else self.image_url
+
+    def srcset(self, fmt):
+        return ", ".join(f"{v.url} {v.width}w" for v in self.variants if v.format == fmt)
+
+    def variants_dict(self):
+        data = {}
+        for v in self.variants:
+            data.setdefault(v.format, []).append({"width": v.width, "url": v.url})
+        return data
+
+    def to_grid_dict(self):
+        return {
+            "id": self.id,
+            "image": self.image_url,
+            "thumb": self.thumb_url,
+            "srcset_webp": self.srcset("webp"),
+            "srcset_jpeg": self.srcset("jpeg"),
+            "placeholder": self.placeholder,
+            "width": self.width,
+            "height": self.height,
+        }
+
+    def to_feed_dict(self):
+        data = self.to_grid_dict()
+        data.update({
+            "owner": self.owner.username,
+            "avatar": self.owner.avatar_thumb_url,
+            "likes": self.like_count,
+            "comment_count": self.comment_count,
+        })
+        return data
+
+
+# ---------------- RESPONSIVE VARIANTS ----------------
+class PhotoVariant(db.Model):
+    __tablename__ = "photo_variant"
+    __table_args__ = (db.UniqueConstraint('photo_id', 'width', 'format', name='uq_photo_variant'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    photo_id = db.Column(db.Integer, db.ForeignKey('photo.id'), nullable=False, index=True)
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    format = db.Column(db.String(10), nullable=False)
+    blob_hash = db.Column(db.String(64), nullable=False, index=True)
+
+    @property
+    def url(self):
+        return url_for("media", blob_hash=self.blob_hash)
+
+
+# ---------------- BLOB TOMBSTONES ----------------
+# Referansı kalmayan blob hemen silinmez, burada bekler; flask blobs sweep süresi
+# dolanları referansı tekrar kontrol ederek siler (services/blobs.py)
+class BlobTombstone(db.Model):
+    __tablename__ = "blob_tombstone"
+
+    blob_hash = db.Column(db.String(64), primary_key=True)
+    released_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -1,32 +1,64 @@
 from extensions import db
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import validates
 from datetime import datetime
 
+from services.passwords import hash_password, verify_password
+from services.text import turkish_lower
+
 # ---------------- FOLLOW ASSOCIATION ----------------
+# PK (follower_id, followed_id) "kimi takip ediyorum" sorgularını, ters indeks
+# "beni kim takip ediyor" sorgularını karşılıyor
 followers_association = db.Table(
     'followers_assoc',
-    db.Column('follower_id', db.Integer, db.ForeignKey('user.id')),
-    db.Column('followed_id', db.Integer, db.ForeignKey('user.id'))
+    db.Column('follower_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    db.Column('followed_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    db.Index('ix_followers_assoc_followed_id', 'followed_id', 'follower_id')
 )
 
+_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
 # ---------------- USER MODEL ----------------
 class User(UserMixin, db.Model):
     __tablename__ = "user"
+    # Arama indeksleri: önek aramaları için B-tree, PostgreSQL'de "içinde geçen"
+    # aramalar için pg_trgm GIN (SQLite'ta aynı iş aşağıdaki FTS5 tablosunda)
+    __table_args__ = (
+        db.Index('ix_user_username_search', 'username_search',
+                 postgresql_ops={'username_search': 'varchar_pattern_ops'}),
+        db.Index('ix_user_username_search_trgm', 'username_search',
+                 postgresql_using='gin', postgresql_ops={'username_search': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
     username = db.Column(db.String(50), unique=True, nullable=False)
+    # turkish_lower(username); username atanınca otomatik dolar
+    username_search = db.Column(db.String(50), nullable=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
 
     is_admin = db.Column(db.Boolean, default=False)
 
-    avatar = db.Column(db.String(400), nullable=True)
-    bio = db.Column(db.Text, nullable=True)
+    # /media/<hash> adresleri: 320px kare (profil) ve 96px kare (listeler).
+    # İndeksler blob silinmeden önceki "hâlâ kullanılıyor mu" kontrolü için
+    avatar = db.Column(db.String(400), nullable=True, index=True)
+    avatar_thumb = db.Column(db.String(100), nullable=True, index=True)
+    # Ertelenmiş: sadece profil sayfası okuyor (undefer / ilk erişimde ayrı sorgu)
+    bio = db.deferred(db.Column(db.Text, nullable=True), group="large")
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # -------- SAYAÇLAR (flask counters reconcile ile onarılır) --------
+    # İndeks: ana akış çok takipçili hesapları bununla buluyor
+    follower_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+    following_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Bu id'ye kadarki bildirimler okundu; satır satır is_read güncellemesi yok
+    notifications_read_upto = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     # -------- FOLLOW SYSTEM --------
     followed = db.relationship(
         'User',
@@ -45,31 +77,95 @@ class User(UserMixin, db.Model):
         foreign_keys='Notification.user_id'
     )
 
+    @validates('username')
+    def _fold_username(self, key, value):
+        self.username_search = turkish_lower(value)
+        return value
+
+    # Listeler küçük kareyi kullanır; harici (eski) adreslerin küçük karesi yok
+    @property
+    def avatar_thumb_url(self):
+        return self.avatar_thumb or self.avatar or "https://picsum.photos/100"
+
     # -------- PASSWORD HELPERS --------
+    # Özet şifre havuzunda hesaplanır (services/passwords.py); havuz doluysa PasswordHashBusy
     def set_password(self, raw_password):
-        self.password = generate_password_hash(raw_password, method='pbkdf2:sha256')
+        self.password = hash_password(raw_password)
 
     def check_password(self, raw_password):
-        return check_password_hash(self.password, raw_password)
+        return verify_password(self.password, raw_password)
 
     # -------- FOLLOW HELPERS --------
+    # follow / unfollow gerçekten değişiklik yaptıysa True döner
+    # EXISTS-sonra-INSERT yerine INSERT ... ON CONFLICT DO NOTHING: eşzamanlı iki takip
+    # isteğinde ikincisi PK çakışmasıyla 500 vermez, sayaçlar sadece eklenen satır için artar
     def follow(self, user):
-        if not self.is_following(user):
-            self.followed.append(user)
+        insert = _INSERTS[db.session.get_bind().dialect.name]
+        added = db.session.execute(
+            insert(followers_association).values(follower_id=self.id, followed_id=user.id)
+            .on_conflict_do_nothing(index_elements=["follower_id", "followed_id"])
+            .returning(followers_association.c.follower_id)
+        ).first()
+        if added:
+            self._bump_follow_counts(user, 1)
+        return added is not None
 
     def unfollow(self, user):
-        if self.is_following(user):
-            self.followed.remove(user)
+        removed = db.session.execute(followers_association.delete().where(
+            followers_association.c.follower_id == self.id,
+            followers_association.c.followed_id == user.id
+        )).rowcount
+        if removed:
+            self._bump_follow_counts(user, -1)
+        return bool(removed)
+
+    def _bump_follow_counts(self, user, delta):
+        User.query.filter_by(id=self.id).update({User.following_count: User.following_count + delta})
+        User.query.filter_by(id=user.id).update({User.follower_count: User.follower_count + delta})
 
     def is_following(self, user):
-        return self.followed.filter(
+        return db.session.query(db.exists().where(
+            followers_association.c.follower_id == self.id,
             followers_association.c.followed_id == user.id
-        ).count() > 0
+        )).scalar()
+
+    # Verilen id'lerden hangilerini takip ediyorum? Tek sorgu (takipçi listeleri, arama)
+    def following_ids(self, user_ids):
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        rows = db.session.query(followers_association.c.followed_id).filter(
+            followers_association.c.follower_id == self.id,
+            followers_association.c.followed_id.in_(user_ids)
+        )
+        return {row.followed_id for row in rows}
+
+
+# ---------------- USER SEARCH (SQLITE FTS5) ----------------
+# username_search üzerinde trigram FTS5 indeksi; tetikleyicilerle user tablosuyla senkron
+USER_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5("
+    "username_search, content='user', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS user_search_ai AFTER INSERT ON user BEGIN "
+    "INSERT INTO user_search(rowid, username_search) VALUES (new.id, new.username_search); END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_ad AFTER DELETE ON user BEGIN "
+    "INSERT INTO user_search(user_search, rowid, username_search) VALUES ('delete', old.id, old.username_search); END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_au AFTER UPDATE OF username_search ON user BEGIN "
+    "INSERT INTO user_search(user_search, rowid, username_search) VALUES ('delete', old.id, old.username_search); "
+    "INSERT INTO user_search(rowid, username_search) VALUES (new.id, new.username_search); END",
+)
+
+event.listen(User.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect='postgresql'))
+for statement in USER_SEARCH_DDL:
+    event.listen(User.__table__, "after_create", DDL(statement).execute_if(dialect='sqlite'))
+event.listen(User.__table__, "before_drop", DDL("DROP TABLE IF EXISTS user_search").execute_if(dialect='sqlite'))
 
 
 # ---------------- COMMENT MODEL ----------------
 class Comment(db.Model):
     __tablename__ = "comment"
+    # Gönderi yorumları zaman sırasıyla, imleçli sayfalama için
+    __table_args__ = (db.Index('ix_comment_photo_id_timestamp', 'photo_id', 'timestamp', 'id'),)
 
     id = db.Column(db.Integer, primary_key=True)
     body = db.Column(db.String(140), nullable=False)
@@ -82,15 +178,21 @@ class Comment(db.Model):
 # ---------------- LIKE MODEL ----------------
 class Like(db.Model):
     __tablename__ = "like"
+    # Bir kullanıcı bir fotoğrafı sadece bir kez beğenebilir (toggle bu indekse dayanıyor)
+    __table_args__ = (db.UniqueConstraint('user_id', 'photo_id', name='uq_like_user_photo'),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    photo_id = db.Column(db.Integer, db.ForeignKey('photo.id'), nullable=False)
+    photo_id = db.Column(db.Integer, db.ForeignKey('photo.id'), nullable=False, index=True)
 
 
 # ---------------- NOTIFICATION MODEL ----------------
+# Sıcak tablo: son bildirimler. Okunmuş eski satırlar (ve çok bildirimi olan
+# hesaplarda son N'den eskiler) flask notifications compact ile arşive taşınır.
 class Notification(db.Model):
     __tablename__ = "notification"
+    # Okunmamış sayımı (user_id = ? AND id > işaret) ve son bildirimler listesi
+    __table_args__ = (db.Index('ix_notification_user_id_id', 'user_id', 'id'),)
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -100,6 +202,39 @@ class Notification(db.Model):
 
     photo_id = db.Column(db.Integer, db.ForeignKey('photo.id'), nullable=True)
     message = db.Column(db.String(255), nullable=False)
+    # Birleştirilmiş bildirimlerde kaç kişi ("@a ve 12 kişi daha ...")
+    actor_count = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
-    is_read = db.Column(db.Boolean, default=False)
-    timestamp = db.Column(db.DateTime, index=True, default=datetime.utcnow)
\ No newline at end of file
+    timestamp = db.Column(db.DateTime, index=True, default=datetime.utcnow)
+
+
+# Birleştirilmiş bildirimin farklı kişileri: aynı kişinin ikinci yorumu (veya sonraki
+# partide tekrar gelmesi) actor_count'u artırmaz. Bildirimle birlikte silinir.
+class NotificationActor(db.Model):
+    __tablename__ = "notification_actor"
+
+    notification_id = db.Column(db.Integer, db.ForeignKey('notification.id'), primary_key=True)
+    sender_username = db.Column(db.String(50), primary_key=True)
+
+
+# ---------------- NOTIFICATION ARCHIVE ----------------
+# Arşiv: id sıcak tablodaki id'nin aynısı. PostgreSQL'de aylık bölümlenmiş
+# (RANGE timestamp); saklama süresi dolan ay, bölümü düşürülerek silinir.
+# FK yok: silinen hesap / fotoğrafın satırları toplu silmede ayrıca temizleniyor.
+class NotificationArchive(db.Model):
+    __tablename__ = "notification_archive"
+    __table_args__ = (
+        db.Index('ix_notification_archive_user_id_id', 'user_id', 'id'),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # Bölüm anahtarı PK'de olmak zorunda
+    timestamp = db.Column(db.DateTime, primary_key=True)
+
+    user_id = db.Column(db.Integer, nullable=False)
+    sender_username = db.Column(db.String(50), nullable=False)
+    notif_type = db.Column(db.String(20), nullable=False)
+    photo_id = db.Column(db.Integer, nullable=True)
+    message = db.Column(db.String(255), nullable=False)
+    actor_count = db.Column(db.Integer, nullable=False, default=1, server_default='1')
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models.photo import Photo
+from models.user import User, Notification, NotificationArchive
+from services.cache import RedisCache
+from services.notifications import compact_notifications, deliver, forget_unread, mark_read_upto, unread_count
+
+
+def _notify(user, count, days_ago=0):
+    timestamp = datetime.utcnow() - timedelta(days=days_ago)
+    rows = [Notification(user_id=user.id, sender_username=f"kisi{i}", notif_type="follow",
+                         message=f"@kisi{i} sizi takip etmeye başladı.", timestamp=timestamp) for i in range(count)]
+    db.session.add_all(rows)
+    forget_unread(user.id)
+    db.session.commit()
+    return [n.id for n in rows]
+
+
+def test_opening_notifications_moves_watermark(app, client, make_user, login, count_queries):
+    owner = make_user("sahip")
+    ids = _notify(owner, 3)
+    login(client, "sahip")
+    assert unread_count(owner.id) == 3
+
+    with count_queries() as statements:
+        data = client.get("/notifications").get_json()
+    assert [n["id"] for n in data] == ids[::-1]
+    assert not any(s.lstrip().upper().startswith("UPDATE NOTIFICATION") for s in statements)
+    assert db.session.get(User, owner.id).notifications_read_upto == ids[-1]
+    assert unread_count(owner.id) == 0
+
+    _notify(owner, 1)
+    assert unread_count(owner.id) == 1
+
+
+def test_compaction_archives_read_rows_and_expires_old_ones(app, client, make_user, login, monkeypatch):
+    monkeypatch.setitem(app.config, "NOTIFICATION_HOT_MAX_PER_USER", 3)
+    monkeypatch.setitem(app.config, "NOTIFICATION_COMPACT_BATCH", 2)
+    owner, quiet = make_user("sahip"), make_user("sessiz")
+    _notify(owner, 1, days_ago=400)
+    old_read = _notify(owner, 2, days_ago=40)
+    recent_read = _notify(owner, 4)
+    unread = _notify(owner, 2)
+    quiet_ids = _notify(quiet, 2, days_ago=40)
+    User.query.filter_by(id=owner.id).update({User.notifications_read_upto: recent_read[-1]})
+    db.session.commit()
+
+    stats = compact_notifications()
+
+    # quiet'ın eski bildirimleri okunmamış: sıcak tabloda kalır
+    assert stats["expired"] == 1 and stats["heavy_users"] == 1
+    hot = {n.id for n in Notification.query}
+    assert hot == set(recent_read[-1:] + unread + quiet_ids)
+    assert {n.id for n in NotificationArchive.query} == set(old_read + recent_read[:-1])
+    assert unread_count(owner.id) == 2
+
+    # Liste sıcak tablo bitince arşivden devam eder
+    login(client, "sahip")
+    first = client.get("/notifications").get_json()
+    older = client.get(f"/notifications?before_id={first[-1]['id']}").get_json()
+    assert [n["id"] for n in first + older] == sorted(unread + recent_read + old_read, reverse=True)
+
+    assert compact_notifications(now=datetime.utcnow() + timedelta(days=400))["purged"] == 5
+    assert NotificationArchive.query.count() == 0
+
+
+def _like_events(owner_id, photo_id, senders):
+    return [{"user_id": owner_id, "sender": s, "type": "like", "photo_id": photo_id} for s in senders]
+
+
+def _owner_with_photo(make_user):
+    owner = make_user("sahip")
+    photo = Photo(title="Verzia Moment", filename="x", owner_id=owner.id)
+    db.session.add(photo)
+    db.session.commit()
+    return owner.id, photo.id
+
+
+def test_deliver_coalesces_into_open_row(app, make_user):
+    owner_id, photo_id = _owner_with_photo(make_user)
+
+    # Aynı kişinin ikinci beğenisi (partide de olsa) tekrar sayılmaz
+    assert deliver(_like_events(owner_id, photo_id, [f"kisi{i}" for i in range(12)] + ["kisi0"])) == 1
+    row = Notification.query.one()
+    assert (row.actor_count, row.sender_username) == (12, "kisi11")
+    assert row.message == "@kisi11 ve 11 kişi daha fotoğrafını beğendi."
+
+    # Sonraki parti okunmamış satıra eklenir, yeni satır yok
+    assert deliver(_like_events(owner_id, photo_id, ["yeni", "kisi3"])) == 0
+    db.session.expire_all()
+    row = Notification.query.one()
+    assert (row.actor_count, row.sender_username) == (13, "yeni")
+    assert row.message == "@yeni ve 12 kişi daha fotoğrafını beğendi."
+    assert unread_count(owner_id) == 1
+
+    # Başka tür / fotoğraf ayrı satır
+    deliver([{"user_id": owner_id, "sender": "yeni", "type": "comment", "photo_id": photo_id}])
+    assert Notification.query.count() == 2
+
+
+def test_repeat_comments_count_each_person_once(app, make_user):
+    owner_id, photo_id = _owner_with_photo(make_user)
+    comments = lambda senders: [{"user_id": owner_id, "sender": s, "type": "comment", "photo_id": photo_id} for s in senders]
+
+    assert deliver(comments(["ali", "ali", "veli"])) == 1
+    row = Notification.query.one()
+    assert (row.actor_count, row.message) == (2, "@veli ve 1 kişi daha fotoğrafına yorum yaptı.")
+
+    # Önceki partide sayılmış kişiler (son gönderen olmasalar da) tekrar sayılmaz
+    deliver(comments(["ali"]))
+    deliver(comments(["veli", "ali", "cem"]))
+    db.session.expire_all()
+    row = Notification.query.one()
+    assert (row.actor_count, row.sender_username) == (3, "cem")
+    assert row.message == "@cem ve 2 kişi daha fotoğrafına yorum yaptı."
+
+
+def test_read_rows_are_never_merged_into(app, make_user):
+    owner_id, photo_id = _owner_with_photo(make_user)
+    deliver(_like_events(owner_id, photo_id, ["ali"]))
+    first = Notification.query.one()
+    mark_read_upto(owner_id, first.id)
+    db.session.commit()
+
+    assert deliver(_like_events(owner_id, photo_id, ["veli"])) == 1
+    rows = Notification.query.order_by(Notification.id).all()
+    assert [(n.sender_username, n.actor_count) for n in rows] == [("ali", 1), ("veli", 1)]
+    assert rows[0].message == "@ali fotoğrafını beğendi."
+    assert unread_count(owner_id) == 1
+
+
+def test_like_unlike_like_notifies_once(app, client, make_user, login, fake_redis, monkeypatch):
+    owner_id, photo_id = _owner_with_photo(make_user)
+    make_user("hayran")
+    login(client, "hayran")
+
+    assert [client.post(f"/like/{photo_id}").get_json()["status"] for _ in range(3)] == ["liked", "unliked", "liked"]
+    row = Notification.query.one()
+    assert (row.sender_username, row.actor_count) == ("hayran", 1)
+
+    # Ortak önbellekte tekrar anahtarı diğer worker'ı da durdurur
+    worker_a, worker_b = RedisCache(client=fake_redis), RedisCache(client=fake_redis)
+    monkeypatch.setitem(app.extensions, "cache", worker_a)
+    deliver(_like_events(owner_id, photo_id, ["baska"]))
+    monkeypatch.setitem(app.extensions, "cache", worker_b)
+    deliver(_like_events(owner_id, photo_id, ["baska"]))
+    db.session.expire_all()
+    assert Notification.query.one().actor_count == 2
+
+
+def test_deleting_photo_removes_its_notifications(app, client, make_user, login, foreign_keys):
+    owner_id, photo_id = _owner_with_photo(make_user)
+    make_user("hayran")
+    login(client, "hayran")
+    assert client.post(f"/like/{photo_id}").get_json()["status"] == "liked"
+    assert client.post(f"/add_comment/{photo_id}", json={"text": "güzel"}).get_json()["status"] == "success"
+    db.session.add(NotificationArchive(id=999, timestamp=datetime.utcnow(), user_id=owner_id, sender_username="eski",
+                                       notif_type="like", photo_id=photo_id, message="@eski fotoğrafını beğendi."))
+    db.session.commit()
+    assert unread_count(owner_id) == 2
+
+    client.get("/logout")
+    login(client, "sahip")
+    assert client.post(f"/delete_photo/{photo_id}").get_json()["status"] == "success"
+    assert Notification.query.count() == NotificationArchive.query.count() == 0
+    assert unread_count(owner_id) == 0
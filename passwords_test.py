@@ -0,0 +1,39 @@
+from sqlalchemy import text
+
+from extensions import db
+from models.user import User
+from services.passwords import HashPool
+
+
+def test_login_rehashes_when_cost_changes(app, client, make_user, monkeypatch):
+    make_user("sahip")
+    assert User.query.filter_by(username="sahip").one().password.startswith("pbkdf2:sha256:1000$")
+
+    monkeypatch.setitem(app.config, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:2000")
+    assert client.post("/login", data={"username": "sahip@example.com", "password": "pass"}).status_code == 200
+    db.session.expire_all()
+    assert User.query.filter_by(username="sahip").one().password.startswith("pbkdf2:sha256:2000$")
+    assert client.post("/login", data={"username": "sahip", "password": "yanlis"}).status_code == 401
+    assert client.post("/login", data={"username": "sahip", "password": "pass"}).status_code == 200
+
+
+def test_full_hash_pool_sheds_load(app, client, make_user, monkeypatch):
+    make_user("sahip")
+    pool = HashPool(workers=1, queue_size=0, timeout=5)
+    monkeypatch.setitem(app.extensions, "password_pool", pool)
+    pool.slots.acquire()
+    try:
+        response = client.post("/login", data={"username": "sahip", "password": "pass"})
+    finally:
+        pool.slots.release()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert client.post("/login", data={"username": "sahip", "password": "pass"}).status_code == 200
+
+
+def test_login_lookups_use_unique_indexes(app):
+    for column in ("username", "email"):
+        query = User.query.filter_by(**{column: "x"}).limit(1).statement
+        sql = str(query.compile(db.engine, compile_kwargs={"literal_binds": True}))
+        plan = " ".join(row[-1] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + sql)))
+        assert "USING INDEX" in plan and "SCAN" not in plan
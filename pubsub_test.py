@@ -0,0 +1,83 @@
+import json
+import os
+import runpy
+
+import pytest
+
+from extensions import db
+from services.pubsub import LocalBroker, SUBSCRIBER_QUEUE_SIZE, get_broker, publish_after_commit
+
+GUNICORN_CONF = os.path.join(os.path.dirname(__file__), "gunicorn.conf.py")
+
+
+def test_local_broker_fans_out_per_channel():
+    broker = LocalBroker()
+    first, second = broker.subscribe(["user:1"]), broker.subscribe(["user:1", "photo:5"])
+    photo_only = broker.subscribe(["photo:5"])
+
+    broker.publish("user:1", "notification", {"n": 1})
+    broker.publish("photo:5", "counts", {"likes": 3})
+    assert first.get(0)["data"] == {"n": 1} and first.get(0) is None
+    assert [second.get(0)["event"], second.get(0)["event"]] == ["notification", "counts"]
+    assert photo_only.get(0) == {"channel": "photo:5", "event": "counts", "data": {"likes": 3}}
+
+    second.close()
+    broker.publish("user:1", "notification", {"n": 2})
+    assert second.get(0) is None and first.get(0)["data"] == {"n": 2}
+
+    # Okumayan abone yayını bloklamaz, fazlası düşer
+    for i in range(SUBSCRIBER_QUEUE_SIZE + 5):
+        broker.publish("user:1", "notification", {"n": i})
+    assert first.queue.qsize() == SUBSCRIBER_QUEUE_SIZE
+    first.close()
+    photo_only.close()
+    assert not broker._subscriptions
+
+
+def test_events_are_published_only_after_commit(app):
+    subscription = get_broker().subscribe(["user:7"])
+    try:
+        db.session.execute(db.text("SELECT 1"))
+        publish_after_commit("user:7", "notification", {"n": 1})
+        db.session.rollback()
+        assert subscription.get(0) is None
+        publish_after_commit("user:7", "notification", {"n": 2})
+        assert subscription.get(0) is None
+        db.session.commit()
+        assert subscription.get(0)["data"] == {"n": 2}
+    finally:
+        subscription.close()
+
+
+def test_notification_stream_delivers_events(app, client, make_user, login, monkeypatch):
+    owner, fan = make_user("sahip"), make_user("hayran")
+    owner_id = owner.id
+    monkeypatch.setitem(app.config, "SSE_HEARTBEAT", 0.05)
+    login(client, "sahip")
+
+    response = client.get("/notifications/stream?photo=5")
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    chunks = iter(response.response)
+    assert next(chunks) == b"retry: 5000\n\n"
+    assert next(chunks) == b": ping\n\n"
+
+    broker = get_broker()
+    broker.publish("photo:5", "counts", {"photo_id": 5, "likes": 1, "comments": 0})
+    broker.publish(f"user:{owner_id}", "notification", {"message": "merhaba"})
+    broker.publish(f"user:{fan.id}", "notification", {"message": "başkasına"})
+    assert next(chunks) == b'event: counts\ndata: {"photo_id": 5, "likes": 1, "comments": 0}\n\n'
+    event, data = next(chunks).decode("utf-8").strip().split("\n")
+    assert event == "event: notification" and json.loads(data[len("data: "):]) == {"message": "merhaba"}
+    assert next(chunks) == b": ping\n\n"
+
+    response.close()
+    assert not broker._subscriptions
+
+
+def test_gunicorn_refuses_workers_with_local_broker(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    monkeypatch.setenv("CACHE_BACKEND", "redis")
+    monkeypatch.delenv("PUBSUB_BACKEND", raising=False)
+    with pytest.raises(RuntimeError, match=r"PUBSUB_BACKEND=redis\|postgres"):
+        runpy.run_path(GUNICORN_CONF)
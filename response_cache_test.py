@@ -0,0 +1,99 @@
+import io
+
+from extensions import db
+from models.photo import Photo
+from services.cache import RedisCache
+
+
+def _photo(owner):
+    photo = Photo(title="Verzia Moment", filename="x", owner_id=owner.id)
+    db.session.add(photo)
+    db.session.commit()
+    return photo
+
+
+def test_post_details_revalidate_with_etag(app, client, make_user, login):
+    owner = make_user("sahip")
+    photo = _photo(owner)
+    login(client, "sahip")
+
+    first = client.get(f"/get_post_details/{photo.id}")
+    assert first.status_code == 200 and first.headers["ETag"]
+    again = client.get(f"/get_post_details/{photo.id}", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+    client.post(f"/like/{photo.id}")
+    changed = client.get(f"/get_post_details/{photo.id}", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.get_json()["likes"] == 1 and changed.get_json()["is_liked"] is True
+
+
+def test_repeated_profile_views_skip_the_database(app, client, make_user, login, count_queries):
+    owner = make_user("sahip", password="-")
+    make_user("izleyen")
+    _photo(owner)
+    login(client, "izleyen")
+    assert client.get("/profile/sahip").status_code == 200
+
+    with count_queries() as statements:
+        response = client.get("/profile/sahip")
+    assert response.status_code == 200
+    # En fazla oturumdaki kullanıcının yüklenmesi
+    assert len(statements) <= 1
+
+
+def test_writes_invalidate_profile(app, client, make_user, login):
+    make_user("sahip")
+    login(client, "sahip")
+    etag = client.get("/profile/sahip").headers["ETag"]
+
+    client.post("/update_bio", data={"bio": "Yeni biyografi"})
+    response = client.get("/profile/sahip", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Yeni biyografi" in response.get_data(as_text=True)
+
+    client.post("/settings", data={"username": "yenisahip"})
+    assert client.get("/profile/sahip").status_code == 404
+    assert client.get("/profile/yenisahip").status_code == 200
+
+
+# İki worker, tek DB, ortak Redis: birinin yazması diğerinin ETag'ini de geçersiz kılar
+def test_versions_are_shared_between_workers(app, client, make_user, login, fake_redis, monkeypatch):
+    owner = make_user("sahip")
+    photo_id = _photo(owner).id
+    worker_a, worker_b = RedisCache(client=fake_redis), RedisCache(client=fake_redis)
+    login(client, "sahip")
+
+    monkeypatch.setitem(app.extensions, "cache", worker_b)
+    stale = client.get(f"/get_post_details/{photo_id}").headers["ETag"]
+    stale_profile = client.get("/profile/sahip").headers["ETag"]
+
+    monkeypatch.setitem(app.extensions, "cache", worker_a)
+    client.post(f"/like/{photo_id}")
+    client.post("/update_bio", data={"bio": "Yeni biyografi"})
+
+    monkeypatch.setitem(app.extensions, "cache", worker_b)
+    fresh = client.get(f"/get_post_details/{photo_id}", headers={"If-None-Match": stale})
+    assert fresh.status_code == 200 and fresh.get_json()["likes"] == 1
+    assert fresh.headers["ETag"] != stale
+    assert client.get(f"/get_post_details/{photo_id}", headers={"If-None-Match": fresh.headers["ETag"]}).status_code == 304
+
+    profile = client.get("/profile/sahip", headers={"If-None-Match": stale_profile})
+    assert profile.status_code == 200 and "Yeni biyografi" in profile.get_data(as_text=True)
+
+
+# Reddedilen yükleme profile yönlendirip hata gösterir; tarayıcının elindeki ETag 304 almamalı
+def test_flash_after_redirect_bypasses_etag(app, client, make_user, login):
+    make_user("sahip")
+    login(client, "sahip")
+    etag = client.get("/profile/sahip").headers["ETag"]
+
+    response = client.post("/upload", data={"photo": (io.BytesIO(b"resim degil"), "a.png")})
+    assert response.status_code == 302
+    shown = client.get("/profile/sahip", headers={"If-None-Match": etag})
+    assert shown.status_code == 200 and "ETag" not in shown.headers
+    assert "a.png: Sadece JPEG, PNG, GIF veya WebP yüklenebilir." in shown.get_data(as_text=True)
+
+    with client.session_transaction() as session:
+        assert not session.get("_flashes")
+    assert client.get("/profile/sahip", headers={"If-None-Match": etag}).status_code == 304
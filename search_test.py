@@ -0,0 +1,65 @@
+from extensions import db
+from models.user import User
+from services.search import find_users
+from services.text import turkish_lower
+
+
+def _users(*usernames):
+    for username in usernames:
+        db.session.add(User(username=username, email=f"{username}@example.com", password="-"))
+    db.session.commit()
+
+
+def test_turkish_lower():
+    assert turkish_lower("İSTANBUL") == "istanbul"
+    assert turkish_lower("IŞIK") == "ışık"
+    assert turkish_lower(None) == ""
+
+
+def test_exact_then_prefix_then_contains(app):
+    _users("deniz_kaya", "adeniz", "deniz", "denizci")
+
+    names = [u.username for u in find_users("Deniz")]
+
+    assert names == ["deniz", "denizci", "deniz_kaya", "adeniz"]
+
+
+def test_turkish_case_folding(app):
+    _users("İrem", "Işıl", "ilker")
+
+    assert [u.username for u in find_users("irem")] == ["İrem"]
+    assert [u.username for u in find_users("IŞI")] == ["Işıl"]
+    assert [u.username for u in find_users("ışıl")] == ["Işıl"]
+
+
+def test_followed_users_are_boosted(app, make_user):
+    viewer = make_user("bakan", password="-")
+    _users("ece", "ece_b", "ece_a")
+    followed = User.query.filter_by(username="ece_b").one()
+    viewer.follow(followed)
+    db.session.commit()
+
+    ranked = find_users("ece", viewer_id=viewer.id)
+    assert [u.username for u in ranked] == ["ece", "ece_b", "ece_a"]
+    assert [u.is_following for u in ranked] == [False, True, False]
+
+    plain = find_users("ece", viewer_id=viewer.id, boost_following=False)
+    assert [u.username for u in plain] == ["ece", "ece_a", "ece_b"]
+
+
+def test_renamed_and_deleted_users_leave_the_index(app, client, make_user, login):
+    make_user("arayan")
+    _users("eskiad")
+    user = User.query.filter_by(username="eskiad").one()
+    user.username = "yeniad"
+    db.session.commit()
+
+    assert find_users("eskia") == []
+    assert [u.username for u in find_users("niad")] == ["yeniad"]
+
+    db.session.delete(user)
+    db.session.commit()
+    assert find_users("niad") == []
+
+    response = login(client, "arayan").get("/search_users?q=ARA")
+    assert [u["username"] for u in response.get_json()] == ["arayan"]
@@ -0,0 +1,290 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import click
+from flask import current_app
+from sqlalchemy import delete, func, or_, select, union
+
+from extensions import db
+from models.admin import AdminJob
+from models.feed import TimelineEntry
+from models.photo import Photo, PhotoVariant
+from models.user import User, Comment, Like, Notification, NotificationArchive, followers_association
+from services.blobs import release_unused_blobs
+from services.cache import get_cache
+from services.counters import recount
+from services.storage import media_hash
+from services.notifications import delete_notifications, delete_photo_notifications, forget_unread, unread_recipients
+from services.text import turkish_lower
+from services.versions import touch
+
+logger = logging.getLogger(__name__)
+
+ADMIN_PAGE_SIZE = 50
+# Her parça ayrı transaction: uzun kilit yok, iş yarıda kalırsa kaldığı yerden devam eder
+JOB_CHUNK = 500
+
+
+# --------------------- FİLTRELER ---------------------
+# Liste ve "filtreye uyan tümü" işleri aynı filtreyi kullanır
+def _parse_date(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+# Boş filtre (q yok, tarih yok / okunamıyor) her kaydı seçer; toplu işler buna izin vermez
+def has_filter(q=None, created_after=None):
+    return bool(q and q.strip()) or _parse_date(created_after) is not None
+
+
+def user_filter(query, q=None, created_after=None):
+    if q and q.strip():
+        q = q.strip()
+        query = query.where(or_(User.username_search.startswith(turkish_lower(q), autoescape=True),
+                                User.email.contains(q, autoescape=True)))
+    created_after = _parse_date(created_after)
+    if created_after:
+        query = query.where(User.created_at >= created_after)
+    return query
+
+
+def photo_filter(query, q=None, created_after=None):
+    if q and q.strip():
+        owners = select(User.id).where(User.username_search.startswith(turkish_lower(q.strip()), autoescape=True))
+        query = query.where(Photo.owner_id.in_(owners))
+    created_after = _parse_date(created_after)
+    if created_after:
+        query = query.where(Photo.created_at >= created_after)
+    return query
+
+
+# --------------------- LİSTE (SADECE META VERİ) ---------------------
+def _page(query, id_column, before_id):
+    if before_id:
+        query = query.where(id_column < before_id)
+    rows = db.session.execute(query.order_by(id_column.desc()).limit(ADMIN_PAGE_SIZE + 1)).all()
+    next_before_id = rows[ADMIN_PAGE_SIZE - 1].id if len(rows) > ADMIN_PAGE_SIZE else None
+    return rows[:ADMIN_PAGE_SIZE], next_before_id
+
+
+def users_page(q=None, created_after=None, before_id=None):
+    query = select(User.id, User.username, User.email, User.created_at, User.follower_count, User.following_count)
+    return _page(user_filter(query, q, created_after), User.id, before_id)
+
+
+def photos_page(q=None, created_after=None, before_id=None):
+    query = (select(Photo.id, Photo.title, Photo.created_at, Photo.mimetype, Photo.width, Photo.height,
+                    Photo.like_count, Photo.comment_count, User.username.label("owner"))
+             .join(User, User.id == Photo.owner_id))
+    return _page(photo_filter(query, q, created_after), Photo.id, before_id)
+
+
+def is_protected(username):
+    return "verzia" in turkish_lower(username)
+
+
+# --------------------- TOPLU İŞLEMLER ---------------------
+def _ids(query):
+    return list(db.session.execute(query).scalars())
+
+
+def _in_chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), JOB_CHUNK):
+        yield ids[start:start + JOB_CHUNK]
+
+
+def _delete(model, condition):
+    db.session.execute(delete(model).where(condition).execution_options(synchronize_session=False))
+
+
+# Silinecek okunmamış bildirimlerin sahiplerinin sayaç önbelleği düşsün
+def _forget_unread_of(condition):
+    for user_id in unread_recipients(condition):
+        forget_unread(user_id)
+
+
+def _recount_and_touch(photo_ids=(), user_ids=()):
+    for chunk in _in_chunks(photo_ids):
+        recount(photo_ids=chunk, user_ids=[])
+    for chunk in _in_chunks(user_ids):
+        recount(photo_ids=[], user_ids=chunk)
+    for photo_id in photo_ids:
+        touch("photo", photo_id)
+    for user_id in user_ids:
+        touch("user", user_id)
+
+
+# Silinen fotoğrafların blob'ları commit'ten sonra temizlenir; hash'leri döner
+def _delete_photos(photo_ids):
+    photos = db.session.execute(select(Photo.id, Photo.owner_id, Photo.blob_hash).where(Photo.id.in_(photo_ids))).all()
+    blob_hashes = [p.blob_hash for p in photos]
+    blob_hashes += _ids(select(PhotoVariant.blob_hash).where(PhotoVariant.photo_id.in_(photo_ids)))
+    delete_photo_notifications(photo_ids)
+    for model, column in ((Like, Like.photo_id), (Comment, Comment.photo_id), (TimelineEntry, TimelineEntry.photo_id),
+                          (PhotoVariant, PhotoVariant.photo_id), (Photo, Photo.id)):
+        _delete(model, column.in_(photo_ids))
+    for photo in photos:
+        touch("photo", photo.id)
+        touch("user", photo.owner_id)
+    return blob_hashes
+
+
+def _delete_users(user_ids):
+    usernames = _ids(select(User.username).where(User.id.in_(user_ids)))
+    avatars = db.session.execute(select(User.avatar, User.avatar_thumb).where(User.id.in_(user_ids))).all()
+    blob_hashes = [media_hash(url) for row in avatars for url in row]
+    for chunk in _in_chunks(_ids(select(Photo.id).where(Photo.owner_id.in_(user_ids)))):
+        blob_hashes += _delete_photos(chunk)
+
+    # Başkalarının gönderilerine bıraktıkları beğeni / yorum ve takip ilişkileri gidince
+    # o gönderilerin ve hesapların sayaçları yeniden hesaplanır
+    follows = followers_association.c
+    photo_ids = _ids(union(select(Like.photo_id).where(Like.user_id.in_(user_ids)),
+                           select(Comment.photo_id).where(Comment.user_id.in_(user_ids))))
+    other_ids = set(_ids(union(select(follows.followed_id).where(follows.follower_id.in_(user_ids)),
+                               select(follows.follower_id).where(follows.followed_id.in_(user_ids))))) - set(user_ids)
+
+    notifications = or_(Notification.user_id.in_(user_ids), Notification.sender_username.in_(usernames))
+    _forget_unread_of(notifications)
+    delete_notifications(notifications)
+    _delete(NotificationArchive, or_(NotificationArchive.user_id.in_(user_ids), NotificationArchive.sender_username.in_(usernames)))
+    _delete(Like, Like.user_id.in_(user_ids))
+    _delete(Comment, Comment.user_id.in_(user_ids))
+    _delete(TimelineEntry, or_(TimelineEntry.user_id.in_(user_ids), TimelineEntry.owner_id.in_(user_ids)))
+    db.session.execute(followers_association.delete().where(
+        or_(follows.follower_id.in_(user_ids), follows.followed_id.in_(user_ids))))
+    _delete(User, User.id.in_(user_ids))
+
+    _recount_and_touch(photo_ids, other_ids)
+    cache = get_cache()
+    for user_id, username in zip(user_ids, usernames):
+        touch("user", user_id)
+        # app.user_id_for önbelleği; silinmiş id'ye giden profil zaten 404 döner
+        cache.delete(f"uid:{username}")
+    return blob_hashes
+
+
+# Hesaplar kalır, yorumları (ve yorum bildirimleri) silinir
+def _purge_comments(user_ids):
+    usernames = _ids(select(User.username).where(User.id.in_(user_ids)))
+    photo_ids = _ids(select(Comment.photo_id).where(Comment.user_id.in_(user_ids)).distinct())
+    notifications = (Notification.sender_username.in_(usernames)) & (Notification.notif_type == "comment")
+    _forget_unread_of(notifications)
+    delete_notifications(notifications)
+    _delete(NotificationArchive, NotificationArchive.sender_username.in_(usernames) & (NotificationArchive.notif_type == "comment"))
+    _delete(Comment, Comment.user_id.in_(user_ids))
+    _recount_and_touch(photo_ids)
+    return []
+
+
+# action: (hedef türü, parça işleyici)
+ACTIONS = {
+    "delete_users": ("users", _delete_users),
+    "delete_photos": ("photos", _delete_photos),
+    "purge_comments": ("users", _purge_comments),
+}
+
+
+def _targets(kind, params):
+    if kind == "users":
+        # Yönetici hesaplarına toplu işlem uygulanmaz
+        query, column = select(User.id).where(~func.coalesce(User.username_search, "").contains("verzia")), User.id
+        if "ids" not in params:
+            query = user_filter(query, **params.get("filter", {}))
+    else:
+        query, column = select(Photo.id), Photo.id
+        if "ids" not in params:
+            query = photo_filter(query, **params.get("filter", {}))
+    if "ids" in params:
+        query = query.where(column.in_([int(i) for i in params["ids"]]))
+    return query, column
+
+
+def create_job(action, params, created_by=None):
+    if action not in ACTIONS:
+        raise ValueError(action)
+    if "ids" not in params and not has_filter(**params.get("filter", {})):
+        raise ValueError("Filtresiz toplu işlem")
+    query, _ = _targets(ACTIONS[action][0], params)
+    total = db.session.execute(select(func.count()).select_from(query.subquery())).scalar()
+    job = AdminJob(action=action, params=json.dumps(params), total=total, created_by=created_by)
+    db.session.add(job)
+    db.session.commit()
+    schedule_job(job.id)
+    return job
+
+
+def run_job(job_id):
+    job = db.session.get(AdminJob, job_id)
+    if job is None or job.status == "done":
+        return
+    kind, handler = ACTIONS[job.action]
+    params = json.loads(job.params)
+    query, column = _targets(kind, params)
+    # Yeniden başlatılan iş baştan sayar; işleyiciler tekrar çalışmaya dayanıklı
+    job.status, job.done = "running", 0
+    db.session.commit()
+    last_id = 0
+    while True:
+        ids = _ids(query.where(column > last_id).order_by(column).limit(JOB_CHUNK))
+        if not ids:
+            break
+        last_id = ids[-1]
+        blob_hashes = handler(ids)
+        job.done += len(ids)
+        db.session.commit()
+        release_unused_blobs(blob_hashes)
+    job.status, job.finished_at = "done", datetime.utcnow()
+    db.session.commit()
+
+
+def _run_in_context(app, job_id):
+    with app.app_context():
+        try:
+            run_job(job_id)
+        except Exception as e:
+            logger.exception("Toplu işlem başarısız: job_id=%s", job_id)
+            db.session.rollback()
+            job = db.session.get(AdminJob, job_id)
+            if job is not None:
+                job.status, job.error, job.finished_at = "failed", str(e)[:500], datetime.utcnow()
+                db.session.commit()
+
+
+# Tek havuz thread'i: moderasyon işleri sırayla, web worker'larını yormadan
+def schedule_job(job_id):
+    app = current_app._get_current_object()
+    if app.config.get("ADMIN_JOBS_INLINE"):
+        return _run_in_context(app, job_id)
+    return app.extensions["admin_pool"].submit(_run_in_context, app, job_id)
+
+
+def recent_jobs(limit=10):
+    return AdminJob.query.order_by(AdminJob.id.desc()).limit(limit).all()
+
+
+# --------------------- CLI ---------------------
+@click.group("admin")
+def admin_cli():
+    pass
+
+
+# Process yeniden başlarken yarıda kalan (queued / running) işleri tamamlar
+@admin_cli.command("resume")
+def resume():
+    app = current_app._get_current_object()
+    pending = [job.id for job in AdminJob.query.filter(AdminJob.status.in_(("queued", "running"))).order_by(AdminJob.id)]
+    for job_id in pending:
+        _run_in_context(app, job_id)
+        click.echo(f"İş {job_id}: {db.session.get(AdminJob, job_id).status}")
+    click.echo(f"{len(pending)} iş işlendi")
+
+
+def init_admin(app):
+    app.extensions["admin_pool"] = ThreadPoolExecutor(max_workers=1)
+    app.cli.add_command(admin_cli)
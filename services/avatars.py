@@ -0,0 +1,46 @@
+import io
+
+from flask import current_app, url_for
+from PIL import Image, ImageOps
+
+from services.blobs import put_blob
+from services.storage import media_hash
+from services.uploads import spooled_upload
+
+# Profil sayfası 150px, listeler 35px gösteriyor; retina için iki katı
+AVATAR_SIZES = {"avatar": 320, "avatar_thumb": 96}
+AVATAR_QUALITY = 85
+
+
+def _encode(img, size):
+    square = ImageOps.fit(img, (size, size), Image.LANCZOS)
+    buf = io.BytesIO()
+    square.save(buf, "JPEG", quality=AVATAR_QUALITY, optimize=True)
+    buf.seek(0)
+    return buf
+
+
+# Resmi ortadan kare kırpıp her boyutu blob deposuna yazar; {kolon: url} döner.
+# URL'ler içerik hash'i olduğu için tarayıcı süresiz önbellekleyebilir.
+def build_avatar(source):
+    with Image.open(source) as img:
+        img.draft("RGB", (max(AVATAR_SIZES.values()),) * 2)
+        img = ImageOps.exif_transpose(img).convert("RGB")
+    img.info = {}
+    urls = {}
+    for column, size in AVATAR_SIZES.items():
+        blob_hash, _ = put_blob(_encode(img, size))
+        urls[column] = url_for("media", blob_hash=blob_hash)
+    return urls
+
+
+# Yüklenen dosyayı doğrular, varyantları üretip kullanıcıya yazar; orijinal saklanmaz.
+# Eski avatarın blob anahtarlarını döner: çağıran commit'ten sonra
+# release_unused_blobs ile bırakır (aynı dosyayı kullanan başka hesap yoksa silinmek üzere işaretlenir)
+def set_avatar(user, file):
+    with spooled_upload(file, max_size=current_app.config["AVATAR_MAX_BYTES"]) as (tmp_path, _):
+        urls = build_avatar(tmp_path)
+    replaced = [media_hash(getattr(user, column)) for column in urls]
+    for column, url in urls.items():
+        setattr(user, column, url)
+    return [blob_hash for blob_hash in replaced if blob_hash]
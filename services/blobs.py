@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from models.photo import BlobTombstone, Photo, PhotoVariant
+from models.user import User
+from services.storage import MEDIA_PREFIX, get_blob_store
+
+_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+# Blob'lar içerik hash'iyle saklanıyor, aynı baytları yükleyen herkes aynı dosyaya
+# bağlanıyor (dedup). Bu yüzden referansı kalmayan blob hemen silinmez:
+#   1. release_unused_blobs onu blob_tombstone'a yazar
+#   2. put_blob mevcut bir blob'a bağlanırken işaretini kaldırır (claim, yüklemenin
+#      transaction'ında; süren bir temizlik bitene kadar bekler)
+#   3. flask blobs sweep (cron) BLOB_DELETE_GRACE_SECONDS'tan eski işaretleri alır,
+#      referansı hâlâ yoksa dosyayı siler
+# Bekleme süresi, işaret yazılmadan hemen önce aynı blob'a bağlanıp henüz commit
+# etmemiş yüklemeler için.
+
+
+def _is_referenced(blob_hash):
+    if db.session.query(Photo.id).filter_by(blob_hash=blob_hash).first():
+        return True
+    if db.session.query(PhotoVariant.id).filter_by(blob_hash=blob_hash).first():
+        return True
+    url = MEDIA_PREFIX + blob_hash
+    return db.session.query(User.id).filter(db.or_(User.avatar == url, User.avatar_thumb == url)).first() is not None
+
+
+def claim_blob(blob_hash):
+    db.session.execute(delete(BlobTombstone).where(BlobTombstone.blob_hash == blob_hash))
+
+
+# Depoya yazar; içerik zaten varsa silinmeyi bekliyor olabilir, sahiplenir.
+# Referansı yazan commit işareti de kaldırır.
+def put_blob(stream, max_size=None, validate=None):
+    return get_blob_store().put_stream(stream, max_size=max_size, validate=validate, claim=claim_blob)
+
+
+# Artık hiçbir fotoğraf / varyant / avatar tarafından kullanılmayan blob'ları silinmek
+# üzere işaretler. Commit'ten sonra çağrılmalı: referans kontrolü kaydedilmiş satırlara bakıyor.
+def release_unused_blobs(blob_hashes):
+    unused = [blob_hash for blob_hash in set(filter(None, blob_hashes)) if not _is_referenced(blob_hash)]
+    if not unused:
+        return 0
+    insert = _INSERTS[db.session.get_bind().dialect.name](BlobTombstone)
+    now = datetime.utcnow()
+    db.session.execute(
+        insert.values([{"blob_hash": blob_hash, "released_at": now} for blob_hash in unused])
+        .on_conflict_do_update(index_elements=["blob_hash"], set_={"released_at": insert.excluded.released_at})
+    )
+    db.session.commit()
+    return len(unused)
+
+
+# İşaret satırı silinip (kilitlenip) dosya commit'ten önce siliniyor: aynı anda
+# claim_blob yapan yükleme ya bu commit'i bekler ve dosyanın gittiğini görüp yeniden
+# yazar, ya da işareti önce almıştır ve bu parti onu hiç görmez
+def sweep_blobs(now=None, batch_size=500):
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=current_app.config["BLOB_DELETE_GRACE_SECONDS"])
+    store = get_blob_store()
+    expired = select(BlobTombstone.blob_hash).where(BlobTombstone.released_at < cutoff).limit(batch_size)
+    deleted = 0
+    while True:
+        hashes = list(db.session.execute(
+            delete(BlobTombstone).where(BlobTombstone.blob_hash.in_(expired), BlobTombstone.released_at < cutoff)
+            .returning(BlobTombstone.blob_hash)
+        ).scalars())
+        if not hashes:
+            return deleted
+        for blob_hash in hashes:
+            if not _is_referenced(blob_hash):
+                store.delete(blob_hash)
+                deleted += 1
+        db.session.commit()
+
+
+# --------------------- CLI ---------------------
+@click.group("blobs")
+def blobs_cli():
+    pass
+
+
+@blobs_cli.command("sweep")
+@click.option("--batch-size", default=500, show_default=True)
+def sweep(batch_size):
+    click.echo(f"Silinen blob: {sweep_blobs(batch_size=batch_size)}")
+
+
+def init_blobs(app):
+    app.cli.add_command(blobs_cli)
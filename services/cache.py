@@ -0,0 +1,118 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+
+# --------------------- PROCESS İÇİ LRU ---------------------
+class LRUCache:
+    def __init__(self, max_entries=10000, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    # Sadece anahtar varsa artırır; yoksa None döner (bir sonraki okuma DB'den doldurur)
+    def incr(self, key, delta=1):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] < time.monotonic():
+                return None
+            value = item[0] + delta
+            self._data[key] = (value, item[1])
+            return value
+
+
+# --------------------- REDIS UYUMLU ---------------------
+class RedisCache:
+    def __init__(self, url=None, client=None, default_ttl=300, prefix="verzia:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("Redis önbelleği için redis paketi kurulu olmalı.")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    # Sayılar düz tutuluyor ki INCRBY çalışsın, diğer her şey pickle
+    def _dump(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value)
+        return pickle.dumps(value)
+
+    def _load(self, raw):
+        if raw is None:
+            return None
+        try:
+            return int(raw)
+        except ValueError:
+            return pickle.loads(raw)
+
+    def get(self, key):
+        return self._load(self.client.get(self.prefix + key))
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, self._dump(value), ex=ttl or self.default_ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    # LRUCache ile aynı anlam: anahtar yoksa oluşturma (WATCH/MULTI, Lua gerektirmez)
+    def incr(self, key, delta=1):
+        from redis.exceptions import WatchError
+        key = self.prefix + key
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    if not pipe.exists(key):
+                        pipe.reset()
+                        return None
+                    pipe.multi()
+                    pipe.incrby(key, delta)
+                    return pipe.execute()[0]
+                except WatchError:
+                    continue
+
+
+# --------------------- KURULUM ---------------------
+def init_cache(app):
+    ttl = app.config.get("CACHE_DEFAULT_TTL", 300)
+    if app.config.get("CACHE_BACKEND") == "redis":
+        cache = RedisCache(url=app.config["CACHE_REDIS_URL"], default_ttl=ttl)
+    else:
+        cache = LRUCache(max_entries=app.config.get("CACHE_MAX_ENTRIES", 10000), default_ttl=ttl)
+    app.extensions["cache"] = cache
+    return cache
+
+
+def get_cache():
+    return current_app.extensions["cache"]
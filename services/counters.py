@@ -0,0 +1,62 @@
+import click
+from sqlalchemy import func, select
+
+from extensions import db
+from models.user import User, Comment, Like, followers_association
+from models.photo import Photo
+
+
+# Sayaçları tek bir UPDATE ile artır/azalt: "col = col + delta", yarış durumunda sayı kaybolmaz.
+# Çağıran tarafın transaction'ı içinde çalışır, commit onun işi.
+def bump(model, object_id, **deltas):
+    values = {getattr(model, name): getattr(model, name) + delta for name, delta in deltas.items()}
+    db.session.query(model).filter(model.id == object_id).update(values)
+
+
+# Sayaçları gerçek satır sayılarından yeniden hesaplar; id verilirse sadece onlar
+# (toplu silme sonrası). Commit çağıranın işi.
+def recount(photo_ids=None, user_ids=None):
+    like_count = select(func.count(Like.id)).where(Like.photo_id == Photo.id).scalar_subquery()
+    comment_count = select(func.count(Comment.id)).where(Comment.photo_id == Photo.id).scalar_subquery()
+    follower_count = (
+        select(func.count()).select_from(followers_association)
+        .where(followers_association.c.followed_id == User.id).scalar_subquery()
+    )
+    following_count = (
+        select(func.count()).select_from(followers_association)
+        .where(followers_association.c.follower_id == User.id).scalar_subquery()
+    )
+    photos = db.session.query(Photo).filter((Photo.like_count != like_count) | (Photo.comment_count != comment_count))
+    users = db.session.query(User).filter((User.follower_count != follower_count) | (User.following_count != following_count))
+    if photo_ids is not None:
+        photos = photos.filter(Photo.id.in_(photo_ids))
+    if user_ids is not None:
+        users = users.filter(User.id.in_(user_ids))
+    fixed_photos = fixed_users = 0
+    if photo_ids is None or photo_ids:
+        fixed_photos = photos.update({Photo.like_count: like_count, Photo.comment_count: comment_count}, synchronize_session=False)
+    if user_ids is None or user_ids:
+        fixed_users = users.update({User.follower_count: follower_count, User.following_count: following_count}, synchronize_session=False)
+    return fixed_photos, fixed_users
+
+
+def reconcile_counters():
+    photos, users = recount()
+    db.session.commit()
+    return photos, users
+
+
+# --------------------- CLI ---------------------
+@click.group("counters")
+def counters_cli():
+    pass
+
+
+@counters_cli.command("reconcile")
+def reconcile():
+    photos, users = reconcile_counters()
+    click.echo(f"Düzeltilen: {photos} fotoğraf, {users} kullanıcı")
+
+
+def init_counters(app):
+    app.cli.add_command(counters_cli)
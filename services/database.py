@@ -0,0 +1,112 @@
+import time
+from functools import wraps
+
+from flask import current_app, has_request_context, session as flask_session
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool, QueuePool
+
+from extensions import db
+
+POOL_COUNTERS = ("connects", "checkouts", "invalidations")
+
+
+# --------------------- MOTOR AYARLARI ---------------------
+# Sadece PostgreSQL için; SQLite'ta SQLAlchemy varsayılanları yeterli
+def engine_options(config, url):
+    if not url or not url.startswith("postgresql"):
+        return {}
+    if config["DB_PGBOUNCER"]:
+        # Havuzu PgBouncer tutuyor. Transaction modunda bağlantı her transaction'da
+        # değişebildiği için startup "options" parametresi yerine SET LOCAL kullanılıyor.
+        return {"poolclass": NullPool}
+    options = {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+    if config["DB_STATEMENT_TIMEOUT_MS"]:
+        options["connect_args"] = {"options": f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+    return options
+
+
+def _local_timeout(timeout_ms):
+    def set_local(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+    return set_local
+
+
+def _instrument(app, name, engine):
+    counters = app.extensions["db_pool_counters"][name] = dict.fromkeys(POOL_COUNTERS, 0)
+
+    def bump(key):
+        def listener(*args):
+            counters[key] += 1
+        return listener
+
+    event.listen(engine, "connect", bump("connects"))
+    event.listen(engine, "checkout", bump("checkouts"))
+    event.listen(engine, "invalidate", bump("invalidations"))
+    config = app.config
+    if config["DB_PGBOUNCER"] and config["DB_STATEMENT_TIMEOUT_MS"] and engine.dialect.name == "postgresql":
+        event.listen(engine, "begin", _local_timeout(config["DB_STATEMENT_TIMEOUT_MS"]))
+
+
+# Worker başına havuz durumu (izleme için)
+def pool_stats():
+    counters = current_app.extensions["db_pool_counters"]
+    stats = {}
+    for key, engine in db.engines.items():
+        name = key or "primary"
+        row = dict(counters[name])
+        if isinstance(engine.pool, QueuePool):
+            pool = engine.pool
+            row.update(size=pool.size(), checked_in=pool.checkedin(), checked_out=pool.checkedout(), overflow=pool.overflow())
+        stats[name] = row
+    return stats
+
+
+# --------------------- OKUMA REPLİKASI ---------------------
+def reading_replica():
+    return bool(db.session.info.get("replica"))
+
+
+# GET view'ları için: replika tanımlıysa okumalar oradan yapılır. Son birkaç saniyede
+# yazan kullanıcı birincilden okur, kendi değişikliğini görsün.
+def read_replica(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if "replica" not in db.engines or flask_session.get("db_primary_until", 0) > time.time():
+            return view(*args, **kwargs)
+        db.session.info["replica"] = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            db.session.info.pop("replica", None)
+    return wrapper
+
+
+def _stick_to_primary(session):
+    if has_request_context() and "replica" in db.engines:
+        flask_session["db_primary_until"] = time.time() + current_app.config.get("REPLICA_STICKY_SECONDS", 5)
+
+
+# --------------------- KURULUM ---------------------
+# db.init_app'i de çağırır: motor ayarları motorlar oluşmadan yazılmalı
+def init_database(app):
+    config = app.config
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_options(config, config["SQLALCHEMY_DATABASE_URI"]),
+        **config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
+    replica_uri = config.get("SQLALCHEMY_REPLICA_URI")
+    if replica_uri:
+        config["SQLALCHEMY_BINDS"] = {**config.get("SQLALCHEMY_BINDS", {}), "replica": {"url": replica_uri, **engine_options(config, replica_uri)}}
+    db.init_app(app)
+
+    app.extensions["db_pool_counters"] = {}
+    with app.app_context():
+        for key, engine in db.engines.items():
+            _instrument(app, key or "primary", engine)
+    event.listen(db.session, "after_commit", _stick_to_primary)
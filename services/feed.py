@@ -0,0 +1,198 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from flask import current_app
+from sqlalchemy import delete, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from models.feed import TimelineEntry
+from models.photo import Photo
+from models.user import User, followers_association
+from services.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+FEED_PAGE_SIZE = 20
+CELEBRITIES_KEY = "feed:celebrities"
+CELEBRITIES_TTL = 60
+# Zaman akışı kırpma her yüklemede değil, takipçilerin ~1/20'sinde yapılıyor;
+# liste FEED_TIMELINE_MAX'ı en fazla birkaç düzine satır aşabilir
+TRIM_EVERY = 20
+
+_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def _insert_ignore():
+    # Eşzamanlı takip + yükleme aynı satırı iki kez yazmaya çalışabilir
+    return _INSERTS[db.session.get_bind().dialect.name](TimelineEntry)
+
+
+def _celebrity_ids():
+    cache = get_cache()
+    ids = cache.get(CELEBRITIES_KEY)
+    if ids is None:
+        limit = current_app.config.get("FEED_FANOUT_LIMIT", 10000)
+        ids = [row.id for row in db.session.query(User.id).filter(User.follower_count >= limit)]
+        cache.set(CELEBRITIES_KEY, ids, ttl=CELEBRITIES_TTL)
+    return ids
+
+
+def is_pulled(user):
+    return user.follower_count >= current_app.config.get("FEED_FANOUT_LIMIT", 10000)
+
+
+# --------------------- YAZMA (FAN-OUT) ---------------------
+def _trim(user_ids):
+    newer = TimelineEntry.__table__.alias()
+    cutoff = (
+        select(newer.c.photo_id).where(newer.c.user_id == TimelineEntry.user_id)
+        .order_by(newer.c.photo_id.desc())
+        .offset(current_app.config.get("FEED_TIMELINE_MAX", 800)).limit(1)
+        .scalar_subquery()
+    )
+    db.session.execute(delete(TimelineEntry).where(TimelineEntry.user_id.in_(user_ids), TimelineEntry.photo_id <= cutoff))
+
+
+# Fotoğrafı takipçilerin zaman akışlarına parça parça yazar; her parça ayrı commit
+def fan_out(photo_id):
+    photo = db.session.get(Photo, photo_id)
+    if photo is None or is_pulled(photo.owner):
+        return 0
+    batch_size = current_app.config.get("FEED_FANOUT_BATCH", 1000)
+    followers = followers_association.c
+    last_id, total = 0, 0
+    while True:
+        # ix_followers_assoc_followed_id (followed_id, follower_id) üzerinde aralık taraması
+        ids = [row.follower_id for row in db.session.execute(
+            select(followers.follower_id)
+            .where(followers.followed_id == photo.owner_id, followers.follower_id > last_id)
+            .order_by(followers.follower_id).limit(batch_size)
+        )]
+        if not ids:
+            break
+        last_id = ids[-1]
+        db.session.execute(
+            _insert_ignore().values([
+                {"user_id": user_id, "photo_id": photo.id, "owner_id": photo.owner_id} for user_id in ids
+            ]).on_conflict_do_nothing()
+        )
+        to_trim = [user_id for user_id in ids if (user_id + photo.id) % TRIM_EVERY == 0]
+        if to_trim:
+            _trim(to_trim)
+        db.session.commit()
+        total += len(ids)
+    return total
+
+
+def _fan_out_in_context(app, photo_id):
+    with app.app_context():
+        try:
+            fan_out(photo_id)
+        except Exception:
+            logger.exception("Ana akış dağıtımı başarısız: photo_id=%s", photo_id)
+            db.session.rollback()
+
+
+# Upload isteği takipçi sayısı kadar beklemesin
+def schedule_fanout(photo_id):
+    app = current_app._get_current_object()
+    if app.config.get("FEED_INLINE"):
+        return _fan_out_in_context(app, photo_id)
+    return app.extensions["feed_pool"].submit(_fan_out_in_context, app, photo_id)
+
+
+# Takip edilince son gönderileri akışa ekle; çağıranın transaction'ında çalışır
+def on_follow(follower_id, followed):
+    if is_pulled(followed):
+        return
+    recent = (
+        select(literal(follower_id), Photo.id, Photo.owner_id)
+        .where(Photo.owner_id == followed.id)
+        .order_by(Photo.id.desc()).limit(current_app.config.get("FEED_BACKFILL", 50))
+    )
+    db.session.execute(
+        _insert_ignore().from_select(["user_id", "photo_id", "owner_id"], recent).on_conflict_do_nothing()
+    )
+
+
+def on_unfollow(follower_id, followed_id):
+    db.session.execute(delete(TimelineEntry).where(
+        TimelineEntry.user_id == follower_id, TimelineEntry.owner_id == followed_id
+    ))
+
+
+def remove_photo(photo_id):
+    db.session.execute(delete(TimelineEntry).where(TimelineEntry.photo_id == photo_id))
+
+
+# --------------------- OKUMA ---------------------
+# Yazılmış akış + (kendi gönderilerim ve takip ettiğim çok takipçili hesaplar)
+# birleştirilir; her kaynak kendi indeksinden en fazla bir sayfa okur
+def feed_page(user_id, before_id=None, page_size=FEED_PAGE_SIZE):
+    fetch = page_size + 1
+    pushed = select(TimelineEntry.photo_id.label("id")).where(TimelineEntry.user_id == user_id)
+    if before_id:
+        pushed = pushed.where(TimelineEntry.photo_id < before_id)
+    sources = [pushed.order_by(TimelineEntry.photo_id.desc()).limit(fetch)]
+
+    celebrities = _celebrity_ids()
+    pulled_owners = {user_id}
+    if celebrities:
+        pulled_owners |= {row.followed_id for row in db.session.execute(
+            select(followers_association.c.followed_id).where(
+                followers_association.c.follower_id == user_id,
+                followers_association.c.followed_id.in_(celebrities),
+            )
+        )}
+    for owner_id in sorted(pulled_owners):
+        pulled = select(Photo.id.label("id")).where(Photo.owner_id == owner_id)
+        if before_id:
+            pulled = pulled.where(Photo.id < before_id)
+        sources.append(pulled.order_by(Photo.id.desc()).limit(fetch))
+
+    # SQLite birleşik sorguda LIMIT'e sadece alt sorgu içinde izin veriyor
+    merged = union_all(*[select(source.subquery().c.id) for source in sources]).subquery()
+    ids = [row.id for row in db.session.execute(
+        select(merged.c.id).distinct().order_by(merged.c.id.desc()).limit(fetch)
+    )]
+    next_before_id = ids[page_size - 1] if len(ids) > page_size else None
+    photos = Photo.query.options(db.joinedload(Photo.owner), db.selectinload(Photo.variants), db.undefer(Photo.placeholder)) \
+        .filter(Photo.id.in_(ids[:page_size])).order_by(Photo.id.desc()).all()
+    return photos, next_before_id
+
+
+# --------------------- CLI ---------------------
+@click.group("feed")
+def feed_cli():
+    pass
+
+
+# Mevcut takip ilişkilerinden zaman akışlarını baştan kurar (ilk kurulum / onarım)
+@feed_cli.command("rebuild")
+def rebuild():
+    limit = current_app.config.get("FEED_TIMELINE_MAX", 800)
+    fanout_limit = current_app.config.get("FEED_FANOUT_LIMIT", 10000)
+    followers = followers_association.c
+    user_ids = [row.id for row in db.session.query(User.id).order_by(User.id)]
+    for count, user_id in enumerate(user_ids, 1):
+        recent = (
+            select(literal(user_id), Photo.id, Photo.owner_id)
+            .join(followers_association, followers.followed_id == Photo.owner_id)
+            .join(User, User.id == Photo.owner_id)
+            .where(followers.follower_id == user_id, User.follower_count < fanout_limit)
+            .order_by(Photo.id.desc()).limit(limit)
+        )
+        db.session.execute(delete(TimelineEntry).where(TimelineEntry.user_id == user_id))
+        db.session.execute(_insert_ignore().from_select(["user_id", "photo_id", "owner_id"], recent).on_conflict_do_nothing())
+        db.session.commit()
+        if count % 1000 == 0:
+            click.echo(f"{count} kullanıcı işlendi")
+    click.echo(f"{len(user_ids)} kullanıcının akışı yeniden kuruldu")
+
+
+def init_feed(app):
+    app.extensions["feed_pool"] = ThreadPoolExecutor(max_workers=app.config.get("FEED_WORKERS", 2))
+    app.cli.add_command(feed_cli)
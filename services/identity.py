@@ -0,0 +1,53 @@
+from flask import current_app
+from flask_login import UserMixin, current_user
+from sqlalchemy import select
+
+from extensions import db
+from models.user import User
+from services.cache import LRUCache
+from services.versions import version
+
+
+# --------------------- OTURUM KİMLİĞİ ---------------------
+# user_loader her istekte çalışıyor; tam User satırı (bio, avatar, şifre özeti)
+# yerine sadece kimlik taşıyan küçük bir nesne döner. Process içi önbellekte
+# IDENTITY_CACHE_TTL kadar kalır ve kullanıcının sürümüyle doğrulanır:
+# touch("user", id) yapan her değişiklik (settings, update_bio, takip, silme ...)
+# bir sonraki istekte kimliği yeniden yükletir. Önbellek isabetinde DB sorgusu yok.
+class Identity(UserMixin):
+    def __init__(self, id, username, is_admin, version):
+        self.id = id
+        self.username = username
+        self.is_admin = is_admin
+        self.version = version
+
+    def following_ids(self, user_ids):
+        return User.following_ids(self, user_ids)
+
+    def __repr__(self):
+        return f"<Identity {self.id} {self.username}>"
+
+
+def load_identity(user_id):
+    cache = current_app.extensions["identity_cache"]
+    current_version = version("user", user_id)
+    identity = cache.get(user_id)
+    if identity is None or identity.version != current_version:
+        row = db.session.execute(select(User.id, User.username, User.is_admin).where(User.id == user_id)).first()
+        if row is None:
+            cache.delete(user_id)
+            return None
+        identity = Identity(row.id, row.username, bool(row.is_admin), current_version)
+        cache.set(user_id, identity)
+    return identity
+
+
+# Tam satır gereken route'lar için (takip, ayarlar, avatar); giriş isteğinde
+# current_user zaten User olduğundan oturumdaki nesne döner, sorgu yok
+def current_user_row():
+    return db.session.get(User, current_user.id)
+
+
+def init_identity(app):
+    app.extensions["identity_cache"] = LRUCache(max_entries=app.config.get("IDENTITY_CACHE_SIZE", 10000),
+                                                default_ttl=app.config.get("IDENTITY_CACHE_TTL", 30))
@@ -0,0 +1,35 @@
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from models.user import Like
+from models.photo import Photo
+from services.counters import bump
+
+_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+# Oku-sonra-yaz yerine tek atomik ifade: önce DELETE ... RETURNING, satır yoksa
+# INSERT ... ON CONFLICT DO NOTHING. Eşzamanlı çift tıklamada kopya beğeni oluşmaz,
+# sayaç sadece gerçekten değişen satır için güncellenir.
+# Dönüş: ("liked" | "unliked", durum gerçekten değişti mi)
+def toggle_like(user_id, photo_id):
+    removed = db.session.execute(
+        delete(Like).where(Like.user_id == user_id, Like.photo_id == photo_id).returning(Like.id)
+    ).first()
+    if removed:
+        bump(Photo, photo_id, like_count=-1)
+        return "unliked", True
+
+    insert = _INSERTS[db.session.get_bind().dialect.name]
+    added = db.session.execute(
+        insert(Like).values(user_id=user_id, photo_id=photo_id)
+        .on_conflict_do_nothing(index_elements=["user_id", "photo_id"])
+        .returning(Like.id)
+    ).first()
+    if added:
+        bump(Photo, photo_id, like_count=1)
+        return "liked", True
+    # Aynı anda başka bir istek beğeniyi eklemiş
+    return "liked", False
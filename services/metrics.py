@@ -0,0 +1,181 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter as Tally
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+# --------------------- KAYIT (PROMETHEUS METİN FORMATI) ---------------------
+# prometheus_client'a bağımlı olmamak için küçük bir karşılığı. Değerler process
+# başına tutuluyor; gunicorn worker'ları "pid" etiketiyle ayrışıyor.
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self, extra):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labels, key, extra)} {_number(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    # Değer: [kova sayıları, toplam, adet]
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            item = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    item[0][i] += 1
+            item[1] += value
+            item[2] += 1
+
+    def render(self, extra):
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts + [count]):
+                le = bound if bound == "+Inf" else _number(bound)
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, list(extra) + [('le', le)])} {bucket_count}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key, extra)} {_number(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key, extra)} {count}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram("verzia_http_request_duration_seconds", "İstek süresi (view + render)", ("endpoint", "method", "status"))
+REQUEST_STATEMENTS = Histogram("verzia_http_request_db_statements", "İstek başına SQL ifadesi sayısı", ("endpoint",), buckets=STATEMENT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram("verzia_http_request_db_seconds", "İstek başına toplam SQL süresi", ("endpoint",))
+N_PLUS_ONE = Counter("verzia_n_plus_one_total", "Aynı sorgunun bir istekte eşik kadar tekrarlandığı durumlar", ("endpoint",))
+UPLOAD_BYTES = Counter("verzia_upload_bytes_total", "Kabul edilen yükleme baytı", ("kind",))
+UPLOADS = Counter("verzia_uploads_total", "Yükleme denemeleri", ("kind", "result"))
+PASSWORD_HASH_SECONDS = Histogram("verzia_password_hash_seconds", "Şifre özeti süresi (havuz beklemesi dahil)", ("op",))
+PASSWORD_HASH_REJECTED = Counter("verzia_password_hash_rejected_total", "Havuz dolu / zaman aşımı yüzünden reddedilen özetler", ("op",))
+DB_POOL = Gauge("verzia_db_pool", "Bağlantı havuzu durumu (bu worker)", ("pool", "stat"))
+
+
+def render(extra_gauges=None):
+    for pool, stats in (extra_gauges or {}).items():
+        for stat, value in stats.items():
+            DB_POOL.set(value, pool=pool, stat=stat)
+    extra = [("pid", os.getpid())]
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.header() + metric.render(extra)
+    return "\n".join(lines) + "\n"
+
+
+# --------------------- İSTEK / SQL ÖLÇÜMÜ ---------------------
+def _before_request():
+    g.metrics = {"start": time.perf_counter(), "statements": 0, "db_seconds": 0.0, "seen": Tally()}
+
+
+def _after_request(response):
+    state = g.pop("metrics", None)
+    if state is None:
+        return response
+    endpoint = request.endpoint or "unmatched"
+    REQUEST_LATENCY.observe(time.perf_counter() - state["start"], endpoint=endpoint, method=request.method, status=response.status_code)
+    REQUEST_STATEMENTS.observe(state["statements"], endpoint=endpoint)
+    REQUEST_DB_SECONDS.observe(state["db_seconds"], endpoint=endpoint)
+
+    threshold = current_app.config.get("N_PLUS_ONE_THRESHOLD", 5)
+    repeated = [(statement, count) for statement, count in state["seen"].items() if count >= threshold]
+    if repeated:
+        N_PLUS_ONE.inc(endpoint=endpoint)
+        if current_app.debug or current_app.config.get("N_PLUS_ONE_WARNINGS"):
+            for statement, count in repeated:
+                logger.warning("Olası N+1 (%s): aynı sorgu %s kez çalıştı: %s", endpoint, count, " ".join(statement.split()))
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.metrics_start = time.perf_counter()
+
+
+# Parametreler farklı, SQL metni aynı: döngü içinde tek tek yüklenen ilişkinin izi
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    state = g.get("metrics")
+    if state is None:
+        return
+    state["statements"] += 1
+    state["db_seconds"] += time.perf_counter() - context.metrics_start
+    state["seen"][statement] += 1
+
+
+def init_metrics(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
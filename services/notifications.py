@@ -0,0 +1,421 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from models.user import User, Notification, NotificationActor, NotificationArchive
+from services.cache import get_cache
+from services.pubsub import publish_after_commit
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_PAGE_SIZE = 20
+ARCHIVE_COLUMNS = ("id", "user_id", "sender_username", "notif_type", "photo_id", "message", "actor_count", "timestamp")
+ARCHIVE_PARTITION = "notification_archive_{:04d}_{:02d}"
+
+UNREAD_KEY = "unread:{}"
+DEDUPE_KEY = "notified:{type}:{user_id}:{photo_id}:{sender}"
+
+MESSAGES = {
+    "like": "fotoğrafını beğendi.",
+    "comment": "fotoğrafına yorum yaptı.",
+    "follow": "sizi takip etmeye başladı.",
+}
+# beğen → vazgeç → beğen gibi gidip gelmeler ikinci kez bildirim üretmesin
+DEDUPE_TYPES = {"like", "follow"}
+
+_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def build_message(sender_username, actor_count, notif_type):
+    text = MESSAGES[notif_type]
+    if actor_count > 1:
+        return f"@{sender_username} ve {actor_count - 1} kişi daha {text}"
+    return f"@{sender_username} {text}"
+
+
+def _pending(session):
+    return session.info.setdefault("unread_deltas", Counter())
+
+
+# Okunmamış = alıcının okundu işaretinden (notifications_read_upto) büyük id
+def _read_upto(user_id):
+    return select(User.notifications_read_upto).where(User.id == user_id).scalar_subquery()
+
+
+def read_watermark(user_id):
+    return db.session.execute(select(User.notifications_read_upto).where(User.id == user_id)).scalar() or 0
+
+
+def unread_count(user_id):
+    cache = get_cache()
+    key = UNREAD_KEY.format(user_id)
+    count = cache.get(key)
+    if count is None:
+        # ix_notification_user_id_id üzerinde aralık taraması
+        count = db.session.query(func.count(Notification.id)).filter(
+            Notification.user_id == user_id, Notification.id > _read_upto(user_id)
+        ).scalar()
+        cache.set(key, count, ttl=current_app.config.get("UNREAD_CACHE_TTL", 300))
+    return count
+
+
+# Koşula uyan okunmamış bildirimlerin alıcıları (silmeden önce sayaçlarını düşürmek için)
+def unread_recipients(condition):
+    query = (select(Notification.user_id).join(User, User.id == Notification.user_id)
+             .where(condition, Notification.id > User.notifications_read_upto).distinct())
+    return list(db.session.execute(query).scalars())
+
+
+# Önce sıcak tablo, yetmezse arşiv. Arşive sadece okunmuş eski satırlar gidiyor,
+# yani arşivdeki id'ler kullanıcının sıcak tablodaki id'lerinden küçük.
+def notification_page(user_id, before_id=None, limit=NOTIFICATION_PAGE_SIZE):
+    rows = []
+    for model in (Notification, NotificationArchive):
+        query = db.session.query(model.id, model.sender_username, model.message, model.notif_type, model.timestamp) \
+            .filter(model.user_id == user_id)
+        if before_id:
+            query = query.filter(model.id < before_id)
+        rows += query.order_by(model.id.desc()).limit(limit - len(rows)).all()
+        if len(rows) >= limit:
+            break
+        if rows:
+            before_id = rows[-1].id
+    return rows
+
+
+# Bildirim isteğin transaction'ına yazılmıyor: commit olunca kuyruğa gidiyor,
+# arka plandaki worker toplu halde yazıyor
+def notify(user_id, sender_username, notif_type, photo_id=None):
+    db.session.info.setdefault("pending_notifications", []).append(
+        {"user_id": user_id, "sender": sender_username, "type": notif_type, "photo_id": photo_id}
+    )
+
+
+# Tek satırlık UPDATE; işaret geri gitmez (eski bir sayfa geç gelirse)
+def mark_read_upto(user_id, notification_id):
+    updated = User.query.filter(User.id == user_id, User.notifications_read_upto < notification_id) \
+        .update({User.notifications_read_upto: notification_id}, synchronize_session=False)
+    if updated:
+        forget_unread(user_id)
+
+
+def forget_unread(user_id):
+    db.session.info.setdefault("unread_resets", set()).add(user_id)
+
+
+# Sıcak tablodan silme her zaman buradan: önce kişi satırları (FK)
+def delete_notifications(condition):
+    ids = select(Notification.id).where(condition)
+    db.session.execute(delete(NotificationActor).where(NotificationActor.notification_id.in_(ids))
+                       .execution_options(synchronize_session=False))
+    db.session.execute(delete(Notification).where(condition).execution_options(synchronize_session=False))
+
+
+# Silinen fotoğraflara bağlı bildirimler (photo_id FK) ve arşiv satırları; okunmamışı
+# gidenlerin sayaç önbelleği commit'te düşer
+def delete_photo_notifications(photo_ids):
+    for user_id in unread_recipients(Notification.photo_id.in_(photo_ids)):
+        forget_unread(user_id)
+    delete_notifications(Notification.photo_id.in_(photo_ids))
+    db.session.execute(delete(NotificationArchive).where(NotificationArchive.photo_id.in_(photo_ids))
+                       .execution_options(synchronize_session=False))
+
+
+# --------------------- TOPLU YAZIM ---------------------
+# Bildirimde zaten sayılmış kişi tekrar eklenmez; bildirim başına yeni kişi sayısı döner
+def _add_actors(actors):
+    if not actors:
+        return Counter()
+    insert_ignore = _INSERTS[_dialect()](NotificationActor).values(
+        [{"notification_id": notification_id, "sender_username": sender} for notification_id, sender in actors])
+    added = db.session.execute(insert_ignore.on_conflict_do_nothing().returning(NotificationActor.notification_id))
+    return Counter(added.scalars())
+
+
+# Aynı (alıcı, tür, fotoğraf) için gelen olaylar tek satırda birleşir; alıcının
+# henüz okumadığı yakın tarihli bir satır varsa ona eklenir ("@a ve 12 kişi daha ...")
+def deliver(events):
+    cache = get_cache()
+    dedupe_ttl = current_app.config.get("NOTIFICATION_DEDUPE_TTL", 86400)
+    groups = {}
+    dedupe_keys = []
+    for e in events:
+        if e["type"] in DEDUPE_TYPES:
+            key = DEDUPE_KEY.format(**e)
+            if key in dedupe_keys or cache.get(key):
+                continue
+            dedupe_keys.append(key)
+        senders = groups.setdefault((e["user_id"], e["type"], e["photo_id"]), [])
+        if e["sender"] in senders:
+            senders.remove(e["sender"])
+        senders.append(e["sender"])
+    if not groups:
+        return 0
+
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=current_app.config.get("NOTIFICATION_COALESCE_WINDOW", 3600))
+    existing = {}
+    open_rows = Notification.query.join(User, User.id == Notification.user_id).filter(
+        Notification.user_id.in_({user_id for user_id, _, _ in groups}),
+        Notification.id > User.notifications_read_upto,
+        Notification.timestamp >= cutoff,
+    ).order_by(Notification.id)
+    for n in open_rows:
+        existing[(n.user_id, n.notif_type, n.photo_id)] = n
+
+    rows, new_senders, merged = [], [], []
+    for (user_id, notif_type, photo_id), senders in groups.items():
+        n = existing.get((user_id, notif_type, photo_id))
+        if n:
+            merged.append((n, senders))
+            continue
+        rows.append({
+            "user_id": user_id, "sender_username": senders[-1], "notif_type": notif_type,
+            "photo_id": photo_id, "actor_count": len(senders), "timestamp": now,
+            "message": build_message(senders[-1], len(senders), notif_type),
+        })
+        new_senders.append(senders)
+        _pending(db.session)[user_id] += 1
+
+    created = []
+    if rows:
+        created = db.session.execute(
+            insert(Notification).returning(Notification.id, sort_by_parameter_order=True), rows).scalars().all()
+    # Açık satırda sadece ilk kez görülen kişiler sayılır
+    added = _add_actors([(notification_id, sender) for notification_id, senders in zip(created, new_senders) for sender in senders]
+                        + [(n.id, sender) for n, senders in merged for sender in senders])
+    for n, senders in merged:
+        n.actor_count = (n.actor_count or 1) + added[n.id]
+        n.sender_username = senders[-1]
+        n.message = build_message(senders[-1], n.actor_count, n.notif_type)
+        n.timestamp = now
+
+    for row in rows:
+        publish_after_commit(f"user:{row['user_id']}", "notification", {
+            "sender": row["sender_username"], "type": row["notif_type"], "message": row["message"], "new": True,
+        })
+    for n, senders in merged:
+        publish_after_commit(f"user:{n.user_id}", "notification", {
+            "sender": n.sender_username, "type": n.notif_type, "message": n.message, "new": False,
+        })
+    db.session.commit()
+    for key in dedupe_keys:
+        cache.set(key, 1, ttl=dedupe_ttl)
+    return len(rows)
+
+
+def _deliver_in_context(app, events):
+    with app.app_context():
+        try:
+            deliver(events)
+        except Exception:
+            logger.exception("Bildirimler yazılamadı (%d olay)", len(events))
+            db.session.rollback()
+
+
+class NotificationQueue:
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue()
+        self.max_batch = app.config.get("NOTIFICATION_BATCH_SIZE", 500)
+        self.flush_interval = app.config.get("NOTIFICATION_FLUSH_INTERVAL", 0.5)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, events):
+        for e in events:
+            self.queue.put(e)
+        self._ensure_worker()
+
+    # gunicorn fork'undan sonra thread yeniden başlatılmalı, bu yüzden tembel başlatma
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="notifications", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                _deliver_in_context(self.app, batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+
+
+# Önbellek ve kuyruk sadece commit başarılı olunca güncellenir
+def _after_commit(session):
+    deltas = session.info.pop("unread_deltas", None) or {}
+    resets = session.info.pop("unread_resets", None) or set()
+    events = session.info.pop("pending_notifications", None)
+    if deltas or resets:
+        cache = get_cache()
+        for user_id in resets:
+            cache.delete(UNREAD_KEY.format(user_id))
+        for user_id, delta in deltas.items():
+            if user_id not in resets:
+                cache.incr(UNREAD_KEY.format(user_id), delta)
+    if events:
+        app = current_app._get_current_object()
+        if app.config.get("NOTIFICATIONS_INLINE"):
+            _deliver_in_context(app, events)
+        else:
+            app.extensions["notification_queue"].put(events)
+
+
+def _after_rollback(session):
+    session.info.pop("unread_deltas", None)
+    session.info.pop("unread_resets", None)
+    session.info.pop("pending_notifications", None)
+
+
+# --------------------- SAKLAMA / SIKIŞTIRMA ---------------------
+# Sıcak tablo küçük kalsın diye cron'dan çalışır (flask notifications compact):
+#   1. NOTIFICATION_RETENTION_DAYS'ten eski sıcak satırlar (okunmamış olsa da) silinir
+#   2. okunmuş ve NOTIFICATION_HOT_DAYS'ten eski satırlar arşive taşınır
+#   3. NOTIFICATION_HOT_MAX_PER_USER'dan fazla bildirimi olan hesaplarda son N'den
+#      eski okunmuş satırlar arşive taşınır
+#   4. arşivde saklama süresi dolanlar silinir (PostgreSQL'de aylık bölüm düşürülür)
+# Her parça ayrı transaction: sıcak tabloda uzun kilit yok.
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def _month_bounds(year, month):
+    return datetime(year, month, 1), datetime(year + month // 12, month % 12 + 1, 1)
+
+
+def _ensure_partitions(months):
+    for year, month in sorted(months):
+        start, end = _month_bounds(year, month)
+        db.session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {ARCHIVE_PARTITION.format(year, month)} PARTITION OF notification_archive "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+
+
+def _archive_partitions():
+    rows = db.session.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = 'notification_archive'"
+    ))
+    return [row.relname for row in rows]
+
+
+def _in_batches(query, handle, batch_size):
+    total = 0
+    while True:
+        rows = db.session.execute(query.order_by(Notification.id).limit(batch_size)).all()
+        if not rows:
+            return total
+        handle(rows)
+        db.session.commit()
+        total += len(rows)
+
+
+def _expire(rows):
+    for user_id in {row.user_id for row in rows}:
+        forget_unread(user_id)
+    delete_notifications(Notification.id.in_([row.id for row in rows]))
+
+
+def _archive(rows):
+    ids = [row.id for row in rows]
+    if _dialect() == "postgresql":
+        _ensure_partitions({(row.timestamp.year, row.timestamp.month) for row in rows})
+    columns = [getattr(Notification, name) for name in ARCHIVE_COLUMNS]
+    db.session.execute(insert(NotificationArchive).from_select(ARCHIVE_COLUMNS, select(*columns).where(Notification.id.in_(ids))))
+    delete_notifications(Notification.id.in_(ids))
+
+
+def _purge_archive(cutoff, batch_size):
+    if _dialect() == "postgresql":
+        purged = 0
+        for name in _archive_partitions():
+            year, month = (int(part) for part in name.rsplit("_", 2)[1:])
+            if _month_bounds(year, month)[1] <= cutoff:
+                purged += db.session.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+                db.session.execute(text(f"DROP TABLE {name}"))
+        db.session.commit()
+        return purged
+    purged = 0
+    while True:
+        ids = list(db.session.execute(
+            select(NotificationArchive.id).where(NotificationArchive.timestamp < cutoff).limit(batch_size)).scalars())
+        if not ids:
+            return purged
+        db.session.execute(delete(NotificationArchive).where(NotificationArchive.id.in_(ids)))
+        db.session.commit()
+        purged += len(ids)
+
+
+def compact_notifications(now=None):
+    config = current_app.config
+    now = now or datetime.utcnow()
+    batch_size = config["NOTIFICATION_COMPACT_BATCH"]
+    hot_max = config["NOTIFICATION_HOT_MAX_PER_USER"]
+    retention_cutoff = now - timedelta(days=config["NOTIFICATION_RETENTION_DAYS"])
+    rows = select(Notification.id, Notification.user_id, Notification.timestamp)
+    # Arşivin PK'si timestamp içeriyor
+    read = rows.join(User, User.id == Notification.user_id).where(
+        Notification.id <= User.notifications_read_upto, Notification.timestamp.isnot(None))
+
+    expired = _in_batches(rows.where(Notification.timestamp < retention_cutoff), _expire, batch_size)
+    old = read.where(Notification.timestamp < now - timedelta(days=config["NOTIFICATION_HOT_DAYS"]))
+    archived = _in_batches(old, _archive, batch_size)
+    heavy_users = db.session.execute(
+        select(Notification.user_id).group_by(Notification.user_id).having(func.count() > hot_max)).scalars().all()
+    for user_id in heavy_users:
+        # Son hot_max bildirimin hemen altındaki id; o ve altı taşınır
+        threshold = db.session.execute(
+            select(Notification.id).where(Notification.user_id == user_id)
+            .order_by(Notification.id.desc()).offset(hot_max).limit(1)).scalar()
+        overflow = read.where(Notification.user_id == user_id, Notification.id <= threshold)
+        archived += _in_batches(overflow, _archive, batch_size)
+    purged = _purge_archive(retention_cutoff, batch_size)
+    return {"expired": expired, "archived": archived, "purged": purged, "heavy_users": len(heavy_users)}
+
+
+# --------------------- CLI ---------------------
+@click.group("notifications")
+def notifications_cli():
+    pass
+
+
+@notifications_cli.command("compact")
+def compact():
+    stats = compact_notifications()
+    click.echo(f"Silinen (süresi dolmuş): {stats['expired']}, arşive taşınan: {stats['archived']} "
+               f"({stats['heavy_users']} yoğun hesap), arşivden silinen: {stats['purged']}")
+
+
+def init_notifications(app):
+    app.extensions["notification_queue"] = NotificationQueue(app)
+    app.cli.add_command(notifications_cli)
+    event.listen(db.session, "after_commit", _after_commit)
+    event.listen(db.session, "after_soft_rollback", lambda session, previous_transaction: _after_rollback(session))
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from flask import current_app, has_app_context, jsonify
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from config import Config
+from services.metrics import PASSWORD_HASH_SECONDS, PASSWORD_HASH_REJECTED
+from services.pools import native_executor_class
+
+
+class PasswordHashBusy(RuntimeError):
+    pass
+
+
+# --------------------- ÖZET HAVUZU ---------------------
+# pbkdf2 / scrypt CPU'yu saniyeye yakın meşgul ediyor. gevent worker'ında istek
+# thread'inde hesaplanırsa tüm worker (SSE bağlantıları dahil) bekler; burada gerçek
+# OS thread'lerinde çalışıyor (hashlib hesap sırasında GIL'i bırakıyor) ve istek
+# sadece sonucu bekliyor. Aynı anda en fazla workers + queue özet bekleyebilir;
+# fazlası hemen 503 alır, giriş fırtınası diğer route'ları kuyruğa sokmaz.
+class HashPool:
+    def __init__(self, workers, queue_size, timeout):
+        self.executor = native_executor_class()(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.timeout = timeout
+
+    def run(self, op, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            PASSWORD_HASH_REJECTED.inc(op=op)
+            raise PasswordHashBusy(op)
+        start = time.perf_counter()
+        future = self.executor.submit(fn, *args)
+        # Zaman aşımında iş havuzda bitene kadar yerini tutsun
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            PASSWORD_HASH_REJECTED.inc(op=op)
+            raise PasswordHashBusy(op)
+        finally:
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - start, op=op)
+
+
+def _run(op, fn, *args):
+    if has_app_context() and "password_pool" in current_app.extensions:
+        return current_app.extensions["password_pool"].run(op, fn, *args)
+    return fn(*args)
+
+
+def _method():
+    return current_app.config["PASSWORD_HASH_METHOD"] if has_app_context() else Config.PASSWORD_HASH_METHOD
+
+
+def hash_password(raw_password):
+    return _run("hash", generate_password_hash, raw_password, _method())
+
+
+def verify_password(password_hash, raw_password):
+    return _run("verify", check_password_hash, password_hash, raw_password)
+
+
+# Özetin başı üretildiği yöntem ve maliyet ("pbkdf2:sha256:600000$tuz$özet")
+def needs_rehash(password_hash):
+    return password_hash.split("$", 1)[0] != _method()
+
+
+def _busy(e):
+    response = jsonify({"status": "error", "message": "Sunucu şu an yoğun, lütfen biraz sonra tekrar dene."})
+    response.headers["Retry-After"] = "2"
+    return response, 503
+
+
+def init_passwords(app):
+    workers = app.config.get("PASSWORD_HASH_WORKERS") or os.cpu_count() or 1
+    app.extensions["password_pool"] = HashPool(workers, app.config.get("PASSWORD_HASH_QUEUE", 32),
+                                               app.config.get("PASSWORD_HASH_TIMEOUT", 10))
+    app.register_error_handler(PasswordHashBusy, _busy)
@@ -0,0 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+# gevent worker'ında thread'ler greenlet'e dönüşür; CPU işi (resim işleme, şifre özeti)
+# event loop'u kilitlemesin diye gerçek OS thread'leri kullanan havuzu seç
+def native_executor_class():
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched("threading"):
+            from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+            return NativeThreadPoolExecutor
+    except ImportError:
+        pass
+    return ThreadPoolExecutor
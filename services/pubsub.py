@@ -0,0 +1,192 @@
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import event, text
+
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = channels
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+# --------------------- PROCESS İÇİ ---------------------
+# Her SSE bağlantısı sadece küçük bir kuyruk tutuyor; binlerce boşta bağlantı ucuz
+class LocalBroker:
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def publish(self, channel, event_name, data):
+        self._dispatch({"channel": channel, "event": event_name, "data": data})
+
+    def _dispatch(self, message):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(message["channel"], ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                # Okumayan yavaş istemci yüzünden diğerleri beklemesin
+                pass
+
+
+# Process'ler arası backend'ler tek bir dinleyici bağlantısıyla gelen mesajları
+# yerel aboneler arasında dağıtır (bağlantı başına Redis/PG bağlantısı açılmaz)
+class _BridgedBroker(LocalBroker):
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, channels):
+        self._ensure_listener()
+        return super().subscribe(channels)
+
+    # gunicorn fork'undan sonra da çalışsın diye tembel başlatma
+    def _ensure_listener(self):
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen_forever, name="pubsub", daemon=True)
+                self._listener.start()
+
+    def _listen_forever(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Pub/sub dinleyicisi koptu, yeniden bağlanılıyor")
+                time.sleep(1)
+
+
+# --------------------- REDIS ---------------------
+class RedisBroker(_BridgedBroker):
+    def __init__(self, url=None, client=None, prefix="verzia:events:"):
+        super().__init__()
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("Redis pub/sub için redis paketi kurulu olmalı.")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def publish(self, channel, event_name, data):
+        self.client.publish(self.prefix + channel, json.dumps({"channel": channel, "event": event_name, "data": data}))
+
+    def _listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + "*")
+        for message in pubsub.listen():
+            self._dispatch(json.loads(message["data"]))
+
+
+# --------------------- POSTGRESQL LISTEN/NOTIFY ---------------------
+class PostgresBroker(_BridgedBroker):
+    PG_CHANNEL = "verzia_events"
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+
+    def publish(self, channel, event_name, data):
+        payload = json.dumps({"channel": channel, "event": event_name, "data": data})
+        with self.engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.PG_CHANNEL, "payload": payload})
+
+    def _listen(self):
+        raw = self.engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            conn.cursor().execute(f"LISTEN {self.PG_CHANNEL}")
+            while True:
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self._dispatch(json.loads(conn.notifies.pop(0).payload))
+        finally:
+            raw.close()
+
+
+# --------------------- YAYIN ---------------------
+# Canlı güncellemeler en iyi çaba: broker hatası isteği düşürmesin
+def publish(channel, event_name, data):
+    try:
+        get_broker().publish(channel, event_name, data)
+    except Exception:
+        logger.exception("Olay yayınlanamadı: %s", channel)
+
+
+def publish_after_commit(channel, event_name, data):
+    db.session.info.setdefault("pending_events", []).append((channel, event_name, data))
+
+
+def _after_commit(session):
+    for channel, event_name, data in session.info.pop("pending_events", None) or ():
+        publish(channel, event_name, data)
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("pending_events", None)
+
+
+def init_pubsub(app):
+    backend = app.config.get("PUBSUB_BACKEND", "local")
+    if backend == "redis":
+        broker = RedisBroker(url=app.config.get("PUBSUB_REDIS_URL") or app.config.get("CACHE_REDIS_URL"))
+    elif backend == "postgres":
+        with app.app_context():
+            broker = PostgresBroker(db.engine)
+    else:
+        broker = LocalBroker()
+    app.extensions["broker"] = broker
+    event.listen(db.session, "after_commit", _after_commit)
+    event.listen(db.session, "after_soft_rollback", _after_rollback)
+    return broker
+
+
+def get_broker():
+    return current_app.extensions["broker"]
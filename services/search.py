@@ -0,0 +1,122 @@
+import click
+from sqlalchemy import case, func, literal, select, text
+
+from extensions import db
+from models.user import User, followers_association, USER_SEARCH_DDL
+from services.text import turkish_lower
+
+SEARCH_LIMIT = 10
+# Sıralama her iki aşamada da bu kadar adayla sınırlı: kısa sorgularda
+# ("a") yüz binlerce eşleşmeyi sıralamaya çalışmayalım
+CANDIDATE_LIMIT = 200
+# pg_trgm ve FTS5 trigram tokenizer'ı 3 karakterden kısa sorgularda indeks kullanamıyor
+MIN_CONTAINS_LENGTH = 3
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+# Önek eşleşmeleri: B-tree üzerinde aralık taraması
+def _prefix_candidates(q, dialect):
+    column = User.username_search
+    if dialect == "postgresql":
+        # varchar_pattern_ops indeksi LIKE 'q%' için kullanılabiliyor
+        condition = column.like(_escape_like(q) + "%", escape="\\")
+    else:
+        # SQLite'ın LIKE'ı büyük/küçük harf duyarsız, indeksi kullanmıyor; aralık kullanıyor
+        condition = (column >= q) & (column < q + "\U0010ffff")
+    query = select(User.id).where(condition).order_by(column).limit(CANDIDATE_LIMIT)
+    return [row.id for row in db.session.execute(query)]
+
+
+# İçinde geçen eşleşmeler: PostgreSQL'de pg_trgm GIN, SQLite'ta FTS5 trigram
+def _contains_candidates(q, dialect):
+    if len(q) < MIN_CONTAINS_LENGTH:
+        return []
+    if dialect == "postgresql":
+        query = select(User.id).where(
+            User.username_search.like("%" + _escape_like(q) + "%", escape="\\")
+        ).limit(CANDIDATE_LIMIT)
+        return [row.id for row in db.session.execute(query)]
+    if dialect == "sqlite":
+        rows = db.session.execute(
+            text("SELECT rowid FROM user_search WHERE user_search MATCH :match LIMIT :limit"),
+            {"match": '"' + q.replace('"', '""') + '"', "limit": CANDIDATE_LIMIT},
+        )
+        return [row.rowid for row in rows]
+    query = select(User.id).where(User.username_search.contains(q, autoescape=True)).limit(CANDIDATE_LIMIT)
+    return [row.id for row in db.session.execute(query)]
+
+
+# Sıra: tam eşleşme, önek, içinde geçen; her grupta (boost açıksa) takip
+# ettiklerim önce, sonra kısa isimler
+def find_users(q, viewer_id=None, limit=SEARCH_LIMIT, boost_following=True):
+    q = turkish_lower(q.strip())
+    if not q:
+        return []
+    dialect = _dialect()
+    candidates = _prefix_candidates(q, dialect)
+    # Önek eşleşmeleri her zaman önde; sayfayı dolduruyorlarsa trigram aramasına gerek yok
+    if len(candidates) < limit:
+        candidates += _contains_candidates(q, dialect)
+    if not candidates:
+        return []
+
+    column = User.username_search
+    rank = case((column == q, 0), (func.substr(column, 1, len(q)) == q, 1), else_=2)
+    avatar = func.coalesce(User.avatar_thumb, User.avatar).label("avatar")
+    query = select(User.id, User.username, avatar).where(User.id.in_(set(candidates)))
+    if viewer_id is not None:
+        follows = followers_association.alias()
+        query = query.outerjoin(follows, (follows.c.followed_id == User.id) & (follows.c.follower_id == viewer_id))
+        is_following = follows.c.follower_id.isnot(None)
+    else:
+        is_following = literal(False)
+    query = query.add_columns(is_following.label("is_following"))
+    order = [rank]
+    if boost_following and viewer_id is not None:
+        order.append(case((is_following, 0), else_=1))
+    order += [func.length(column), column]
+    return db.session.execute(query.order_by(*order).limit(limit)).all()
+
+
+# --------------------- CLI ---------------------
+@click.group("search")
+def search_cli():
+    pass
+
+
+# username_search'ü boş kalan satırları doldurur, SQLite'ta FTS5 indeksini baştan kurar
+@search_cli.command("reindex")
+@click.option("--batch-size", default=1000, show_default=True)
+def reindex(batch_size):
+    last_id, total = 0, 0
+    while True:
+        rows = db.session.execute(
+            select(User.id, User.username).where(User.id > last_id, User.username_search.is_(None))
+            .order_by(User.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        db.session.execute(
+            User.__table__.update().where(User.id == db.bindparam("uid")).values(username_search=db.bindparam("folded")),
+            [{"uid": row.id, "folded": turkish_lower(row.username)} for row in rows],
+        )
+        db.session.commit()
+        total += len(rows)
+    if _dialect() == "sqlite":
+        for statement in USER_SEARCH_DDL:
+            db.session.execute(text(statement))
+        db.session.execute(text("INSERT INTO user_search(user_search) VALUES ('rebuild')"))
+        db.session.commit()
+    click.echo(f"{total} kullanıcı güncellendi, arama indeksi hazır")
+
+
+def init_search(app):
+    app.cli.add_command(search_cli)
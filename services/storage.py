@@ -0,0 +1,255 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from flask import current_app, request, send_file, Response, abort
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.http import is_resource_modified
+
+CHUNK_SIZE = 64 * 1024
+HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+# Avatar sütunları blob'u url_for("media") adresiyle tutuyor
+MEDIA_PREFIX = "/media/"
+
+# Dosya başlığından tür tahmini (uzantıya güvenmiyoruz)
+MAGIC_TYPES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def sniff_mimetype(head):
+    for magic, mimetype in MAGIC_TYPES:
+        if head.startswith(magic):
+            return mimetype
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+class BlobTooLarge(Exception):
+    pass
+
+
+def is_valid_hash(blob_hash):
+    return bool(blob_hash) and HASH_RE.match(blob_hash) is not None
+
+
+# "/media/<hash>" adresinden blob anahtarı; dış adreslerde (picsum vb.) None
+def media_hash(url):
+    if url and url.startswith(MEDIA_PREFIX) and is_valid_hash(url[len(MEDIA_PREFIX):]):
+        return url[len(MEDIA_PREFIX):]
+    return None
+
+
+# Akışı parça parça geçici dosyaya yazar, yazarken SHA-256 hesaplar.
+# max_size aşılınca akışın geri kalanını okumadan BlobTooLarge fırlatır.
+def hash_to_tempfile(stream, dir=None, max_size=None):
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(prefix="blob-", dir=dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise BlobTooLarge(size)
+                digest.update(chunk)
+                out.write(chunk)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return digest.hexdigest(), size, tmp_path
+
+
+# Aynı içerik zaten varsa tekrar yazılmaz (dedup). claim(blob_hash), silinmek üzere
+# bekleyen bir blob'a bağlanmadan önce onu sahiplenir; o sırada süren bir temizlik
+# dosyayı silmişse ikinci kontrol bunu görür ve dosya yeniden yazılır
+def _already_stored(store, blob_hash, claim):
+    if not store.exists(blob_hash):
+        return False
+    if claim is None:
+        return True
+    claim(blob_hash)
+    return store.exists(blob_hash)
+
+
+def _validate(tmp_path, validate):
+    if validate is None:
+        return
+    try:
+        validate(tmp_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+# --------------------- LOCAL DISK ---------------------
+class LocalBlobStore:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(os.path.join(root, "tmp"), exist_ok=True)
+
+    def path(self, blob_hash):
+        return os.path.join(self.root, blob_hash[:2], blob_hash[2:4], blob_hash)
+
+    def exists(self, blob_hash):
+        return os.path.exists(self.path(blob_hash))
+
+    # validate(tmp_path) dosya depoya girmeden önce çağrılır; hata fırlatırsa dosya silinir
+    def put_stream(self, stream, max_size=None, validate=None, claim=None):
+        blob_hash, size, tmp_path = hash_to_tempfile(stream, dir=os.path.join(self.root, "tmp"), max_size=max_size)
+        _validate(tmp_path, validate)
+        self.put_file(tmp_path, blob_hash, claim)
+        return blob_hash, size
+
+    def put_file(self, tmp_path, blob_hash, claim=None):
+        if _already_stored(self, blob_hash, claim):
+            os.unlink(tmp_path)
+            return
+        target = self.path(blob_hash)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(tmp_path, target)
+
+    def open(self, blob_hash):
+        return open(self.path(blob_hash), "rb")
+
+    def read_head(self, blob_hash, length=32):
+        with open(self.path(blob_hash), "rb") as f:
+            return f.read(length)
+
+    def delete(self, blob_hash):
+        try:
+            os.unlink(self.path(blob_hash))
+        except FileNotFoundError:
+            pass
+
+    def serve(self, blob_hash, max_age):
+        target = self.path(blob_hash)
+        if not os.path.exists(target):
+            abort(404)
+        with open(target, "rb") as f:
+            mimetype = sniff_mimetype(f.read(32))
+        # send_file ETag / Last-Modified / Range işlerini kendisi hallediyor
+        response = send_file(target, mimetype=mimetype, conditional=True, etag=blob_hash, max_age=max_age)
+        response.cache_control.public = True
+        # Adres içerik hash'i: içerik değişirse adres de değişir, tarayıcı hiç sormasın
+        response.cache_control.immutable = True
+        return response
+
+
+# --------------------- S3 UYUMLU ---------------------
+class S3BlobStore:
+    def __init__(self, bucket, prefix="", endpoint_url=None, client=None):
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("S3 blob deposu için boto3 kurulu olmalı.")
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def key(self, blob_hash):
+        return f"{self.prefix}{blob_hash}"
+
+    def _head(self, blob_hash):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.key(blob_hash))
+        except Exception as e:
+            if getattr(e, "response", {}).get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def exists(self, blob_hash):
+        return self._head(blob_hash) is not None
+
+    def put_stream(self, stream, max_size=None, validate=None, claim=None):
+        blob_hash, size, tmp_path = hash_to_tempfile(stream, max_size=max_size)
+        _validate(tmp_path, validate)
+        self.put_file(tmp_path, blob_hash, claim)
+        return blob_hash, size
+
+    def put_file(self, tmp_path, blob_hash, claim=None):
+        try:
+            if not _already_stored(self, blob_hash, claim):
+                with open(tmp_path, "rb") as f:
+                    content_type = sniff_mimetype(f.read(32))
+                    f.seek(0)
+                    self.client.upload_fileobj(f, self.bucket, self.key(blob_hash), ExtraArgs={"ContentType": content_type})
+        finally:
+            os.unlink(tmp_path)
+
+    def open(self, blob_hash):
+        return self.client.get_object(Bucket=self.bucket, Key=self.key(blob_hash))["Body"]
+
+    def read_head(self, blob_hash, length=32):
+        obj = self.client.get_object(Bucket=self.bucket, Key=self.key(blob_hash), Range=f"bytes=0-{length - 1}")
+        return obj["Body"].read()
+
+    def delete(self, blob_hash):
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(blob_hash))
+
+    def serve(self, blob_hash, max_age):
+        head = self._head(blob_hash)
+        if head is None:
+            abort(404)
+        size = head["ContentLength"]
+        last_modified = head["LastModified"]
+        if not is_resource_modified(request.environ, etag=blob_hash, last_modified=last_modified):
+            response = Response(status=304)
+        else:
+            kwargs = {}
+            status = 200
+            byte_range = None
+            if request.headers.get("Range"):
+                # send_file ile aynı: çözülemeyen / dosya dışında kalan aralık 416
+                byte_range = request.range.range_for_length(size) if request.range else None
+                if byte_range is None:
+                    raise RequestedRangeNotSatisfiable(size)
+            if byte_range:
+                start, stop = byte_range
+                kwargs["Range"] = f"bytes={start}-{stop - 1}"
+                status = 206
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.key(blob_hash), **kwargs)
+            response = Response(obj["Body"].iter_chunks(CHUNK_SIZE), status=status,
+                                mimetype=head.get("ContentType") or "application/octet-stream",
+                                direct_passthrough=True)
+            response.content_length = obj["ContentLength"]
+            if byte_range:
+                response.headers["Content-Range"] = f"bytes {byte_range[0]}-{byte_range[1] - 1}/{size}"
+        response.accept_ranges = "bytes"
+        response.set_etag(blob_hash)
+        response.last_modified = last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+        return response
+
+
+# --------------------- KURULUM ---------------------
+def init_blob_store(app):
+    backend = app.config.get("BLOB_STORE", "local")
+    if backend == "s3":
+        store = S3BlobStore(
+            bucket=app.config["S3_BUCKET"],
+            prefix=app.config.get("S3_PREFIX", ""),
+            endpoint_url=app.config.get("S3_ENDPOINT_URL"),
+        )
+    else:
+        root = app.config.get("BLOB_STORE_PATH") or os.path.join(app.instance_path, "blobs")
+        store = LocalBlobStore(root)
+    app.extensions["blob_store"] = store
+    return store
+
+
+def get_blob_store():
+    return current_app.extensions["blob_store"]
+
@@ -0,0 +1,4 @@
+# Python'un lower()'ı Türkçe bilmiyor: "İ".lower() noktalı birleşik karakter,
+# "I".lower() ise "i" veriyor. Kullanıcı adı karşılaştırmaları ve arama bunu kullanır.
+def turkish_lower(value):
+    return (value or "").replace("İ", "i").replace("I", "ı").lower()
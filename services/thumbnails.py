@@ -0,0 +1,146 @@
+import base64
+import io
+import logging
+import os
+import tempfile
+from concurrent.futures import wait
+
+import click
+from flask import current_app
+from PIL import Image, ImageFilter, ImageOps
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.photo import Photo, PhotoVariant
+from services.blobs import put_blob
+from services.pools import native_executor_class
+from services.storage import get_blob_store
+from services.uploads import ROTATED_ORIENTATIONS
+from services.versions import touch
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (150, 480, 1080)
+VARIANT_FORMATS = {"webp": ("WEBP", 80), "jpeg": ("JPEG", 82)}
+PLACEHOLDER_WIDTH = 16
+
+
+def _encode(img, fmt):
+    pil_format, quality = VARIANT_FORMATS[fmt]
+    fd, tmp_path = tempfile.mkstemp(prefix="variant-")
+    with os.fdopen(fd, "wb") as out:
+        img.save(out, pil_format, quality=quality, optimize=True)
+    return tmp_path
+
+
+def _placeholder(img):
+    small = img.copy()
+    small.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+    small = small.filter(ImageFilter.GaussianBlur(1))
+    buf = io.BytesIO()
+    small.save(buf, "JPEG", quality=40)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+# Bir fotoğrafın eksik varyantlarını üretir; tekrar çağrılırsa sadece eksikleri yapar
+def build_variants(photo):
+    if not photo.blob_hash:
+        return 0
+    store = get_blob_store()
+    existing = {(v.width, v.format) for v in photo.variants}
+    with store.open(photo.blob_hash) as f:
+        # Yerel dosya doğrudan okunur; S3 gövdesi seek edilemediği için belleğe alınır
+        source = f if getattr(f, "seekable", lambda: False)() else io.BytesIO(f.read())
+        original = Image.open(source)
+        # width / height sütunundan önce yüklenmiş fotoğraflar (backfill bunları da seçiyor)
+        if photo.width is None or photo.height is None:
+            width, height = original.size
+            if original.getexif().get(0x0112) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+            photo.width, photo.height = width, height
+        # JPEG'i en büyük varyanta yetecek ölçekte çöz (20MB'lık fotoğrafı tam boyut açmadan)
+        original.draft("RGB", (max(VARIANT_WIDTHS), max(VARIANT_WIDTHS)))
+        original = ImageOps.exif_transpose(original).convert("RGB")
+    # Kaynağın metadatası (yorum, EXIF/GPS) varyantlara taşınmasın; büyük JPEG
+    # yorumları Pillow'un kodlayıcısını da bozuyor
+    original.info = {}
+
+    targets = sorted({min(w, original.width) for w in VARIANT_WIDTHS})
+    created = 0
+    for width in targets:
+        height = max(1, round(original.height * width / original.width))
+        resized = None
+        for fmt in VARIANT_FORMATS:
+            if (width, fmt) in existing:
+                continue
+            if resized is None:
+                resized = original.resize((width, height), Image.LANCZOS)
+            tmp_path = _encode(resized, fmt)
+            with open(tmp_path, "rb") as data:
+                blob_hash, _ = put_blob(data)
+            os.unlink(tmp_path)
+            db.session.add(PhotoVariant(photo_id=photo.id, width=width, height=height, format=fmt, blob_hash=blob_hash))
+            created += 1
+    if not photo.placeholder:
+        photo.placeholder = _placeholder(original)
+    # Izgara ve gönderi detayı yeni varyantları göstersin
+    touch("photo", photo.id)
+    touch("user", photo.owner_id)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Aynı anda başka bir worker aynı varyantı yazmış, sorun yok
+        db.session.rollback()
+    return created
+
+
+def _build_in_context(app, photo_id):
+    with app.app_context():
+        try:
+            photo = db.session.get(Photo, photo_id, options=[db.undefer(Photo.placeholder)])
+            if photo:
+                build_variants(photo)
+        except Exception:
+            logger.exception("Varyant üretimi başarısız: photo_id=%s", photo_id)
+            db.session.rollback()
+            raise
+
+
+# Upload isteğini bekletmemek için varyantlar havuzda üretilir
+def schedule_variants(photo_id):
+    app = current_app._get_current_object()
+    if app.config.get("THUMBNAILS_INLINE"):
+        return _build_in_context(app, photo_id)
+    return app.extensions["thumbnail_pool"].submit(_build_in_context, app, photo_id)
+
+
+# --------------------- CLI ---------------------
+@click.group("thumbnails")
+def thumbnails_cli():
+    pass
+
+
+@thumbnails_cli.command("backfill")
+@click.option("--batch-size", default=200, show_default=True)
+def backfill(batch_size):
+    app = current_app._get_current_object()
+    pool = app.extensions["thumbnail_pool"]
+    # placeholder en son, varyantlarla aynı commit'te yazılıyor; boşsa işlenmemiş demektir.
+    # Boyutu boş olanlar 4c1e8a7f2d53 öncesi yüklemeler
+    missing = db.session.query(Photo.id).filter(Photo.blob_hash.isnot(None),
+                                                db.or_(Photo.placeholder.is_(None), Photo.width.is_(None)))
+    last_id, total = 0, 0
+    while True:
+        ids = [row.id for row in missing.filter(Photo.id > last_id).order_by(Photo.id).limit(batch_size)]
+        if not ids:
+            break
+        last_id = ids[-1]
+        futures = [pool.submit(_build_in_context, app, photo_id) for photo_id in ids]
+        wait(futures)
+        total += len(ids)
+        click.echo(f"{total} fotoğraf işlendi")
+
+
+def init_thumbnails(app):
+    app.extensions["thumbnail_pool"] = native_executor_class()(max_workers=app.config.get("THUMBNAIL_WORKERS", 2))
+    app.cli.add_command(thumbnails_cli)
@@ -0,0 +1,122 @@
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+
+from flask import Request, current_app
+from PIL import Image, UnidentifiedImageError
+
+from services.metrics import UPLOAD_BYTES, UPLOADS
+from services.blobs import put_blob
+from services.storage import BlobTooLarge, hash_to_tempfile, sniff_mimetype
+
+ALLOWED_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "GIF": "image/gif", "WEBP": "image/webp"}
+# EXIF yönü 5-8 ise resim 90° dönük kaydedilmiş, gerçek en/boy yer değiştirir
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+StoredUpload = namedtuple("StoredUpload", "blob_hash size mimetype width height")
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+# MAX_CONTENT_LENGTH tüm yüklemeler için (10 × 20MB); Werkzeug gövdeyi view'dan önce
+# bu sınıra kadar okuyor. Küçük yükleme kabul eden route'lar istek başına daha dar
+# bir sınır koyar: request.max_content_length = ... (request.files'a erişmeden önce)
+class UploadRequest(Request):
+    _max_content_length = None
+
+    @property
+    def max_content_length(self):
+        if self._max_content_length is not None:
+            return self._max_content_length
+        return super().max_content_length
+
+    @max_content_length.setter
+    def max_content_length(self, value):
+        self._max_content_length = value
+
+
+# Image.open sadece başlığı okur, pikselleri çözmez: tür ve boyut ucuza öğrenilir
+def probe_image(path, max_pixels):
+    try:
+        with Image.open(path) as img:
+            fmt, (width, height) = img.format, img.size
+            if img.getexif().get(0x0112) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise UploadRejected("Dosya okunabilir bir resim değil.")
+    if fmt not in ALLOWED_FORMATS:
+        raise UploadRejected("Sadece JPEG, PNG, GIF veya WebP yüklenebilir.")
+    if width * height > max_pixels:
+        raise UploadRejected("Resim çözünürlüğü çok yüksek.")
+    return ALLOWED_FORMATS[fmt], width, height
+
+
+def _check_head(file):
+    head = file.stream.read(32)
+    file.stream.seek(0)
+    if sniff_mimetype(head) == "application/octet-stream":
+        raise UploadRejected("Sadece JPEG, PNG, GIF veya WebP yüklenebilir.")
+
+
+def _too_large(max_size):
+    return UploadRejected(f"Dosya çok büyük (en fazla {max_size // (1024 * 1024)} MB).")
+
+
+@contextmanager
+def _counted(kind):
+    try:
+        yield
+    except UploadRejected:
+        UPLOADS.inc(kind=kind, result="rejected")
+        raise
+
+
+def _accepted(kind, size):
+    UPLOADS.inc(kind=kind, result="accepted")
+    UPLOAD_BYTES.inc(size, kind=kind)
+
+
+# Yüklenen dosyayı belleğe almadan blob deposuna yazar. Başlık resim değilse
+# hiç okumadan, boyut sınırı aşılırsa okurken reddeder.
+def accept_upload(file, max_size=None, kind="photo"):
+    config = current_app.config
+    max_size = max_size or config["MAX_UPLOAD_BYTES"]
+    probed = {}
+
+    def validate(tmp_path):
+        probed["info"] = probe_image(tmp_path, config["MAX_IMAGE_PIXELS"])
+
+    with _counted(kind):
+        _check_head(file)
+        try:
+            blob_hash, size = put_blob(file.stream, max_size=max_size, validate=validate)
+        except BlobTooLarge:
+            raise _too_large(max_size)
+    _accepted(kind, size)
+    return StoredUpload(blob_hash, size, *probed["info"])
+
+
+# Aynı doğrulama, ama dosya depoya girmez: sadece türevi saklanacak yüklemeler
+# (avatar) için. Blok bitince geçici dosya silinir.
+@contextmanager
+def spooled_upload(file, max_size=None, kind="avatar"):
+    config = current_app.config
+    max_size = max_size or config["MAX_UPLOAD_BYTES"]
+    with _counted(kind):
+        _check_head(file)
+        try:
+            _, size, tmp_path = hash_to_tempfile(file.stream, max_size=max_size)
+        except BlobTooLarge:
+            raise _too_large(max_size)
+        try:
+            info = probe_image(tmp_path, config["MAX_IMAGE_PIXELS"])
+        except UploadRejected:
+            os.unlink(tmp_path)
+            raise
+    _accepted(kind, size)
+    try:
+        yield tmp_path, info
+    finally:
+        os.unlink(tmp_path)
@@ -0,0 +1,127 @@
+import hashlib
+import secrets
+
+from flask import current_app, jsonify, request, session, stream_with_context
+from sqlalchemy import event
+
+from extensions import db
+from services.cache import get_cache
+from services.database import reading_replica
+
+# Sürümler get_cache()'te: tüm worker'lar aynı sürümü görmeli, yoksa bir worker'ın
+# touch()'ı diğerinde eski ETag'le yeni gövde sunulmasına yol açar. Bu yüzden
+# birden fazla worker CACHE_BACKEND=redis gerektiriyor (gunicorn.conf.py).
+VERSION_KEY = "ver:{kind}:{id}"
+VERSION_TTL = 7 * 86400
+
+
+# Sürüm sayaç değil rastgele değer: önbellekten düşen bir sürüm yeniden
+# oluşturulunca eski bir ETag ile çakışmasın
+def _new_version():
+    return secrets.token_hex(6)
+
+
+# kind: "user" (profil, ızgara, takip listeleri) veya "photo" (gönderi detayı, yorumlar)
+def version(kind, object_id):
+    cache = get_cache()
+    key = VERSION_KEY.format(kind=kind, id=object_id)
+    value = cache.get(key)
+    if value is None:
+        value = _new_version()
+        cache.set(key, value, ttl=VERSION_TTL)
+    return value
+
+
+# Sürüm commit'ten sonra değişir; önce değişseydi commit öncesi okunan veri
+# yeni sürümle önbelleğe girebilirdi
+def touch(kind, object_id):
+    db.session.info.setdefault("touched_versions", set()).add((kind, object_id))
+
+
+def etag_for(*parts):
+    return hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:20]
+
+
+def _response_ttl():
+    # Replikadan okunan veri yeni sürümden gerideyse uzun süre önbellekte kalmasın
+    ttl_key = "REPLICA_STICKY_SECONDS" if reading_replica() else "RESPONSE_CACHE_TTL"
+    return current_app.config.get(ttl_key, 300)
+
+
+def cached(name, etag, build):
+    cache = get_cache()
+    key = f"resp:{name}:{etag}"
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, ttl=_response_ttl())
+    return value
+
+
+# cached()'in toplu hali: etags {anahtar: etag}. Önbellekte olmayanlar tek bir
+# build_missing(anahtarlar) çağrısıyla üretilir ({anahtar: değer} döner; olmayan
+# nesneler atlanabilir). Tekli uçla aynı etag'i kullanan girişler paylaşılır.
+def cached_many(name, etags, build_missing):
+    cache = get_cache()
+    found = {key: cache.get(f"resp:{name}:{etag}") for key, etag in etags.items()}
+    missing = [key for key, value in found.items() if value is None]
+    if missing:
+        built = build_missing(missing)
+        ttl = _response_ttl()
+        for key, value in built.items():
+            cache.set(f"resp:{name}:{etags[key]}", value, ttl=ttl)
+            found[key] = value
+    return {key: value for key, value in found.items() if value is not None}
+
+
+def _conditional(etag, make_response):
+    # Bekleyen flash mesajı sayfaya girer ama ETag'e girmez: 304 verilirse mesaj hiç
+    # görünmez, bu yanıt saklanırsa sonraki 304'lerde tekrar görünür
+    if session.get("_flashes"):
+        response = make_response()
+        response.headers["Cache-Control"] = "no-store"
+        return response
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response()
+    response.set_etag(etag)
+    # Tarayıcı saklasın ama her seferinde sorsun (304 ucuz)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+# parts yanıtın bağlı olduğu her şeyi içermeli (sürümler, izleyen kullanıcı, parametreler).
+# İstemcide aynı ETag varsa 304, yoksa önbellekteki veri (veya build()) render edilir.
+def cached_response(name, parts, build, render=jsonify):
+    etag = etag_for(name, *parts)
+    return _conditional(etag, lambda: current_app.make_response(render(cached(name, etag, build))))
+
+
+# Toplu uç: yanıtın ETag'i parçaların etag'lerinden türetilir, 304'te hiçbiri okunmaz
+def cached_many_response(name, etags, build_missing, render=jsonify):
+    return _conditional(
+        etag_for(name, *etags.values()),
+        lambda: current_app.make_response(render(cached_many(name, etags, build_missing))),
+    )
+
+
+# Büyük listeler için: önbelleğe alınmaz, generate() parça parça gönderilir; ETag / 304 aynı
+def streamed_response(name, parts, generate, mimetype="application/json"):
+    return _conditional(
+        etag_for(name, *parts),
+        lambda: current_app.response_class(stream_with_context(generate()), mimetype=mimetype),
+    )
+
+
+def _after_commit(session):
+    touched = session.info.pop("touched_versions", None)
+    if touched:
+        cache = get_cache()
+        for kind, object_id in touched:
+            cache.set(VERSION_KEY.format(kind=kind, id=object_id), _new_version(), ttl=VERSION_TTL)
+
+
+def init_versions(app):
+    event.listen(db.session, "after_commit", _after_commit)
+    event.listen(db.session, "after_soft_rollback", lambda session, previous_transaction: session.info.pop("touched_versions", None))
@@ -0,0 +1,81 @@
+import base64
+import io
+
+from PIL import Image
+
+from extensions import db
+from models.photo import Photo, PhotoVariant
+from services.storage import get_blob_store
+from services.thumbnails import build_variants
+
+
+def _photo(owner, width, height):
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), (191, 149, 63)).save(buf, "PNG")
+    buf.seek(0)
+    blob_hash, _ = get_blob_store().put_stream(buf)
+    photo = Photo(title="Verzia Moment", filename=blob_hash, blob_hash=blob_hash, owner_id=owner.id,
+                  width=width, height=height)
+    db.session.add(photo)
+    db.session.commit()
+    return photo
+
+
+def _variant_set(photo_id):
+    return sorted((v.width, v.height, v.format) for v in PhotoVariant.query.filter_by(photo_id=photo_id))
+
+
+def test_build_variants_produces_widths_formats_and_placeholder(app, make_user):
+    owner = make_user("sahip")
+    photo = _photo(owner, 1200, 800)
+
+    assert build_variants(photo) == 6
+    assert _variant_set(photo.id) == sorted(
+        (w, h, f) for w, h in ((150, 100), (480, 320), (1080, 720)) for f in ("jpeg", "webp"))
+    for variant in PhotoVariant.query.filter_by(photo_id=photo.id):
+        assert get_blob_store().exists(variant.blob_hash)
+
+    header, data = photo.placeholder.split(",", 1)
+    assert header == "data:image/jpeg;base64"
+    assert max(Image.open(io.BytesIO(base64.b64decode(data))).size) <= 16
+
+    # Küçük fotoğraf büyütülmez: tek genişlik (orijinal), iki format
+    small = _photo(owner, 100, 50)
+    assert build_variants(small) == 2
+    assert _variant_set(small.id) == [(100, 50, "jpeg"), (100, 50, "webp")]
+
+
+def test_backfill_only_fills_missing_variants(app, make_user):
+    owner = make_user("sahip")
+    photos = [_photo(owner, 600, 600) for _ in range(3)]
+    runner = app.test_cli_runner()
+
+    assert runner.invoke(args=["thumbnails", "backfill", "--batch-size", "2"]).exit_code == 0
+    db.session.expire_all()
+    first = {p.id: _variant_set(p.id) for p in photos}
+    assert all(len(variants) == 6 for variants in first.values())
+    assert all(p.placeholder for p in photos)
+
+    # Yarım kalmış bir fotoğraf: sadece eksik varyant üretilir, diğerlerine dokunulmaz
+    broken = photos[1]
+    PhotoVariant.query.filter_by(photo_id=broken.id, width=480, format="webp").delete()
+    broken.placeholder = None
+    db.session.commit()
+
+    assert runner.invoke(args=["thumbnails", "backfill"]).exit_code == 0
+    db.session.expire_all()
+    assert {p.id: _variant_set(p.id) for p in photos} == first
+    assert PhotoVariant.query.count() == 18
+
+
+def test_backfill_measures_photos_uploaded_before_dimensions(app, make_user):
+    owner = make_user("sahip")
+    legacy = _photo(owner, 300, 200)
+    build_variants(legacy)
+    legacy.width = legacy.height = None
+    db.session.commit()
+
+    assert app.test_cli_runner().invoke(args=["thumbnails", "backfill"]).exit_code == 0
+    db.session.expire_all()
+    assert (legacy.width, legacy.height) == (300, 200)
+    assert PhotoVariant.query.count() == 4
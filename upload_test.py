@@ -0,0 +1,144 @@
+import hashlib
+import io
+import os
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from extensions import db
+from models.photo import Photo
+from services.blobs import sweep_blobs
+from services.storage import get_blob_store
+
+JSON = {"Accept": "application/json"}
+
+
+def _png(width=40, height=30, color=(191, 149, 63)):
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buf, "PNG")
+    buf.seek(0)
+    return buf
+
+
+def test_batch_upload_keeps_valid_files(app, client, make_user, login):
+    make_user("sahip")
+    login(client, "sahip")
+
+    response = client.post("/upload", headers=JSON, data={"photo": [
+        (_png(), "a.png"), (_png(20, 60), "b.png"), (io.BytesIO(b"merhaba"), "not.txt"),
+    ]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body["photos"]) == 2
+    assert body["errors"] == ["not.txt: Sadece JPEG, PNG, GIF veya WebP yüklenebilir."]
+    photos = Photo.query.order_by(Photo.id).all()
+    assert [(p.mimetype, p.width, p.height) for p in photos] == [("image/png", 40, 30), ("image/png", 20, 60)]
+
+
+def test_oversized_file_is_rejected_while_streaming(app, client, make_user, login):
+    make_user("sahip")
+    login(client, "sahip")
+    app.config["MAX_UPLOAD_BYTES"] = 1024
+    try:
+        big = _png(400, 400)
+        big.seek(0, os.SEEK_END)
+        big.write(b"\0" * 4096)
+        big.seek(0)
+        response = client.post("/upload", headers=JSON, data={"photo": (big, "big.png")})
+    finally:
+        app.config["MAX_UPLOAD_BYTES"] = 20 * 1024 * 1024
+
+    assert response.status_code == 400
+    assert "çok büyük" in response.get_json()["errors"][0]
+    assert Photo.query.count() == 0
+    assert os.listdir(os.path.join(get_blob_store().root, "tmp")) == []
+
+
+def test_request_over_content_length_gets_413(app, client, make_user, login):
+    make_user("sahip")
+    login(client, "sahip")
+    limit = app.config["MAX_CONTENT_LENGTH"]
+    app.config["MAX_CONTENT_LENGTH"] = 512
+    try:
+        response = client.post("/upload", headers=JSON, data={"photo": (io.BytesIO(b"\xff\xd8\xff" + b"\0" * 2048), "x.jpg")})
+    finally:
+        app.config["MAX_CONTENT_LENGTH"] = limit
+    assert response.status_code == 413
+
+
+def test_avatar_is_stored_as_square_variants(app, client, make_user, login):
+    user = make_user("sahip")
+    follower = make_user("takipci")
+    follower.follow(user)
+    login(client, "sahip")
+
+    assert client.post("/update_avatar", data={"avatar": (io.BytesIO(b"GIF89a nope"), "a.gif")}).status_code == 400
+    original = _png(1000, 500)
+    original_hash = hashlib.sha256(original.getvalue()).hexdigest()
+    assert client.post("/update_avatar", data={"avatar": (original, "a.png")}).get_json()["status"] == "success"
+
+    store = get_blob_store()
+    for url, size in ((user.avatar, 320), (user.avatar_thumb, 96)):
+        assert url.startswith("/media/")
+        with Image.open(store.path(url.rsplit("/", 1)[1])) as img:
+            assert (img.format, img.size) == ("JPEG", (size, size))
+    # Orijinal depoda tutulmuyor
+    assert not store.exists(original_hash)
+
+    listed = client.get("/get_user_list/takipci/following").get_json()
+    assert listed["users"] == [{"username": "sahip", "avatar": user.avatar_thumb, "is_following": False}]
+    media = client.get(user.avatar_thumb)
+    assert media.status_code == 200
+    assert media.cache_control.immutable and media.cache_control.max_age == app.config["MEDIA_MAX_AGE"]
+
+
+def test_avatar_request_limit_is_tighter_than_upload_limit(app, client, make_user, login, monkeypatch):
+    make_user("sahip")
+    login(client, "sahip")
+    monkeypatch.setitem(app.config, "AVATAR_MAX_BYTES", 4096)
+    body = io.BytesIO(b"\x89PNG\r\n\x1a\n" + b"\0" * (200 * 1024))
+
+    # Genel sınır (MAX_CONTENT_LENGTH) yetiyor ama avatar route'u gövdeyi okumadan reddediyor
+    assert len(body.getvalue()) < app.config["MAX_CONTENT_LENGTH"]
+    response = client.post("/update_avatar", data={"avatar": (body, "a.png")})
+    assert response.status_code == 413
+    assert response.get_json()["message"] == "Yükleme çok büyük (en fazla 0 MB)."
+    assert os.listdir(os.path.join(get_blob_store().root, "tmp")) == []
+
+
+def test_replaced_avatar_blobs_are_released(app, client, make_user, login):
+    owner, twin = make_user("sahip"), make_user("ikiz")
+    store = get_blob_store()
+    login(client, "ikiz")
+    client.post("/update_avatar", data={"avatar": (_png(200, 200), "a.png")})
+    client.get("/logout")
+    login(client, "sahip")
+    client.post("/update_avatar", data={"avatar": (_png(200, 200), "a.png")})
+    shared = (owner.avatar, owner.avatar_thumb)
+    assert shared == (twin.avatar, twin.avatar_thumb)
+
+    # Aynı dosyayı ikiz de kullanıyor: eski avatar depoda kalır
+    client.post("/update_avatar", data={"avatar": (_png(300, 100, (10, 20, 30)), "b.png")})
+    assert all(store.exists(url.rsplit("/", 1)[1]) for url in shared)
+    replaced = (owner.avatar, owner.avatar_thumb)
+
+    # Kimsenin kullanmadığı eski avatar bekleme süresinden sonra silinir
+    client.post("/update_avatar", data={"avatar": (_png(100, 300, (200, 0, 0)), "c.png")})
+    assert all(store.exists(url.rsplit("/", 1)[1]) for url in replaced)
+    assert sweep_blobs(now=datetime.utcnow() + timedelta(days=1)) == 2
+    assert not any(store.exists(url.rsplit("/", 1)[1]) for url in replaced)
+    assert all(store.exists(url.rsplit("/", 1)[1]) for url in (owner.avatar, owner.avatar_thumb))
+
+
+def test_deleting_a_photo_keeps_a_live_avatar_blob(app, client, make_user, login):
+    owner = make_user("sahip")
+    login(client, "sahip")
+    client.post("/update_avatar", data={"avatar": (_png(200, 200), "a.png")})
+    blob_hash = owner.avatar.rsplit("/", 1)[1]
+    photo = Photo(title="Verzia Moment", filename=blob_hash, blob_hash=blob_hash, owner_id=owner.id)
+    db.session.add(photo)
+    db.session.commit()
+
+    assert client.post(f"/delete_photo/{photo.id}").get_json()["status"] == "success"
+    assert get_blob_store().exists(blob_hash)
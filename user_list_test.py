@@ -0,0 +1,55 @@
+from extensions import db
+
+
+def _followers(make_user, owner, count):
+    users = [make_user(f"takipci{i:02d}") for i in range(count)]
+    for user in users:
+        user.follow(owner)
+    db.session.commit()
+    return users
+
+
+def test_follower_list_is_cursor_paginated(app, client, make_user, login):
+    owner = make_user("sahip")
+    followers = _followers(make_user, owner, 5)
+    viewer = make_user("izleyen")
+    viewer.follow(followers[1])
+    db.session.commit()
+    login(client, "izleyen")
+
+    first = client.get("/get_user_list/sahip/followers?limit=2")
+    assert first.mimetype == "application/json"
+    page = first.get_json()
+    assert [u["username"] for u in page["users"]] == ["takipci00", "takipci01"]
+    assert [u["is_following"] for u in page["users"]] == [False, True]
+    assert page["next_after_id"] == followers[1].id
+
+    rest = client.get(f"/get_user_list/sahip/followers?limit=2&after_id={page['next_after_id']}").get_json()
+    assert [u["username"] for u in rest["users"]] == ["takipci02", "takipci03"]
+    last = client.get(f"/get_user_list/sahip/followers?limit=2&after_id={rest['next_after_id']}").get_json()
+    assert [u["username"] for u in last["users"]] == ["takipci04"]
+    assert last["next_after_id"] is None
+
+    following = client.get("/get_user_list/takipci00/following").get_json()
+    assert following == {"users": [{"username": "sahip", "avatar": "https://picsum.photos/100", "is_following": False}], "next_after_id": None}
+    assert client.get("/get_user_list/sahip/bilinmeyen").status_code == 404
+
+
+def test_follower_list_revalidates_and_skips_user_rows(app, client, make_user, login, count_queries):
+    owner = make_user("sahip")
+    _followers(make_user, owner, 3)
+    login(client, "takipci00")
+
+    first = client.get("/get_user_list/sahip/followers")
+    again = client.get("/get_user_list/sahip/followers", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+    client.post("/follow/sahip")
+    with count_queries() as statements:
+        changed = client.get("/get_user_list/sahip/followers", headers={"If-None-Match": first.headers["ETag"]})
+        body = changed.get_json()
+    assert changed.status_code == 200
+    assert [u["username"] for u in body["users"]] == ["takipci01", "takipci02"]
+    # Liste sorgusu User'ı tam yüklemiyor (şifre, bio seçilmiyor)
+    list_queries = [s for s in statements if "FROM followers_assoc JOIN" in s]
+    assert len(list_queries) == 1 and "password" not in list_queries[0]